@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Compara el motor de copia (copy_file / copy_tree) con shutil.copy2 /
+shutil.copytree, que es lo que usaba el instalador antes, en un archivo
+grande y en un árbol de muchos archivos pequeños.
+
+--latency-ms agrega la misma espera por archivo a ambos lados para simular
+la latencia de abrir/crear archivos en SMB; con 0 se mide el disco local,
+donde shutil usa la copia del kernel (sin pasar por Python).
+
+    python benchmarks/bench_copy_engine.py --big-mb 512 --files 5000 --size-kb 16 --latency-ms 2
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import copy_engine  # noqa: E402
+from utils.copy_engine import DEFAULT_WORKERS, CopyStats, copy_file, copy_tree  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def make_big(root, size_mb):
+    path = os.path.join(root, "grande.bin")
+    block = os.urandom(MB)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+    return path
+
+
+def make_tree(root, files, size, per_dir=200):
+    payload = os.urandom(size)
+    for i in range(files):
+        folder = os.path.join(root, f"d{i // per_dir:04d}")
+        if i % per_dir == 0:
+            os.makedirs(folder)
+        with open(os.path.join(folder, f"f{i:06d}.bin"), "wb") as f:
+            f.write(payload)
+    return root
+
+
+def best_of(repeat, func, cleanup):
+    """Menor tiempo de `repeat` corridas (cleanup() entre corridas)"""
+    best = None
+    for _ in range(repeat):
+        cleanup()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    cleanup()
+    return best
+
+
+def remove(path):
+    def cleanup():
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+    return cleanup
+
+
+def delayed(func, latency_s):
+    """Envuelve una función de copia con una espera fija por archivo"""
+    def copy(*args, **kwargs):
+        time.sleep(latency_s)
+        return func(*args, **kwargs)
+    return copy
+
+
+def report(title, total_bytes, files, results):
+    print(title)
+    baseline = results[0][1]
+    for name, seconds in results:
+        print(f"  {name:<28} {seconds:7.2f} s  {total_bytes / MB / seconds:8.1f} MB/s  "
+              f"{files / seconds:8.0f} archivos/s  ({baseline / seconds:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--big-mb", type=int, default=512)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--size-kb", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000.0
+    shutil_copy = delayed(shutil.copy2, latency) if latency else shutil.copy2
+    original_copy_file = copy_engine.copy_file
+
+    root = tempfile.mkdtemp(prefix="bench_copy_engine_")
+    try:
+        if latency:
+            copy_engine.copy_file = delayed(original_copy_file, latency)
+
+        big = make_big(root, args.big_mb)
+        big_dir = os.path.join(root, "grande")
+        os.makedirs(big_dir)
+        shutil.copy2(big, os.path.join(big_dir, "grande.bin"))
+        small_dir = make_tree(os.path.join(root, "pequenos"), args.files, args.size_kb * 1024)
+
+        dst_file = os.path.join(root, "copia.bin")
+        dst_dir = os.path.join(root, "copia")
+        staging_cleanup = remove(dst_dir + ".partial")
+
+        def clean_dir():
+            remove(dst_dir)()
+            staging_cleanup()
+
+        big_bytes = args.big_mb * MB
+        report(f"Un archivo de {args.big_mb} MB", big_bytes, 1, [
+            ("shutil.copy2",
+             best_of(args.repeat, lambda: shutil.copy2(big, dst_file), remove(dst_file))),
+            ("copy_file",
+             best_of(args.repeat, lambda: copy_file(big, dst_file, stats=CopyStats()), remove(dst_file))),
+            ("shutil.copytree",
+             best_of(args.repeat, lambda: shutil.copytree(big_dir, dst_dir, copy_function=shutil_copy),
+                     clean_dir)),
+            ("copy_tree",
+             best_of(args.repeat, lambda: copy_tree(big_dir, dst_dir, workers=args.workers), clean_dir)),
+        ])
+
+        small_bytes = args.files * args.size_kb * 1024
+        title = f"{args.files} archivos de {args.size_kb} KB, latencia {args.latency_ms:g} ms/archivo"
+        report(title, small_bytes, args.files, [
+            ("shutil.copytree",
+             best_of(args.repeat, lambda: shutil.copytree(small_dir, dst_dir, copy_function=shutil_copy),
+                     clean_dir)),
+            ("copy_tree (1 hilo)",
+             best_of(args.repeat, lambda: copy_tree(small_dir, dst_dir, workers=1), clean_dir)),
+            (f"copy_tree ({args.workers} hilos)",
+             best_of(args.repeat, lambda: copy_tree(small_dir, dst_dir, workers=args.workers), clean_dir)),
+        ])
+    finally:
+        copy_engine.copy_file = original_copy_file
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Mide copy_tree con un solo hilo frente a varios sobre un árbol de muchos
+archivos pequeños.
+
+--latency-ms agrega una espera por archivo antes de copiarlo para simular
+la latencia de abrir/crear archivos en SMB, que es lo que domina con árboles
+grandes; con 0 se mide solo el disco local.
+
+    python benchmarks/bench_copy_tree.py --files 10000 --latency-ms 2 --workers 1 8
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import copy_engine  # noqa: E402
+from utils.copy_engine import CopyStats, copy_tree  # noqa: E402
+
+
+def make_tree(root, files, size, per_dir=200):
+    payload = os.urandom(size)
+    for i in range(files):
+        folder = os.path.join(root, f"d{i // per_dir:04d}")
+        if i % per_dir == 0:
+            os.makedirs(folder)
+        with open(os.path.join(folder, f"f{i:06d}.bin"), "wb") as f:
+            f.write(payload)
+
+
+def with_latency(latency_s):
+    """Envuelve copy_engine.copy_file con una espera fija por archivo"""
+    original = copy_engine.copy_file
+
+    def copy_file(*args, **kwargs):
+        time.sleep(latency_s)
+        return original(*args, **kwargs)
+
+    return original, copy_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--size-kb", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_copy_tree_")
+    original, delayed = with_latency(args.latency_ms / 1000.0)
+    try:
+        src = os.path.join(root, "src")
+        make_tree(src, args.files, args.size_kb * 1024)
+        print(f"{args.files} archivos x {args.size_kb} KB, latencia {args.latency_ms:g} ms/archivo")
+
+        if args.latency_ms:
+            copy_engine.copy_file = delayed
+
+        for workers in args.workers:
+            dst = os.path.join(root, f"dst_{workers}")
+            stats = copy_tree(src, dst, stats=CopyStats(), workers=workers)
+            print(f"  workers={workers:<3} {stats.seconds:7.2f} s  "
+                  f"{stats.files_per_s:8.0f} archivos/s  {stats.mb_per_s:7.1f} MB/s")
+            shutil.rmtree(dst, ignore_errors=True)
+    finally:
+        copy_engine.copy_file = original
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Compara la detección de motor anterior (leer 2 MB, decodificar latin-1,
+pasar a minúsculas y buscar cada firma) con scan_installer y con el índice
+persistente (EngineIndex) sobre instaladores sintéticos.
+
+    python benchmarks/bench_engine_detection.py --size-mb 8 --repeat 20 --filler binary
+"""
+
+import os
+import sys
+import time
+import shutil
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["ProgramData"] = tempfile.mkdtemp(prefix="bench_programdata_")
+
+from core.engine_detection import EngineIndex, scan_installer  # noqa: E402
+
+# (nombre, firma, desplazamiento dentro del archivo)
+STUBS = [
+    ("inno.exe", b"Inno Setup Setup Data (6.2.0)", 1536 * 1024),
+    ("nsis.exe", b"Nullsoft Install System v3.08", 900 * 1024),
+    ("installshield.exe", b"InstallShield", 1800 * 1024),
+    ("burn.exe", b"WiX Burn bootstrapper", 1900 * 1024),
+    ("unknown.exe", None, 0),
+]
+
+
+def legacy_detect(installer_path):
+    """Detección previa de core/installer.py, tal como estaba"""
+    try:
+        with open(installer_path, "rb") as f:
+            data = f.read(2 * 1024 * 1024)
+        text = data.decode("latin1", errors="ignore").lower()
+
+        if "inno setup" in text:
+            return "inno"
+        if "nullsoft install system" in text or "nsis" in text:
+            return "nsis"
+        if "installshield" in text:
+            return "installshield"
+        if "wix burn" in text or "burn engine" in text:
+            return "burn"
+    except Exception:
+        pass
+    return "unknown"
+
+
+def make_filler(kind, size):
+    """
+    Relleno sin firmas: "binary" imita el payload comprimido de un instalador
+    real (bytes arbitrarios); "text" es ASCII en mayúsculas, el caso más
+    favorable para decodificar como latin-1.
+    """
+    if kind == "text":
+        return (bytes(range(65, 91)) * (size // 26 + 1))[:size]
+    return bytes(random.Random(0).getrandbits(8) for _ in range(64 * 1024)) * (size // (64 * 1024))
+
+
+def make_stubs(root, size_mb, filler="binary"):
+    body = bytearray(make_filler(filler, size_mb * 1024 * 1024))
+    body[:2] = b"MZ"
+    paths = []
+    for name, signature, offset in STUBS:
+        data = bytearray(body)
+        if signature:
+            data[offset:offset + len(signature)] = signature
+        path = os.path.join(root, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+
+def timed(func, paths, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [func(path) for path in paths]
+    return (time.perf_counter() - start) / (repeat * len(paths)), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--filler", choices=("binary", "text"), default="binary")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_engine_")
+    try:
+        paths = make_stubs(root, args.size_mb, args.filler)
+
+        legacy_s, legacy = timed(legacy_detect, paths, args.repeat)
+        scan_s, scanned = timed(scan_installer, paths, args.repeat)
+
+        index = EngineIndex(os.path.join(root, "engine_index.json"))
+        first_s, _ = timed(index.detect, paths, 1)
+        cached_s, cached = timed(index.detect, paths, args.repeat)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        shutil.rmtree(os.environ["ProgramData"], ignore_errors=True)
+
+    print(f"{len(paths)} instaladores de {args.size_mb} MB ({args.filler}), {args.repeat} repeticiones")
+    print(f"  resultados: {dict(zip((s[0] for s in STUBS), scanned))}")
+    if legacy != scanned or cached != scanned:
+        print(f"  ¡resultados distintos! anterior={legacy} índice={cached}")
+    print(f"  anterior (latin-1 + lower):   {legacy_s * 1000:8.2f} ms/archivo")
+    print(f"  scan_installer:               {scan_s * 1000:8.2f} ms/archivo ({legacy_s / scan_s:.1f}x)")
+    print(f"  EngineIndex, primera vez:     {first_s * 1000:8.2f} ms/archivo")
+    print(f"  EngineIndex, ya indexado:     {cached_s * 1000:8.3f} ms/archivo ({legacy_s / cached_s:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
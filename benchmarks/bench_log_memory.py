@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Mide memoria y tiempo de last_log_content en sesiones largas: la cadena que
+crecía con cada línea (`+=` sobre un atributo copia todo el texto en cada
+llamada) frente al búfer circular acotado de Logger.
+
+    python benchmarks/bench_log_memory.py --lines 5000 20000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.logger import Logger  # noqa: E402
+
+LINE = "Instalando Paquete de ejemplo 1.2.3: copiando archivo {} de la compartida a TEMP"
+
+
+class LegacyBuffer:
+    """Acumulación previa de Logger.log (sin archivo ni consola)"""
+
+    def __init__(self):
+        self.last_log_content = ""
+
+    def log(self, msg):
+        self.last_log_content += f"[2026-01-01 00:00:00] {msg}\n"
+
+    def tail(self, lines=100):
+        return "\n".join(self.last_log_content.splitlines()[-lines:])
+
+
+def measure(make, lines):
+    tracemalloc.start()
+    buffer = make()
+    start = time.perf_counter()
+    for i in range(lines):
+        buffer.log(LINE.format(i))
+    logged = time.perf_counter() - start
+
+    start = time.perf_counter()
+    buffer.tail(100)
+    tail_s = time.perf_counter() - start
+
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return logged, tail_s, current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[5000, 20000])
+    parser.add_argument("--max-lines", type=int, default=2000,
+                        help="tope del búfer circular (Logger usa TAIL_MAX_LINES por defecto)")
+    args = parser.parse_args()
+
+    def ring():
+        logger = Logger(max_lines=args.max_lines)
+        logger.log_file_path = None
+        return logger
+
+    mb = 1024 * 1024
+    print(f"búfer circular con tope de {args.max_lines} líneas")
+    for lines in args.lines:
+        for name, make in (("anterior", LegacyBuffer), ("circular", ring)):
+            logged, tail_s, current, peak = measure(make, lines)
+            print(f"  {lines:>7} líneas {name:<9} {logged / lines * 1e6:8.1f} µs/línea  "
+                  f"tail(100) {tail_s * 1000:7.2f} ms  "
+                  f"memoria {current / mb:6.1f} MB (pico {peak / mb:6.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
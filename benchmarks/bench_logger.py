@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Mide el costo por línea de Logger.log: la escritura anterior (abrir, anexar
+y cerrar la bitácora en cada línea, en el hilo que registra) frente a la
+cola con el hilo de fondo (_LogWriter).
+
+    python benchmarks/bench_logger.py --lines 10000 --threads 1 4
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.logger import Logger  # noqa: E402
+
+
+class LegacyLogger:
+    """Logger.log / _write_to_file previos, sin consola"""
+
+    def __init__(self, log_file_path):
+        self.log_file_path = log_file_path
+        self.last_log_content = ""
+
+    def log(self, msg):
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        line = f"[{timestamp}] {msg}"
+        self._write_to_file(line)
+        self.last_log_content += line + "\n"
+
+    def _write_to_file(self, line):
+        try:
+            with open(self.log_file_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except Exception:
+            pass
+
+
+def run(logger, lines, threads):
+    """Retorna (segundos en log(), segundos hasta tener todo en disco)"""
+    per_thread = lines // threads
+
+    def worker(n):
+        for i in range(per_thread):
+            logger.log(f"[hilo {n}] Copiando archivo {i} de {per_thread}: instalador.exe (123456 bytes)")
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    logged = time.perf_counter() - start
+
+    if hasattr(logger, "flush"):
+        logger.flush()
+    return logged, time.perf_counter() - start
+
+
+def count_lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=10000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_logger_")
+    try:
+        print(f"{args.lines} líneas")
+        for threads in args.threads:
+            for name, make in (
+                ("anterior", LegacyLogger),
+                ("_LogWriter", lambda path: Logger()),
+            ):
+                path = os.path.join(root, f"{name}_{threads}.log")
+                logger = make(path)
+                logger.log_file_path = path
+                logged, total = run(logger, args.lines, threads)
+                written = count_lines(path)
+                print(f"  hilos={threads:<2} {name:<11} {logged / args.lines * 1e6:7.1f} µs/línea en log(), "
+                      f"{total:6.2f} s hasta disco ({written} líneas escritas)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
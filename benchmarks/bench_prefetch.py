@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Mide cuánto tiempo de pared ahorra precargar instaladores (InstallerPrefetcher)
+frente a copiar e instalar uno tras otro.
+
+La "compartida" es una carpeta local y la copia se limita a --mbps para
+simular la red; la instalación es un sleep de --install segundos.
+
+    python benchmarks/bench_prefetch.py --apps 6 --size-mb 64 --mbps 40 --install 1.5
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["ProgramData"] = tempfile.mkdtemp(prefix="bench_programdata_")
+
+from core.prefetch import InstallerPrefetcher  # noqa: E402
+
+CHUNK = 1024 * 1024
+
+
+def make_share(root, apps, size_mb):
+    share = os.path.join(root, "share")
+    os.makedirs(share)
+    block = os.urandom(CHUNK)
+    sources = []
+    for i in range(apps):
+        path = os.path.join(share, f"app{i}.exe")
+        with open(path, "wb") as f:
+            for _ in range(size_mb):
+                f.write(block)
+        sources.append(path)
+    return sources
+
+
+def throttled_stager(dest_dir, mbps):
+    """stage_func que copia por bloques sin superar `mbps` MB/s"""
+
+    def stage(src):
+        dst = os.path.join(dest_dir, os.path.basename(src))
+        start = time.perf_counter()
+        copied = 0
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            while True:
+                data = fsrc.read(CHUNK)
+                if not data:
+                    break
+                fdst.write(data)
+                copied += len(data)
+                ahead = copied / (mbps * CHUNK) - (time.perf_counter() - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+        return dst
+
+    return stage
+
+
+def run_serial(sources, stage, install_seconds):
+    start = time.perf_counter()
+    for src in sources:
+        local = stage(src)
+        time.sleep(install_seconds)
+        os.remove(local)
+    return time.perf_counter() - start
+
+
+def run_prefetch(sources, stage, install_seconds, lookahead):
+    start = time.perf_counter()
+    prefetcher = InstallerPrefetcher(
+        sources,
+        lookahead=lookahead,
+        budget_bytes=sum(os.path.getsize(s) for s in sources),
+        stage_func=stage,
+    )
+    prefetcher.start()
+    try:
+        for src in sources:
+            local = prefetcher.take(src) or stage(src)
+            time.sleep(install_seconds)
+            os.remove(local)
+    finally:
+        prefetcher.stop()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apps", type=int, default=6)
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--mbps", type=float, default=40.0)
+    parser.add_argument("--install", type=float, default=1.5)
+    parser.add_argument("--lookahead", type=int, default=2)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_prefetch_")
+    try:
+        sources = make_share(root, args.apps, args.size_mb)
+        for name in ("serial", "prefetch"):
+            os.makedirs(os.path.join(root, name))
+
+        serial = run_serial(sources, throttled_stager(os.path.join(root, "serial"), args.mbps), args.install)
+        overlap = run_prefetch(
+            sources,
+            throttled_stager(os.path.join(root, "prefetch"), args.mbps),
+            args.install,
+            args.lookahead,
+        )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        shutil.rmtree(os.environ["ProgramData"], ignore_errors=True)
+
+    copy_s = args.size_mb / args.mbps
+    print(f"{args.apps} apps x {args.size_mb} MB a {args.mbps:.0f} MB/s "
+          f"(copia {copy_s:.2f} s, instalación {args.install:.2f} s)")
+    print(f"  en serie:     {serial:6.2f} s")
+    print(f"  con precarga: {overlap:6.2f} s  ({serial / overlap:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ import subprocess
 import socket
 import json
 from utils.admin_utils import require_admin
-from utils.system_info import get_system_info
+from utils.inventory_cache import inventory_cache
 from utils.subprocess_utils import hidden_run
 
 
@@ -41,7 +41,7 @@ class DomainJoiner:
     @staticmethod
     def get_computer_name():
         try:
-            info = get_system_info()
+            info = inventory_cache.get()
             return (
                 info.get("Nombre del equipo")
                 or info.get("Nombre del dispositivo")
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import struct
+import threading
+
+from utils.file_utils import get_program_data_dir
+
+# Firmas por motor, en orden de prioridad (igual que la detección original)
+ENGINE_SIGNATURES = [
+    ("inno", [b"inno setup"]),
+    ("nsis", [b"nullsoft install system", b"nullsoftinst", b"nsis"]),
+    ("installshield", [b"installshield"]),
+    ("burn", [b"wix burn", b"burn engine", b".wixburn"]),
+]
+
+HEAD_BYTES = 2 * 1024 * 1024      # inicio del binario (como antes)
+REGION_BYTES = 1024 * 1024        # tope por región extra (overlay / recursos)
+CHUNK_SIZE = 256 * 1024
+
+_SIGNATURES = [
+    (signature, engine)
+    for engine, signatures in ENGINE_SIGNATURES
+    for signature in signatures
+]
+_MAX_SIGNATURE = max(len(signature) for signature, _ in _SIGNATURES)
+_PRIORITY = [engine for engine, _ in ENGINE_SIGNATURES]
+
+
+def _pe_regions(f, file_size):
+    """
+    Lee la cabecera PE y retorna (regiones_a_revisar, nombres_de_sección).
+    Las regiones son el overlay (datos anexados tras la última sección, donde
+    Inno/NSIS guardan su payload) y la sección de recursos.
+    """
+    try:
+        f.seek(0)
+        dos = f.read(64)
+        if len(dos) < 64 or dos[:2] != b"MZ":
+            return [], []
+
+        pe_offset = struct.unpack_from("<I", dos, 0x3C)[0]
+        f.seek(pe_offset)
+        header = f.read(24)
+        if len(header) < 24 or header[:4] != b"PE\0\0":
+            return [], []
+
+        num_sections = struct.unpack_from("<H", header, 6)[0]
+        optional_size = struct.unpack_from("<H", header, 20)[0]
+
+        f.seek(pe_offset + 24 + optional_size)
+        table = f.read(40 * num_sections)
+
+        regions = []
+        names = []
+        end_of_image = 0
+
+        for i in range(num_sections):
+            entry = table[i * 40:(i + 1) * 40]
+            if len(entry) < 40:
+                break
+            name = entry[:8].rstrip(b"\0").lower()
+            raw_size, raw_ptr = struct.unpack_from("<II", entry, 16)
+            names.append(name)
+            end_of_image = max(end_of_image, raw_ptr + raw_size)
+
+            if name == b".rsrc" and raw_size:
+                regions.append((raw_ptr, min(raw_size, REGION_BYTES)))
+
+        if 0 < end_of_image < file_size:
+            regions.append((end_of_image, min(file_size - end_of_image, REGION_BYTES)))
+
+        return regions, names
+    except Exception:
+        return [], []
+
+
+def _scan_region(f, start, length, found):
+    """
+    Busca todas las firmas en una región leyendo por bloques. Cada bloque se
+    pasa a minúsculas una sola vez (en bytes, sin decodificar) y las firmas se
+    buscan con la búsqueda nativa de bytes. Se conserva un solapamiento entre
+    bloques para no perder firmas partidas.
+    """
+    f.seek(start)
+    remaining = length
+    tail = b""
+
+    while remaining > 0:
+        block = f.read(min(CHUNK_SIZE, remaining))
+        if not block:
+            break
+        remaining -= len(block)
+
+        data = tail + block.lower()
+        for signature, engine in _SIGNATURES:
+            if engine not in found and signature in data:
+                found.add(engine)
+
+        if _PRIORITY[0] in found:
+            return
+
+        tail = data[-(_MAX_SIGNATURE - 1):]
+
+
+def scan_installer(path):
+    """Detecta el motor de un instalador leyendo solo las regiones relevantes"""
+    file_size = os.path.getsize(path)
+    found = set()
+
+    with open(path, "rb") as f:
+        regions, section_names = _pe_regions(f, file_size)
+
+        if b".wixburn" in section_names:
+            found.add("burn")
+
+        for start, length in [(0, min(HEAD_BYTES, file_size))] + regions:
+            _scan_region(f, start, length, found)
+            if _PRIORITY[0] in found:
+                break
+
+    for engine in _PRIORITY:
+        if engine in found:
+            return engine
+
+    return "unknown"
+
+
+class EngineIndex:
+    """
+    Índice persistente de motores ya detectados.
+
+    La clave es nombre de archivo + tamaño + fecha de modificación, de modo
+    que la misma versión de un instalador se reconoce aunque esté copiada en
+    TEMP, en la caché local o se lea desde la compartida.
+    """
+
+    def __init__(self, index_path=None):
+        self.index_path = index_path or os.path.join(get_program_data_dir(), "engine_index.json")
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _save(self):
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except Exception:
+            pass
+
+    @staticmethod
+    def make_key(path):
+        stat = os.stat(path)
+        name = os.path.basename(path).lower()
+        return f"{name}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def detect(self, path):
+        key = self.make_key(path)
+
+        with self._lock:
+            engine = self._entries.get(key)
+        if engine:
+            return engine
+
+        engine = scan_installer(path)
+
+        with self._lock:
+            self._entries[key] = engine
+            self._save()
+
+        return engine
+
+
+_default_index = None
+_default_lock = threading.Lock()
+
+
+def detect_installer_engine(installer_path):
+    """
+    Intenta detectar el motor del instalador.
+    Retorna: inno, nsis, installshield, burn, msi, unknown
+    """
+    global _default_index
+
+    if installer_path.lower().endswith(".msi"):
+        return "msi"
+
+    try:
+        with _default_lock:
+            if _default_index is None:
+                _default_index = EngineIndex()
+        return _default_index.detect(installer_path)
+    except Exception:
+        return "unknown"
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import math
+import threading
+
+from utils.file_utils import get_program_data_dir
+
+
+def _percentile(values, pct):
+    """Percentil por rango más cercano"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class InstallTimingHistory:
+    """
+    Historial local de cuánto tarda el instalador de cada app del catálogo.
+
+    Se guardan las últimas `max_samples` duraciones exitosas por nombre y a
+    partir de ellas se calcula p50 / p95. El timeout de cada app deja de ser
+    fijo: se deriva de su p95 con un margen, dentro de un mínimo y un máximo.
+    """
+
+    def __init__(
+        self,
+        path=None,
+        max_samples=20,
+        factor=2.0,
+        minimum=60,
+        maximum=7200,
+    ):
+        self.path = path or os.path.join(get_program_data_dir(), "install_timing.json")
+        self.max_samples = max(1, int(max_samples))
+        self.factor = factor
+        self.minimum = minimum
+        self.maximum = maximum
+
+        self._lock = threading.Lock()
+        self._samples = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._samples, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            pass
+
+    def expected(self, nombre):
+        """Retorna {"p50", "p95", "samples"} o None si no hay historial"""
+        with self._lock:
+            values = list(self._samples.get(nombre, []))
+
+        if not values:
+            return None
+
+        return {
+            "p50": _percentile(values, 50),
+            "p95": _percentile(values, 95),
+            "samples": len(values),
+        }
+
+    def timeout_for(self, nombre, default):
+        """
+        Timeout adaptativo: p95 * factor + 30 s, acotado a [mínimo, máximo].
+        Sin historial se usa `default` (None = sin límite).
+        """
+        expected = self.expected(nombre)
+        if not expected:
+            return default
+
+        timeout = expected["p95"] * self.factor + 30
+        return int(min(max(timeout, self.minimum), self.maximum))
+
+    def record(self, nombre, seconds):
+        """Agrega la duración de una instalación exitosa"""
+        if seconds <= 0:
+            return
+
+        with self._lock:
+            values = self._samples.setdefault(nombre, [])
+            values.append(round(seconds, 1))
+            del values[:-self.max_samples]
+            self._save()
@@ -1,25 +1,45 @@
 # -*- coding: utf-8 -*-
 
 import os
-import subprocess
+import threading
 import time
-import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox
-import signal
 
 from core.config import load_config
+from core.engine_detection import detect_installer_engine
+from core.install_timing import InstallTimingHistory
 from core.logger import global_logger as logger
-from utils.file_utils import stage_to_temp
-from utils.subprocess_utils import hidden_run
-from utils.subprocess_utils import hidden_popen
-
+from core.prefetch import InstallerPrefetcher
+from core.run_control import InstallCancelled, RunControl
+from core.run_journal import (
+    REBOOT_CODES,
+    REBOOT_INITIATED,
+    STATUS_CANCELLED,
+    STATUS_COMPLETED,
+    STATUS_REBOOT,
+    RunJournal,
+    clear_resume_on_boot,
+    register_resume_on_boot,
+)
+from core import run_events
+from core.scheduler import InstallScheduler
+from core.silent_args import SilentArgsStore
+from utils.copy_engine import CopyStats, DEFAULT_WORKERS, copy_tree, sync_tree
+from utils.file_utils import stage_to_temp, remove_staged
+from utils.installer_cache import InstallerCache
+from utils.output_capture import LogFileTail, OutputCollector
+from utils.process_runner import get_process_runner
+
+# Handlers especiales que copian su instalador a TEMP
+STAGED_HANDLERS = ("vnc_with_license", "output_messenger", "sql_express_kielsa", "ssms_silent")
 
 
 class Installer:
     """Clase encargada de la lógica de instalación"""
 
-    def __init__(self, gui_callbacks):
+    def __init__(self, gui_callbacks, command_runner=None, catalog=None):
         """
         Inicializa el instalador
 
@@ -29,8 +49,70 @@ class Installer:
                 - update_progress: Actualizar progreso
                 - enable_run_button: Habilitar botón de ejecución
                 - show_summary: Mostrar resumen
+            command_runner: Función opcional que ejecuta los instaladores.
+                Firma: (command, timeout=None, cwd=None, hidden=False,
+                stall_seconds=None, on_output=None) -> (returncode, timed_out).
+                on_output(fuente, línea) recibe la salida del proceso. Por defecto usa
+                _run_command_with_timeout; permite inyectar un runner falso.
+            catalog: CatalogManager opcional donde guardar los argumentos
+                silenciosos aprendidos (si está habilitado en config.json).
         """
         self.callbacks = gui_callbacks
+        self.command_runner = command_runner or self._run_command_with_timeout
+        self.catalog = catalog
+
+        # Windows Installer solo admite una instalación a la vez
+        self._installer_mutex = threading.RLock()
+        self._lanes_lock = threading.Lock()
+        self._active_lanes = []
+        self._completed = 0
+        self._parallel = False
+        self._prefetcher = None
+        self._cache = None
+        self._copy_workers = DEFAULT_WORKERS
+        self._country_workers = 4
+        self._args_store = None
+        self._save_args_to_catalog = False
+        self._catalog_lock = threading.Lock()
+        self._timings = None
+        self._default_timeout = 120
+        self._stall_seconds = None
+        self._auxiliary_timeout = 600
+        self._app_durations = {}
+        self._app_local = threading.local()
+        self._process_runner = get_process_runner()
+        self._processes = self._process_runner.group()
+        self._control = RunControl()
+        self._journal = None
+        self._resumed_apps = set()
+        self._reboot_apps = {}
+        self._reboot_stop = False
+        self._stop_on_reboot = True
+
+    # ===== control del lote en curso =====
+    def cancel(self):
+        """
+        Cancela el lote en curso: no se inician más apps, la actual se corta
+        en su siguiente punto de control y se termina el proceso hijo.
+        """
+        self._control.cancel()
+        self._processes.cancel()
+        logger.log("⛔ Cancelación solicitada por el usuario")
+        if "progress_set_status" in self.callbacks:
+            self.callbacks["progress_set_status"]("Cancelando...")
+
+    def pause(self):
+        """Pausa el lote al terminar el paso en curso"""
+        self._control.pause()
+        logger.log("⏸ Pausa solicitada: se detendrá al terminar el paso en curso")
+        if "progress_set_status" in self.callbacks:
+            self.callbacks["progress_set_status"]("En pausa (al terminar el paso en curso)")
+
+    def resume(self):
+        self._control.resume()
+        logger.log("▶ Ejecución reanudada")
+        if "progress_set_status" in self.callbacks:
+            self.callbacks["progress_set_status"]("Reanudando...")
 
     def execute_apps(self, mode_name: str, apps: list):
         """Ejecuta la instalación de las aplicaciones"""
@@ -39,7 +121,14 @@ class Installer:
         success_count = 0
         failed_count = 0
         skipped_count = 0
+        cancelled_count = 0
         total_apps = len(apps)
+        completed = False
+        self._control.reset()
+        self._processes = self._process_runner.group()
+        self._journal = None
+        self._reboot_apps = {}
+        self._reboot_stop = False
 
         try:
             self._update_ui_start(total_apps)
@@ -49,7 +138,13 @@ class Installer:
                 self._show_error("Error de configuración")
                 return
 
+            logs_config = config.get("logs", {})
+            logger.set_buffer_limits(
+                max_lines=logs_config.get("memoria_lineas"),
+                max_bytes=logs_config.get("memoria_mb", 0) * 1024 * 1024,
+            )
             log_file_path = logger.create_log_file(mode_name)
+            self._start_log_rotation(logs_config.get("rotacion", {}))
 
             if total_apps == 0:
                 logger.log("No hay aplicaciones seleccionadas para instalar.")
@@ -59,23 +154,68 @@ class Installer:
             self._log_start(mode_name, total_apps, log_file_path)
 
             rutas_base = config.get("rutas_base", {})
+            install_config = config.get("instalacion", {})
+            max_workers = install_config.get("max_workers", 3)
+            self._copy_workers = install_config.get("copy_workers", DEFAULT_WORKERS)
+            self._country_workers = install_config.get("country_workers", 4)
+            self._stop_on_reboot = install_config.get("detener_si_reinicia", True)
+            self._open_journal(mode_name, apps, install_config.get("retomar_lote", True))
+
+            scheduler = InstallScheduler(
+                apps,
+                max_workers=max_workers,
+                exclusive_lock=self._installer_mutex
+            )
+            self._parallel = scheduler.max_workers > 1
+            self._completed = 0
+            self._active_lanes = []
+
+            self._cache = self._create_cache(config.get("cache_instaladores", {}))
+
+            args_config = config.get("argumentos_silenciosos", {})
+            self._args_store = self._create_args_store(args_config)
+            self._save_args_to_catalog = args_config.get("guardar_en_catalogo", False)
+
+            timing_config = config.get("tiempos_instalacion", {})
+            self._timings = self._create_timings(timing_config)
+            self._default_timeout = timing_config.get("timeout_por_defecto", 120)
+            self._stall_seconds = timing_config.get("sin_actividad_segundos", 180) or None
+            self._auxiliary_timeout = timing_config.get("comandos_auxiliares_segundos", 600) or None
+            self._app_durations = {}
+
+            self._prefetcher = InstallerPrefetcher(
+                self._prefetch_sources(apps, rutas_base),
+                lookahead=install_config.get("prefetch_lookahead", 2),
+                budget_bytes=install_config.get("prefetch_budget_mb", 4096) * 1024 * 1024,
+                stage_func=self._prefetch_stage,
+                discard_func=self._discard_staged,
+            )
+            self._prefetcher.start()
 
-            for index, app in enumerate(apps, start=1):
-                success = self._process_app(app, index, total_apps, rutas_base)
-
-                if success == "success":
-                    success_count += 1
-                elif success == "failed":
-                    failed_count += 1
-                elif success == "skipped":
-                    skipped_count += 1
-
-                self.callbacks["update_progress"](index)
+            results = scheduler.run(
+                lambda app, index: self._process_app(app, index, total_apps, rutas_base),
+                on_done=lambda app, index, result: self._on_app_done(total_apps),
+                on_blocked=self._log_blocked_app,
+                should_stop=self._should_stop,
+            )
+            completed = True
 
-                if "progress_set_value" in self.callbacks:
-                    self.callbacks["progress_set_value"](index, total_apps)
+            success_count = results.count("success")
+            failed_count = results.count("failed")
+            skipped_count = results.count("skipped")
+            cancelled_count = results.count("cancelled")
 
             total_time = time.time() - start_time
+            logger.event(
+                run_events.RUN_SUMMARY,
+                mode=mode_name,
+                total=total_apps,
+                success=success_count,
+                failed=failed_count,
+                skipped=skipped_count,
+                cancelled=cancelled_count,
+                seconds=round(total_time, 2),
+            )
             self._show_final_summary(
                 mode_name,
                 total_apps,
@@ -84,73 +224,323 @@ class Installer:
                 skipped_count,
                 total_time,
                 log_file_path,
+                cancelled_count=cancelled_count,
+                reboot_apps=self._reboot_apps,
+                reboot_stop=self._reboot_stop,
             )
 
         except Exception as e:
             self._show_error(str(e))
         finally:
+            if self._prefetcher:
+                self._prefetcher.stop()
+                self._prefetcher = None
+            # Si el lote no llegó al final (error o cierre) el journal queda
+            # abierto y la próxima ejecución del mismo lote lo retoma
+            if self._journal:
+                if completed:
+                    self._close_journal()
+                else:
+                    self._journal.close()
+            logger.flush()
             self.callbacks["enable_run_button"]()
-    def _process_app(self, app, index, total_apps, rutas_base):
-        """Procesa una aplicación individual"""
 
+    def _open_journal(self, mode_name, apps, enabled):
+        """Abre el journal del lote y registra qué apps se retoman"""
+        self._resumed_apps = set()
+        if not enabled:
+            return
+
+        clear_resume_on_boot()
+        try:
+            self._journal = RunJournal()
+            self._resumed_apps = self._journal.begin(mode_name, apps)
+        except Exception as e:
+            self._journal = None
+            logger.log(f"No se pudo abrir el journal del lote: {e}")
+            return
+
+        if self._resumed_apps:
+            logger.log(
+                f"Se retoma una ejecución anterior de este lote: {len(self._resumed_apps)} "
+                "app(s) ya instaladas no se repetirán"
+            )
+
+    def _close_journal(self):
+        """Cierra el journal según cómo terminó el lote"""
+        try:
+            if self._reboot_stop:
+                self._journal.finish(STATUS_REBOOT)
+                if register_resume_on_boot():
+                    logger.log("El lote continuará automáticamente al iniciar sesión tras el reinicio")
+            elif self._control.cancelled:
+                self._journal.finish(STATUS_CANCELLED)
+            else:
+                self._journal.finish(STATUS_COMPLETED)
+        except Exception as e:
+            logger.log(f"No se pudo cerrar el journal del lote: {e}")
+
+    def _prefetch_sources(self, apps, rutas_base):
+        """Rutas de los instaladores que se copiarán a TEMP, en orden del perfil"""
+        sources = []
+
+        for app in apps:
+            tipo = app.get("tipo", "exe").lower()
+            handler = app.get("special_handler", "").lower()
+
+            if tipo in ["carpeta", "copy_folder"] or app.get("requiere_pais"):
+                continue
+            if app.get("nombre", "Desconocido") in self._resumed_apps:
+                continue
+            if tipo == "special" and handler not in STAGED_HANDLERS:
+                continue
+            if not app.get("copiar_a_temp", True):
+                continue
+
+            base = app.get("base", "")
+            if base in rutas_base:
+                sources.append(os.path.join(rutas_base[base], app.get("ruta", "")))
+
+        return sources
+
+    def _create_cache(self, cache_config):
+        """Crea la caché local de instaladores según config.json"""
+        if not cache_config.get("enabled", True):
+            return None
+
+        try:
+            return InstallerCache(
+                max_bytes=cache_config.get("max_mb", 20480) * 1024 * 1024,
+                verify_sha256=cache_config.get("verify_sha256", False),
+            )
+        except Exception as e:
+            logger.log(f"No se pudo abrir la caché de instaladores: {e}")
+            return None
+
+    def _start_log_rotation(self, rotation_config):
+        """Rota las bitácoras antiguas en segundo plano"""
+        if rotation_config.get("enabled", True) is False:
+            return
+
+        policy = {
+            "max_runs": rotation_config.get("max_ejecuciones", 200),
+            "max_reports": rotation_config.get("max_reportes", 200),
+            "max_age_days": rotation_config.get("max_dias", 90),
+            "max_total_mb": rotation_config.get("max_mb", 500),
+            "keep_uncompressed": rotation_config.get("sin_comprimir", 5),
+        }
+        threading.Thread(
+            target=logger.rotate_logs,
+            kwargs=policy,
+            name="log-rotation",
+            daemon=True,
+        ).start()
+
+    def _create_args_store(self, args_config):
+        """Abre el historial de argumentos silenciosos según config.json"""
+        if not args_config.get("aprendizaje", True):
+            return None
+
+        try:
+            return SilentArgsStore()
+        except Exception as e:
+            logger.log(f"No se pudo abrir el historial de argumentos: {e}")
+            return None
+
+    def _create_timings(self, timing_config):
+        """Abre el historial de duraciones según config.json"""
+        if not timing_config.get("adaptativo", True):
+            return None
+
+        try:
+            return InstallTimingHistory(
+                max_samples=timing_config.get("muestras", 20),
+                factor=timing_config.get("factor", 2.0),
+                minimum=timing_config.get("minimo_segundos", 60),
+                maximum=timing_config.get("maximo_segundos", 7200),
+            )
+        except Exception as e:
+            logger.log(f"No se pudo abrir el historial de duraciones: {e}")
+            return None
+
+    def _command_timeout(self, nombre, default):
+        """Timeout del instalador de `nombre` según su historial"""
+        if not self._timings:
+            return default
+        return self._timings.timeout_for(nombre, default)
+
+    def _prefetch_stage(self, ruta):
+        """Copia de la precarga; registra su throughput como evento"""
+        stats = CopyStats()
+        ruta_local = stage_to_temp(
+            ruta,
+            cache=self._cache,
+            stats=stats,
+            checkpoint=self._control.checkpoint,
+        )
+        stats.stop()
+
+        if stats.bytes_copied or stats.bytes_resumed:
+            logger.event(
+                run_events.STAGE_COPY,
+                source=ruta,
+                prefetch=True,
+                files=stats.files,
+                bytes=stats.bytes_copied,
+                bytes_resumed=stats.bytes_resumed,
+                seconds=round(stats.seconds, 2),
+            )
+        return ruta_local
+
+    def _stage_installer(self, ruta):
+        """Obtiene la copia local del instalador, usando la precarga si existe"""
+        ruta_local = (
+            self._prefetcher.take(ruta, checkpoint=self._control.checkpoint)
+            if self._prefetcher else None
+        )
+        if ruta_local:
+            logger.log("Instalador precargado en segundo plano")
+            return ruta_local
+
+        stats = CopyStats()
+        ruta_local = stage_to_temp(
+            ruta,
+            cache=self._cache,
+            stats=stats,
+            checkpoint=self._control.checkpoint,
+        )
+        self._report_copy(stats.stop())
+        return ruta_local
+
+    def _report_copy(self, stats):
+        """Registra el throughput de una copia en la bitácora y el progreso"""
+        if not (stats.bytes_copied or stats.bytes_resumed or stats.files_skipped or stats.files_deleted):
+            return
+
+        message = f"Copia: {stats.text()}"
+        logger.log(message)
+        logger.event(
+            run_events.STAGE_COPY,
+            app=self._current_app_name(),
+            files=stats.files,
+            bytes=stats.bytes_copied,
+            bytes_resumed=stats.bytes_resumed,
+            bytes_skipped=stats.bytes_skipped,
+            seconds=round(stats.seconds, 2),
+        )
+
+        if "progress_append_log" in self.callbacks:
+            self.callbacks["progress_append_log"](message, "info")
+
+    def _current_app_name(self):
+        return getattr(self._app_local, "nombre", None)
+
+    def _discard_staged(self, ruta_local):
+        """Elimina una copia local que no se usó (las de la caché se conservan)"""
+        if self._cache and self._cache.owns(ruta_local):
+            return
+        remove_staged(ruta_local)
+
+    def _on_app_done(self, total_apps):
+        """Actualiza el progreso global cuando una app termina"""
+        self._completed += 1
+        self.callbacks["update_progress"](self._completed)
+
+        if "progress_set_value" in self.callbacks:
+            self.callbacks["progress_set_value"](self._completed, total_apps)
+
+    def _log_blocked_app(self, app, index, dependency):
+        """Registra una app omitida porque su dependencia no se completó"""
         nombre = app.get("nombre", "Desconocido")
-        tipo = app.get("tipo", "exe").lower()
+        dep_nombre = dependency.get("nombre", "Desconocido")
+
+        logger.log(f"Se omite {nombre}: la dependencia {dep_nombre} no se completó")
+        logger.log("")
+
+        if "progress_append_log" in self.callbacks:
+            self.callbacks["progress_append_log"](
+                f"{nombre}: omitida (depende de {dep_nombre})", "normal"
+            )
+
+    def _enter_lane(self, nombre, index, total_apps):
+        """Registra una app en curso y refresca la vista de progreso"""
+        with self._lanes_lock:
+            self._active_lanes.append(nombre)
+            first = len(self._active_lanes) == 1
+            lanes = list(self._active_lanes)
 
         self.callbacks["set_status"](f"Instalando {index}/{total_apps}: {nombre}")
+        self._refresh_lanes(lanes, total_apps)
+
+        if first and "progress_start_activity" in self.callbacks:
+            self.callbacks["progress_start_activity"]()
+
+    def _exit_lane(self, nombre, total_apps):
+        with self._lanes_lock:
+            if nombre in self._active_lanes:
+                self._active_lanes.remove(nombre)
+            last = not self._active_lanes
+            lanes = list(self._active_lanes)
 
+        if lanes:
+            self._refresh_lanes(lanes, total_apps)
+
+        if last and "progress_stop_activity" in self.callbacks:
+            self.callbacks["progress_stop_activity"]()
+
+    def _refresh_lanes(self, lanes, total_apps):
         if "progress_set_app" in self.callbacks:
-            self.callbacks["progress_set_app"](f"{nombre}")
+            self.callbacks["progress_set_app"](", ".join(lanes))
 
         if "progress_set_status" in self.callbacks:
-            self.callbacks["progress_set_status"](f"Instalando {index} de {total_apps}")
+            self.callbacks["progress_set_status"](
+                f"En curso: {len(lanes)} | Completadas {self._completed} de {total_apps}"
+            )
 
-        if "progress_append_log" in self.callbacks:
-            self.callbacks["progress_append_log"](f"Iniciando instalación de {nombre}", "info")
+    def _process_app(self, app, index, total_apps, rutas_base):
+        """Procesa una aplicación individual"""
 
-        if "progress_start_activity" in self.callbacks:
-            self.callbacks["progress_start_activity"]()
+        nombre = app.get("nombre", "Desconocido")
+        tipo = app.get("tipo", "exe").lower()
 
-        logger.log(f"[{index}/{total_apps}] Procesando: {nombre}")
+        if nombre in self._resumed_apps:
+            return self._skip_resumed_app(nombre, index, total_apps)
 
-        try:
-            if tipo == "special":
-                result = self._process_special_app(app, rutas_base)
+        # Ya en cola del pool cuando se canceló o se inició un reinicio
+        if self._should_stop():
+            return "cancelled"
 
-            elif app.get("requiere_pais"):
-                result = self._process_country_app(app, rutas_base)
+        self._enter_lane(nombre, index, total_apps)
 
-            else:
-                base = app.get("base", "")
-                ruta_relativa = app.get("ruta", "")
-                args = app.get("args", "")
-                post = app.get("post", "")
-                post_cmd = app.get("post_cmd", "")
-                copiar_a_temp = app.get("copiar_a_temp", True)
-
-                if tipo in ["carpeta", "copy_folder"]:
-                    ruta = self._build_path(base, ruta_relativa, rutas_base)
-                    if not ruta:
-                        result = "skipped"
-                    else:
-                        logger.log(f"Ruta origen: {ruta}")
-
-                        if not self._check_source_access(ruta):
-                            result = "skipped"
-                        else:
-                            result = self._install_folder(app, ruta)
-                else:
-                    ruta = self._build_path(base, ruta_relativa, rutas_base)
-                    if not ruta:
-                        result = "skipped"
-                    else:
-                        logger.log(f"Ruta de red: {ruta}")
-
-                        if not self._check_source_access(ruta):
-                            result = "skipped"
-                        else:
-                            result = self._install_executable(
-                                app, ruta, tipo, args, post, post_cmd, copiar_a_temp
-                            )
+        if "progress_append_log" in self.callbacks:
+            self.callbacks["progress_append_log"](f"Iniciando instalación de {nombre}", "info")
+
+        started = time.time()
+        result = "failed"
+        logger.event(run_events.APP_START, app=nombre, index=index, total=total_apps, tipo=tipo)
+
+        try:
+            expected = self._timings.expected(nombre) if self._timings else None
+            self._app_local.seconds = 0.0
+            self._app_local.nombre = nombre
+            self._app_local.reboot = None
+            self._journal_call("app_started", nombre)
+
+            with logger.lane(nombre if self._parallel else None):
+                logger.log(f"[{index}/{total_apps}] Procesando: {nombre}")
+                try:
+                    self._control.checkpoint()
+                    result = self._dispatch_app(app, tipo, rutas_base)
+                except InstallCancelled:
+                    result = "cancelled"
+                    logger.log(f"Instalación cancelada: {nombre}")
+                    logger.log("")
+
+            self._record_duration(nombre, result, expected, self._app_local.seconds)
+            reboot = self._app_local.reboot if result == "success" else None
+            self._journal_call("record", nombre, result, reboot=reboot)
+            if reboot:
+                self._note_reboot(nombre, reboot)
 
             if "progress_append_log" in self.callbacks:
                 if result == "success":
@@ -159,12 +549,112 @@ class Installer:
                     self.callbacks["progress_append_log"](f"{nombre}: instalación fallida", "error")
                 elif result == "skipped":
                     self.callbacks["progress_append_log"](f"{nombre}: instalación omitida", "normal")
+                elif result == "cancelled":
+                    self.callbacks["progress_append_log"](f"{nombre}: instalación cancelada", "error")
 
             return result
 
         finally:
-            if "progress_stop_activity" in self.callbacks:
-                self.callbacks["progress_stop_activity"]()
+            logger.event(
+                run_events.APP_END,
+                app=nombre,
+                result=result,
+                seconds=round(time.time() - started, 2),
+                install_seconds=round(self._app_local.seconds, 2),
+            )
+            self._app_local.nombre = None
+            self._exit_lane(nombre, total_apps)
+
+    def _should_stop(self):
+        """True si no deben iniciarse más apps (cancelación o reinicio en curso)"""
+        return self._control.cancelled or self._reboot_stop
+
+    def _journal_call(self, method, *args, **kwargs):
+        """Escribe en el journal; un error de disco no detiene la instalación"""
+        if not self._journal:
+            return
+        try:
+            getattr(self._journal, method)(*args, **kwargs)
+        except Exception as e:
+            logger.log(f"No se pudo escribir en el journal del lote: {e}")
+
+    def _note_reboot(self, nombre, code):
+        """
+        Registra que `nombre` pidió reinicio. Con 1641 el instalador ya
+        inició el reinicio: no se empiezan más apps y el lote queda
+        pendiente para continuar al volver a abrir la aplicación.
+        """
+        self._reboot_apps[nombre] = code
+
+        if code == REBOOT_INITIATED and self._stop_on_reboot:
+            self._reboot_stop = True
+            logger.log(f"{nombre} inició un reinicio del equipo (code {code}). No se iniciarán más aplicaciones.")
+        else:
+            logger.log(f"{nombre} requiere reiniciar el equipo (code {code}).")
+
+        if "progress_append_log" in self.callbacks:
+            self.callbacks["progress_append_log"](f"{nombre}: requiere reinicio", "info")
+
+    def _skip_resumed_app(self, nombre, index, total_apps):
+        """App que ya terminó bien en una ejecución anterior del mismo lote"""
+        logger.log(f"[{index}/{total_apps}] {nombre}: ya instalada en la ejecución anterior, se omite")
+        logger.log("")
+        logger.event(run_events.APP_END, app=nombre, result="success", seconds=0, resumed=True)
+
+        if "progress_append_log" in self.callbacks:
+            self.callbacks["progress_append_log"](f"{nombre}: ya instalada (se retoma el lote)", "success")
+
+        return "success"
+
+    def _record_duration(self, nombre, result, expected, seconds):
+        """Guarda la duración real del instalador para el resumen y el historial"""
+        if seconds <= 0:
+            return
+
+        self._app_durations[nombre] = (expected, seconds)
+
+        if result == "success" and self._timings:
+            self._timings.record(nombre, seconds)
+
+    def _dispatch_app(self, app, tipo, rutas_base):
+        """Ejecuta la lógica correspondiente al tipo de la aplicación"""
+        if tipo == "special":
+            return self._process_special_app(app, rutas_base)
+
+        if app.get("requiere_pais"):
+            return self._process_country_app(app, rutas_base)
+
+        base = app.get("base", "")
+        ruta_relativa = app.get("ruta", "")
+        args = app.get("args", "")
+        post = app.get("post", "")
+        post_cmd = app.get("post_cmd", "")
+        copiar_a_temp = app.get("copiar_a_temp", True)
+
+        if tipo in ["carpeta", "copy_folder"]:
+            ruta = self._build_path(base, ruta_relativa, rutas_base)
+            if not ruta:
+                return "skipped"
+
+            logger.log(f"Ruta origen: {ruta}")
+
+            if not self._check_source_access(ruta):
+                return "skipped"
+
+            return self._install_folder(app, ruta)
+
+        ruta = self._build_path(base, ruta_relativa, rutas_base)
+        if not ruta:
+            return "skipped"
+
+        logger.log(f"Ruta de red: {ruta}")
+
+        if not self._check_source_access(ruta):
+            return "skipped"
+
+        return self._install_executable(
+            app, ruta, tipo, args, post, post_cmd, copiar_a_temp
+        )
 
     def _process_country_app(self, app, rutas_base):
         """Procesa aplicaciones que requieren uno o varios países"""
@@ -183,53 +673,66 @@ class Installer:
             logger.log("")
             return "failed"
 
-        hubo_error = False
-        hubo_exito = False
+        lane = logger.current_lane()
 
-        for pais in paises:
-            logger.log(f"Procesando país: {pais}")
+        def run_country(pais):
+            self._app_local.nombre = nombre
+            # Cada país escribe su sección completa en la bitácora al terminar
+            with logger.lane(lane), logger.section():
+                return self._process_country(app, pais, paises_config, rutas_base)
 
-            config_pais = paises_config.get(pais)
-            if not config_pais:
-                logger.log(f"No existe configuración para {nombre} - {pais}")
-                logger.log("")
-                hubo_error = True
-                continue
+        workers = max(1, min(len(paises), self._country_workers))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pais") as pool:
+            results = list(pool.map(run_country, paises))
 
-            origen = config_pais.get("origen", "").strip()
-            destino = config_pais.get("destino", "").strip()
+        hubo_exito = "success" in results
+        hubo_error = any(result != "success" for result in results)
 
-            if not origen or not destino:
-                logger.log(f"Configuración incompleta para {nombre} - {pais}")
-                logger.log("")
-                hubo_error = True
-                continue
+        if hubo_exito and hubo_error:
+            return "failed"
 
-            ruta_origen = self._resolve_country_source(origen, rutas_base)
+        if hubo_exito:
+            return "success"
 
-            logger.log(f"Origen [{pais}]: {ruta_origen}")
-            logger.log(f"Destino [{pais}]: {destino}")
+        return "failed"
 
-            if not self._check_source_access(ruta_origen):
-                hubo_error = True
-                continue
+    def _process_country(self, app, pais, paises_config, rutas_base):
+        """Copia la carpeta de un país; retorna success o failed"""
+        nombre = app.get("nombre", "Desconocido")
+        self._control.checkpoint()
+        logger.log(f"Procesando país: {pais}")
 
-            result = self._copy_folder(ruta_origen, destino)
+        config_pais = paises_config.get(pais)
+        if not config_pais:
+            logger.log(f"No existe configuración para {nombre} - {pais}")
+            logger.log("")
+            return "failed"
 
-            if result == "success":
-                hubo_exito = True
-            else:
-                hubo_error = True
+        origen = config_pais.get("origen", "").strip()
+        destino = config_pais.get("destino", "").strip()
 
+        if not origen or not destino:
+            logger.log(f"Configuración incompleta para {nombre} - {pais}")
             logger.log("")
+            return "failed"
 
-        if hubo_exito and hubo_error:
+        ruta_origen = self._resolve_country_source(origen, rutas_base)
+
+        logger.log(f"Origen [{pais}]: {ruta_origen}")
+        logger.log(f"Destino [{pais}]: {destino}")
+
+        if not self._check_source_access(ruta_origen):
             return "failed"
 
-        if hubo_exito:
-            return "success"
+        result = self._copy_folder(
+            ruta_origen,
+            destino,
+            modo=config_pais.get("modo_copia", app.get("modo_copia", "reemplazar")),
+            comparar_hash=config_pais.get("comparar_hash", app.get("comparar_hash", False)),
+        )
 
-        return "failed"
+        logger.log("")
+        return "success" if result == "success" else "failed"
 
     def _build_path(self, base, ruta_relativa, rutas_base):
         """Construye la ruta final a partir de base + ruta relativa"""
@@ -281,28 +784,60 @@ class Installer:
             logger.log("")
             return "failed"
 
-        return self._copy_folder(ruta_origen, destino)
+        return self._copy_folder(
+            ruta_origen,
+            destino,
+            modo=app.get("modo_copia", "reemplazar"),
+            comparar_hash=app.get("comparar_hash", False),
+        )
+
+    def _copy_folder(self, origen, destino, modo="reemplazar", comparar_hash=False):
+        """
+        Copia una carpeta completa al destino.
 
-    def _copy_folder(self, origen, destino):
-        """Copia una carpeta completa al destino"""
+        modo="reemplazar" (por defecto) reemplaza el destino por una copia
+        nueva; modo="incremental" solo transfiere archivos nuevos o
+        modificados y elimina los que ya no existen en origen.
+        """
         if not os.path.exists(origen):
             logger.log(f"Carpeta origen no encontrada: {origen}")
             logger.log("")
             return "skipped"
 
         try:
-            logger.log("Copiando carpeta...")
-
             parent_dir = os.path.dirname(destino)
             if parent_dir:
                 os.makedirs(parent_dir, exist_ok=True)
 
+            if modo == "incremental":
+                logger.log("Sincronizando carpeta (modo incremental)...")
+                stats = sync_tree(
+                    origen,
+                    destino,
+                    use_hash=comparar_hash,
+                    workers=self._copy_workers,
+                    checkpoint=self._control.checkpoint
+                )
+                self._report_copy(stats)
+                logger.log(f"Carpeta sincronizada correctamente en {destino}")
+                self._control.checkpoint()
+                self._grant_folder_permissions(destino)
+                return "success"
+
+            logger.log("Copiando carpeta...")
+
             if os.path.exists(destino):
-                logger.log("Carpeta existente detectada, eliminando versión previa...")
-                shutil.rmtree(destino)
+                logger.log("Carpeta existente detectada, se reemplazará al terminar la copia...")
 
-            shutil.copytree(origen, destino)
+            stats = copy_tree(
+                origen,
+                destino,
+                workers=self._copy_workers,
+                checkpoint=self._control.checkpoint
+            )
+            self._report_copy(stats)
             logger.log(f"Carpeta copiada correctamente a {destino}")
+            self._control.checkpoint()
             self._grant_folder_permissions(destino)
             return "success"
 
@@ -326,7 +861,7 @@ class Installer:
         if copiar_a_temp:
             try:
                 logger.log("Copiando instalador a carpeta temporal...")
-                ruta_local = stage_to_temp(ruta)
+                ruta_local = self._stage_installer(ruta)
                 ruta_ejecucion = ruta_local
                 logger.log(f"Ruta local: {ruta_local}")
             except Exception as e:
@@ -336,28 +871,37 @@ class Installer:
         else:
             logger.log("Ejecutando desde la ubicación original")
 
-        # IMPORTANTE: siempre asignar install_success aquí
-        install_success = self._run_installer(ruta_ejecucion, tipo, args, nombre, app)
+        try:
+            self._control.checkpoint()
 
-        if not install_success:
-            self._cleanup_temp(ruta_local)
-            logger.log("")
-            return "failed"
+            # IMPORTANTE: siempre asignar install_success aquí
+            install_success = self._run_installer(ruta_ejecucion, tipo, args, nombre, app)
+
+            if not install_success:
+                self._cleanup_temp(ruta_local)
+                logger.log("")
+                return "failed"
 
-        if post:
-            self._apply_reg_file(post)
+            if post:
+                self._control.checkpoint()
+                self._apply_reg_file(post)
 
-        if post_cmd:
-            self._run_post_command(post_cmd)
+            if post_cmd:
+                self._control.checkpoint()
+                self._run_post_command(post_cmd)
+        except InstallCancelled:
+            self._cleanup_temp(ruta_local)
+            raise
 
         self._cleanup_temp(ruta_local)
 
         logger.log("")
         return "success"
     
-    def _get_silent_candidates(self, app, installer_path=None):
+    def _get_silent_candidates(self, app, installer_path=None, engine=None):
         """
         Devuelve candidatos silenciosos según el motor detectado.
+        Si ya se conoce el motor se reutiliza en lugar de volver a detectarlo.
         """
         nombre = (app.get("nombre") or "").lower()
         ruta = (app.get("ruta") or "").lower()
@@ -389,7 +933,8 @@ class Installer:
                 "/silent",
             ]
 
-        engine = self._detect_installer_engine(installer_path or "")
+        if engine is None:
+            engine = self._detect_installer_engine(installer_path or "")
 
         if engine == "inno":
             return [
@@ -423,68 +968,212 @@ class Installer:
         ]
         
 
-    def _run_command_with_timeout(self, command, timeout=120):
+    def _run_install_command(self, command, timeout=None, cwd=None, hidden=False, args=None, msi_log=None,
+                             stall=True):
         """
-        Ejecuta un comando y mata el árbol completo si se excede el tiempo.
+        Ejecuta un instalador reteniendo el mutex de instalación, de modo que
+        solo un msiexec / setup corre a la vez aunque la copia sea paralela.
+        El tiempo de los intentos exitosos se acumula para la app del hilo
+        actual (es la base del historial del que sale el timeout).
+
+        Con stall=False no se aplica el corte por inactividad: ODT, MSI, SQL
+        y SSMS hacen el trabajo en servicios (OfficeClickToRun, msiexec del
+        sistema) fuera del árbol de procesos que mide el detector.
+
+        La salida del proceso (y el log verboso de msiexec, si se indica
+        `msi_log`) se sigue mientras corre; las líneas de error detectadas
+        quedan en la bitácora y en el evento del intento.
         """
-        try:
-            process = subprocess.Popen(command, shell=True)
+        self._control.checkpoint()
 
+        with self._installer_mutex:
+            output, pending = self._output_collector()
+            tail = LogFileTail(msi_log, output.add).start() if msi_log else None
+            start = time.time()
+            code, timed_out = -1, False
             try:
-                process.wait(timeout=timeout)
-                return process.returncode, False
+                code, timed_out = self.command_runner(
+                    command,
+                    timeout=timeout,
+                    cwd=cwd,
+                    hidden=hidden,
+                    stall_seconds=self._stall_seconds if stall else None,
+                    on_output=output.add,
+                )
+                if self._control.cancelled:
+                    raise InstallCancelled()
+                if code in REBOOT_CODES:
+                    self._app_local.reboot = code
+                return code, timed_out
+            finally:
+                if tail:
+                    tail.stop()
+                for message in pending:
+                    logger.log(message)
+                elapsed = time.time() - start
+                if code in (0, 1641, 3010) and not timed_out:
+                    self._app_local.seconds = getattr(self._app_local, "seconds", 0.0) + elapsed
+                logger.event(
+                    run_events.ATTEMPT,
+                    app=self._current_app_name(),
+                    command=command,
+                    args=args,
+                    exit_code=code,
+                    timed_out=timed_out,
+                    timeout=timeout,
+                    seconds=round(elapsed, 2),
+                    output_lines=output.line_count,
+                    errors=output.errors,
+                )
 
-            except subprocess.TimeoutExpired:
-                logger.log(f"Tiempo excedido ({timeout}s). Intentando finalizar árbol de procesos...")
+    def _output_collector(self):
+        """
+        Colector de salida para un intento. Las líneas llegan desde otros
+        hilos: se registran al momento con el prefijo de la app, salvo que
+        el hilo actual esté agrupando una sección; en ese caso se guardan
+        (acotadas por el colector) y se registran al terminar el intento.
+        """
+        lane = logger.current_lane()
+        pending = [] if logger.is_buffering() else None
 
-                try:
-                    subprocess.run(
-                        ["taskkill", "/PID", str(process.pid), "/T", "/F"],
-                        capture_output=True,
-                        text=True,
-                        shell=False
-                    )
-                except Exception as e:
-                    logger.log(f"No se pudo cerrar el árbol del proceso: {e}")
+        def emit(message):
+            if pending is not None:
+                pending.append(message)
+                return
+            with logger.lane(lane):
+                logger.log(message)
 
-                return -999, True
+        return OutputCollector(emit), pending if pending is not None else ()
 
-        except Exception as e:
-            logger.log(f"Error ejecutando comando: {e}")
-            return -1, False
+    def _run_command_with_timeout(self, command, timeout=120, cwd=None, hidden=False, stall_seconds=None,
+                                  on_output=None):
+        """
+        Ejecuta un comando en el ProcessRunner y mata el árbol completo si se
+        excede el tiempo o si el árbol de procesos deja de mostrar actividad
+        durante `stall_seconds`. Con timeout=None y sin detector espera sin
+        límite. Con `on_output` la salida estándar y de error se entrega
+        línea por línea mientras el proceso corre, como on_output(fuente, línea).
+        """
+        result = self._processes.run(
+            command,
+            timeout=timeout,
+            cwd=cwd,
+            hidden=hidden,
+            stall_seconds=stall_seconds,
+            on_output=on_output,
+        )
+
+        if result.stalled:
+            logger.log(
+                f"El instalador no mostró actividad durante {stall_seconds}s. "
+                "Se finalizó el árbol de procesos."
+            )
+        elif result.timed_out:
+            logger.log(f"Tiempo excedido ({timeout}s). Se finalizó el árbol de procesos.")
+        elif result.cancelled:
+            logger.log("Ejecución cancelada. Se finalizó el árbol de procesos.")
+        elif result.error:
+            logger.log(f"Error ejecutando comando: {result.error}")
+
+        return result.returncode, result.timed_out
+
+    def _run_auxiliary_command(self, command):
+        """
+        Ejecuta un comando auxiliar (reg import, icacls, post_cmd) en el
+        ProcessRunner, con el tiempo límite de comandos auxiliares.
+        """
+        self._control.checkpoint()
+        result = self._processes.run(command, timeout=self._auxiliary_timeout, hidden=True)
+        if result.timed_out:
+            logger.log(f"Tiempo excedido ({self._auxiliary_timeout}s) en: {command}")
+        elif result.error:
+            logger.log(f"Error ejecutando comando: {result.error}")
+        return result
 
     def _try_exe_silent_install(self, app, ruta_ejecucion, nombre):
         """
-        Prueba argumentos silenciosos según el motor detectado.
+        Prueba argumentos silenciosos según el motor detectado, empezando por
+        los que ya funcionaron antes con el mismo instalador.
         """
         engine = self._detect_installer_engine(ruta_ejecucion)
-        candidates = self._get_silent_candidates(app, ruta_ejecucion)
+        candidates = self._get_silent_candidates(app, ruta_ejecucion, engine=engine)
 
         logger.log(f"Motor detectado: {engine}")
+        logger.event(run_events.ENGINE_DETECTED, app=nombre, engine=engine, installer=ruta_ejecucion)
         logger.log("No se definieron argumentos. Se probarán parámetros compatibles...")
 
+        fingerprint = None
+        if self._args_store:
+            try:
+                fingerprint = self._args_store.fingerprint(ruta_ejecucion)
+            except Exception as e:
+                logger.log(f"No se pudo identificar el instalador: {e}")
+
+            candidates = self._args_store.rank(fingerprint, engine, candidates)
+            if fingerprint and self._args_store.known_winner(fingerprint) is not None:
+                logger.log("Se usarán primero los argumentos que funcionaron en instalaciones anteriores")
+
         for index, candidate in enumerate(candidates, start=1):
             args_label = candidate if candidate else "[sin argumentos]"
             logger.log(f"Intento {index}/{len(candidates)} con argumentos: {args_label}")
 
             command = f'"{ruta_ejecucion}" {candidate}'.strip()
-            code, timed_out = self._run_command_with_timeout(command, timeout=120)
+            code, timed_out = self._run_install_command(
+                command,
+                timeout=self._command_timeout(nombre, self._default_timeout),
+                args=candidate
+            )
 
             if timed_out:
+                self._record_args_result(fingerprint, engine, nombre, candidate, "timeout")
                 logger.log("El instalador excedió el tiempo permitido. Se probará el siguiente conjunto.")
                 continue
 
             if code in (0, 1641, 3010):
+                self._record_args_result(fingerprint, engine, nombre, candidate, "ok")
                 logger.log(f"Instalación completada con argumentos: {args_label}")
                 app["args"] = candidate
+                self._save_learned_args(app, candidate)
                 return True
 
+            self._record_args_result(fingerprint, engine, nombre, candidate, "fail")
             logger.log(f"El intento finalizó con código {code}. Se probará el siguiente conjunto.")
 
         logger.log(f"No se encontró un conjunto de argumentos funcional para {nombre}.")
         logger.log("Este programa probablemente requiere argumentos específicos o instalación manual.")
         return False
 
+    def _record_args_result(self, fingerprint, engine, nombre, candidate, result):
+        if not self._args_store:
+            return
+        try:
+            self._args_store.record(fingerprint, engine, nombre, candidate, result)
+        except Exception as e:
+            logger.log(f"No se pudo guardar el historial de argumentos: {e}")
+
+    def _save_learned_args(self, app, args):
+        """
+        Guarda en el catálogo los argumentos que funcionaron, solo si la app
+        existe allí sin argumentos definidos.
+        """
+        if not (self.catalog and self._save_args_to_catalog and args):
+            return
+
+        nombre = app.get("nombre")
+        try:
+            with self._catalog_lock:
+                entry = next(
+                    (item for item in self.catalog.get_apps() if item.get("nombre") == nombre),
+                    None
+                )
+                if entry is None or (entry.get("args") or "").strip():
+                    return
+
+                if self.catalog.update_app_by_name(nombre, dict(entry, args=args)):
+                    logger.log(f"Argumentos guardados en el catálogo para {nombre}: {args}")
+        except Exception as e:
+            logger.log(f"No se pudieron guardar los argumentos en el catálogo: {e}")
+
     def _run_installer(self, ruta_ejecucion, tipo, args, nombre, app=None):
         """Ejecuta el instalador y retorna True si tiene éxito"""
         try:
@@ -496,8 +1185,19 @@ class Installer:
                 )
                 comando = f'msiexec /i "{ruta_ejecucion}" /qn /norestart /l*v "{msi_log}" {args}'.strip()
                 logger.log(f"Log MSI: {msi_log}")
-                result = hidden_run(comando, shell=True)
-                code = result.returncode
+                # Un log de una instalación anterior no debe leerse como propio
+                try:
+                    os.remove(msi_log)
+                except OSError:
+                    pass
+                code, _ = self._run_install_command(
+                    comando,
+                    timeout=self._command_timeout(nombre, None),
+                    hidden=True,
+                    args=args,
+                    msi_log=msi_log,
+                    stall=False
+                )
 
                 if code not in (0, 1641, 3010):
                     logger.log(f"Error al instalar {nombre} (code {code})")
@@ -511,7 +1211,11 @@ class Installer:
             # Si ya viene args definido, respetarlo
             if args and args.strip():
                 command = f'"{ruta_ejecucion}" {args}'.strip()
-                code, timed_out = self._run_command_with_timeout(command, timeout=120)
+                code, timed_out = self._run_install_command(
+                    command,
+                    timeout=self._command_timeout(nombre, self._default_timeout),
+                    args=args
+                )
 
                 if timed_out:
                     logger.log(f"El instalador excedió el tiempo permitido: {nombre}")
@@ -539,8 +1243,11 @@ class Installer:
 
         if os.path.exists(reg_path):
             logger.log("Aplicando configuración adicional (.reg)...")
-            hidden_run(f'reg import "{reg_path}"', shell=True)
-            logger.log("Configuración adicional aplicada")
+            result = self._run_auxiliary_command(f'reg import "{reg_path}"')
+            if result.ok:
+                logger.log("Configuración adicional aplicada")
+            else:
+                logger.log(f"reg import finalizó con code {result.returncode}")
         else:
             logger.log(f"Archivo .reg no encontrado: {reg_path}")
 
@@ -548,7 +1255,7 @@ class Installer:
         """Ejecuta un comando post-instalación"""
         logger.log("Ejecutando comando posterior a la instalación...")
         try:
-            result = hidden_run(post_cmd, shell=True)
+            result = self._run_auxiliary_command(post_cmd)
             if result.returncode == 0:
                 logger.log("Post-comando ejecutado correctamente")
             else:
@@ -558,10 +1265,14 @@ class Installer:
 
     def _cleanup_temp(self, ruta_local):
         """Limpia archivos temporales"""
+        if self._cache and self._cache.owns(ruta_local):
+            return
+
         if ruta_local:
             try:
-                if os.path.exists(ruta_local):
-                    os.remove(ruta_local)
+                existed = os.path.exists(ruta_local)
+                remove_staged(ruta_local)
+                if existed:
                     logger.log("Archivo temporal eliminado")
             except Exception as e:
                 logger.log(f"No se pudo eliminar el instalador temporal: {e}")
@@ -591,6 +1302,9 @@ class Installer:
         skipped_count,
         total_time,
         log_path,
+        cancelled_count=0,
+        reboot_apps=None,
+        reboot_stop=False,
     ):
         """Muestra el resumen final"""
         logger.log("=" * 70)
@@ -601,7 +1315,19 @@ class Installer:
         logger.log(f"Instaladas correctamente: {success_count}")
         logger.log(f"Fallidas: {failed_count}")
         logger.log(f"Omitidas: {skipped_count}")
+        if cancelled_count:
+            label = "Pendientes por reinicio" if reboot_stop else "Canceladas"
+            logger.log(f"{label}: {cancelled_count}")
+        if reboot_apps:
+            logger.log(f"Requieren reinicio: {', '.join(reboot_apps)}")
         logger.log(f"Tiempo total: {total_time:.2f} segundos")
+        if self._cache:
+            logger.log(self._cache.stats_text())
+        duration_lines = self._duration_lines()
+        if duration_lines:
+            logger.log("Duración de instaladores (esperada / real):")
+            for line in duration_lines:
+                logger.log(f"  {line}")
         logger.log(f"Bitácora: {log_path}")
         logger.log("=" * 70)
 
@@ -611,12 +1337,35 @@ class Installer:
             f"Instaladas correctamente: {success_count}\n"
             f"Fallidas: {failed_count}\n"
             f"Omitidas: {skipped_count}\n"
-            f"Tiempo total: {total_time:.2f} segundos\n"
-            f"Bitácora guardada en:\n{log_path}"
         )
+        if cancelled_count:
+            label = "Pendientes por reinicio" if reboot_stop else "Canceladas"
+            summary += (
+                f"{label}: {cancelled_count}\n"
+                "(al volver a ejecutar este lote se continuará desde la primera app sin terminar)\n"
+            )
+        if reboot_apps:
+            summary += f"Requieren reinicio: {', '.join(reboot_apps)}\n"
+        summary += f"Tiempo total: {total_time:.2f} segundos\n"
+        if duration_lines:
+            summary += "\nDuración de instaladores (esperada / real):\n"
+            summary += "".join(f"  {line}\n" for line in duration_lines)
+        summary += f"Bitácora guardada en:\n{log_path}"
 
         self.callbacks["show_summary"](summary)
 
+    def _duration_lines(self):
+        """Líneas 'app: esperado vs real' para el resumen"""
+        lines = []
+        for nombre, (expected, actual) in self._app_durations.items():
+            if expected:
+                lines.append(
+                    f"{nombre}: ~{expected['p50']:.0f} s (p95 {expected['p95']:.0f} s) / {actual:.0f} s"
+                )
+            else:
+                lines.append(f"{nombre}: sin historial / {actual:.0f} s")
+        return lines
+
     def _show_error(self, error_msg):
         """Muestra un error"""
         self.callbacks["set_status"]("Error durante la instalación")
@@ -634,7 +1383,7 @@ class Installer:
                 return False
 
             cmd = f'icacls "{path}" /grant Users:(OI)(CI)F /T /C'
-            result = hidden_run(cmd, shell=True)
+            result = self._run_auxiliary_command(cmd)
 
             if result.returncode == 0:
                 logger.log(f"Permisos otorgados correctamente a: {path}")
@@ -692,14 +1441,19 @@ class Installer:
         try:
             logger.log("Iniciando instalación de Office con ODT...")
             command = f'"{setup_path}" /configure "{xml_path}"'
-            result = subprocess.run(command, shell=True, cwd=office_dir)
+            code, _ = self._run_install_command(
+                command,
+                timeout=self._command_timeout(app.get("nombre", ""), None),
+                cwd=office_dir,
+                stall=False
+            )
 
-            if result.returncode == 0:
+            if code == 0:
                 logger.log("Office instalado correctamente con ODT")
                 logger.log("")
                 return "success"
 
-            logger.log(f"La instalación de Office finalizó con código {result.returncode}")
+            logger.log(f"La instalación de Office finalizó con código {code}")
             logger.log("")
             return "failed"
 
@@ -782,7 +1536,7 @@ class Installer:
         if copiar_a_temp:
             try:
                 logger.log("Copiando instalador SQL Express a carpeta temporal...")
-                ruta_local = stage_to_temp(ruta)
+                ruta_local = self._stage_installer(ruta)
                 ruta_ejecucion = ruta_local
                 logger.log(f"Ruta local SQL Express: {ruta_local}")
             except Exception as e:
@@ -803,24 +1557,28 @@ class Installer:
 
         try:
             logger.log("Iniciando instalación silenciosa de SQL Server Express...")
-            result = subprocess.run(comando, shell=True)
+            code, _ = self._run_install_command(
+                comando,
+                timeout=self._command_timeout(app.get("nombre", ""), None),
+                stall=False
+            )
 
-            if result.returncode in (0, 1641, 3010):
+            if code in (0, 1641, 3010):
                 logger.log("SQL Server Express instalado correctamente.")
                 logger.log("")
-                self._cleanup_temp(ruta_local)
                 return "success"
 
-            logger.log(f"La instalación de SQL Express finalizó con código {result.returncode}")
+            logger.log(f"La instalación de SQL Express finalizó con código {code}")
             logger.log("")
-            self._cleanup_temp(ruta_local)
             return "failed"
 
         except Exception as e:
             logger.log(f"Error instalando SQL Express: {e}")
             logger.log("")
-            self._cleanup_temp(ruta_local)
             return "failed"
+        finally:
+            # También al cancelar (InstallCancelled no es Exception)
+            self._cleanup_temp(ruta_local)
         
     def _install_ssms_silent(self, app, rutas_base):
         base = app.get("base", "")
@@ -842,7 +1600,7 @@ class Installer:
         if copiar_a_temp:
             try:
                 logger.log("Copiando instalador SSMS a carpeta temporal...")
-                ruta_local = stage_to_temp(ruta)
+                ruta_local = self._stage_installer(ruta)
                 ruta_ejecucion = ruta_local
                 logger.log(f"Ruta local SSMS: {ruta_local}")
             except Exception as e:
@@ -854,51 +1612,33 @@ class Installer:
 
         try:
             logger.log("Iniciando instalación silenciosa de SSMS...")
-            result = subprocess.run(comando, shell=True)
+            code, _ = self._run_install_command(
+                comando,
+                timeout=self._command_timeout(app.get("nombre", ""), None),
+                stall=False
+            )
 
-            if result.returncode in (0, 1641, 3010):
+            if code in (0, 1641, 3010):
                 logger.log("SSMS instalado correctamente.")
                 logger.log("")
-                self._cleanup_temp(ruta_local)
                 return "success"
 
-            logger.log(f"La instalación de SSMS finalizó con código {result.returncode}")
+            logger.log(f"La instalación de SSMS finalizó con código {code}")
             logger.log("")
-            self._cleanup_temp(ruta_local)
             return "failed"
 
         except Exception as e:
             logger.log(f"Error instalando SSMS: {e}")
             logger.log("")
-            self._cleanup_temp(ruta_local)
             return "failed"
+        finally:
+            # También al cancelar (InstallCancelled no es Exception)
+            self._cleanup_temp(ruta_local)
 
 
     def _detect_installer_engine(self, installer_path):
         """
         Intenta detectar el motor del instalador leyendo strings del binario.
-        Retorna: inno, nsis, installshield, msi, unknown
+        Retorna: inno, nsis, installshield, burn, msi, unknown
         """
-        path_lower = installer_path.lower()
-
-        if path_lower.endswith(".msi"):
-            return "msi"
-
-        try:
-            with open(installer_path, "rb") as f:
-                data = f.read(2 * 1024 * 1024)  # leer hasta 2 MB
-            text = data.decode("latin1", errors="ignore").lower()
-
-            if "inno setup" in text:
-                return "inno"
-            if "nullsoft install system" in text or "nsis" in text:
-                return "nsis"
-            if "installshield" in text:
-                return "installshield"
-            if "wix burn" in text or "burn engine" in text:
-                return "burn"
-
-        except Exception:
-            pass
-
-        return "unknown"
\ No newline at end of file
+        return detect_installer_engine(installer_path)
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import socket
+import sqlite3
+import threading
+from datetime import datetime
+
+from core import run_events
+from core.log_rotation import existing_variant, open_text, strip_gz
+
+INDEX_NAME = "index.sqlite3"
+PAGE_SIZE = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    log_path TEXT UNIQUE NOT NULL,
+    mode TEXT,
+    machine TEXT,
+    started TEXT,
+    total INTEGER,
+    success INTEGER,
+    failed INTEGER,
+    skipped INTEGER,
+    seconds REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started);
+CREATE INDEX IF NOT EXISTS idx_runs_machine ON runs(machine);
+
+CREATE TABLE IF NOT EXISTS apps (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    app TEXT,
+    result TEXT,
+    started TEXT,
+    seconds REAL
+);
+CREATE INDEX IF NOT EXISTS idx_apps_app ON apps(app COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_apps_result ON apps(result);
+CREATE INDEX IF NOT EXISTS idx_apps_run ON apps(run_id);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Resumen de bitácoras antiguas (sin .jsonl)
+_SUMMARY_PATTERNS = {
+    "mode": re.compile(r"Modo ejecutado: (.*)$"),
+    "total": re.compile(r"Total de aplicaciones: (\d+)"),
+    "success": re.compile(r"Instaladas correctamente: (\d+)"),
+    "failed": re.compile(r"Fallidas: (\d+)"),
+    "skipped": re.compile(r"Omitidas: (\d+)"),
+    "seconds": re.compile(r"Tiempo total: ([\d.]+) segundos"),
+}
+_FILE_TIMESTAMP = re.compile(r"_(\d{8}_\d{6})\.log$")
+
+
+class LogIndex:
+    """
+    Índice SQLite de las ejecuciones guardadas en la carpeta de logs.
+
+    Se actualiza a medida que se escriben los eventos de cada ejecución
+    (inicio, fin de cada app y resumen), de modo que buscar por app,
+    resultado, fecha o equipo y obtener la última bitácora son consultas
+    indexadas que no dependen de cuántos archivos haya en la carpeta.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.db_path = os.path.join(folder, INDEX_NAME)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL: las búsquedas de la Bitácora no bloquean las escrituras del
+        # hilo de instalación (y viceversa)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ===== escritura incremental =====
+    def start_run(self, log_path, mode, started=None, machine=None):
+        with self._lock:
+            self._insert_run(log_path, mode, started, machine)
+            self._conn.commit()
+
+    def add_event(self, log_path, event):
+        """Incorpora un evento de run_events al índice (solo los relevantes)"""
+        if event.get("event") not in (run_events.APP_END, run_events.RUN_SUMMARY):
+            return
+
+        with self._lock:
+            self._apply_event(log_path, event)
+            self._conn.commit()
+
+    def _insert_run(self, log_path, mode, started=None, machine=None):
+        self._conn.execute(
+            "INSERT OR IGNORE INTO runs (log_path, mode, machine, started) VALUES (?, ?, ?, ?)",
+            (
+                os.path.basename(log_path),
+                mode,
+                machine or socket.gethostname(),
+                started or datetime.now().isoformat(timespec="seconds"),
+            ),
+        )
+
+    def _run_id(self, log_path):
+        row = self._conn.execute(
+            "SELECT id FROM runs WHERE log_path = ?", (os.path.basename(log_path),)
+        ).fetchone()
+        return row["id"] if row else None
+
+    def _apply_event(self, log_path, event):
+        kind = event.get("event")
+        run_id = self._run_id(log_path)
+        if run_id is None:
+            return
+
+        if kind == run_events.APP_END:
+            self._conn.execute(
+                "INSERT INTO apps (run_id, app, result, started, seconds) VALUES (?, ?, ?, ?, ?)",
+                (run_id, event.get("app"), event.get("result"), event.get("ts"), event.get("seconds")),
+            )
+        elif kind == run_events.RUN_SUMMARY:
+            self._conn.execute(
+                "UPDATE runs SET total = ?, success = ?, failed = ?, skipped = ?, seconds = ? "
+                "WHERE id = ?",
+                (
+                    event.get("total"),
+                    event.get("success"),
+                    event.get("failed"),
+                    event.get("skipped"),
+                    event.get("seconds"),
+                    run_id,
+                ),
+            )
+
+    # ===== bitácoras que existían antes del índice =====
+    def sync(self, force=False):
+        """
+        Agrega al índice las bitácoras de la carpeta que aún no están y
+        quita las que ya no existen. La carpeta se recorre solo la primera
+        vez (o con force=True); después el índice se mantiene con cada
+        ejecución y con la rotación, sin listar la carpeta.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'backfilled'").fetchone()
+            if row and not force:
+                return
+
+            known = {r["log_path"] for r in self._conn.execute("SELECT log_path FROM runs")}
+            present = set()
+
+            # Todo en una sola transacción
+            for entry in os.scandir(self.folder):
+                name = strip_gz(entry.name)
+                if not name.lower().endswith(".log"):
+                    continue
+                present.add(name)
+                if name not in known:
+                    try:
+                        self._index_existing(entry.path)
+                    except Exception:
+                        continue
+
+            for name in known - present:
+                self._delete_run(name)
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('backfilled', ?)",
+                (datetime.now().isoformat(timespec="seconds"),),
+            )
+            self._conn.commit()
+
+    def forget(self, log_name):
+        """Quita del índice una ejecución cuyo archivo se eliminó"""
+        with self._lock:
+            self._delete_run(log_name)
+            self._conn.commit()
+
+    def _delete_run(self, log_name):
+        run_id = self._run_id(log_name)
+        if run_id is None:
+            return
+        self._conn.execute("DELETE FROM apps WHERE run_id = ?", (run_id,))
+        self._conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+    def _index_existing(self, log_path):
+        started = None
+        log_path = strip_gz(log_path)
+        match = _FILE_TIMESTAMP.search(os.path.basename(log_path))
+        if match:
+            try:
+                started = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S")
+            except ValueError:
+                pass
+        if started is None:
+            started = datetime.fromtimestamp(os.path.getmtime(existing_variant(log_path)))
+
+        summary = self._parse_text_summary(log_path)
+        self._insert_run(log_path, summary.get("mode"), started=started.isoformat(timespec="seconds"))
+
+        events_path = existing_variant(os.path.splitext(log_path)[0] + ".jsonl")
+        if events_path:
+            for event in run_events.read_run_events(events_path):
+                self._apply_event(log_path, event)
+        elif summary:
+            self._apply_event(log_path, dict(summary, event=run_events.RUN_SUMMARY))
+
+    @staticmethod
+    def _parse_text_summary(log_path):
+        summary = {}
+        try:
+            with open_text(existing_variant(log_path)) as f:
+                for line in f:
+                    for key, pattern in _SUMMARY_PATTERNS.items():
+                        match = pattern.search(line)
+                        if match:
+                            value = match.group(1).strip()
+                            summary[key] = value if key == "mode" else float(value)
+        except Exception:
+            pass
+        return summary
+
+    # ===== consultas =====
+    def latest_log(self):
+        """
+        Ruta de la ejecución más reciente (o su .gz), o None. Si el archivo
+        ya no existe se quita del índice y se prueba con la anterior.
+        """
+        with self._lock:
+            while True:
+                row = self._conn.execute(
+                    "SELECT log_path FROM runs ORDER BY started DESC, id DESC LIMIT 1"
+                ).fetchone()
+                if not row:
+                    return None
+
+                path = existing_variant(os.path.join(self.folder, row["log_path"]))
+                if path:
+                    return path
+
+                self._delete_run(row["log_path"])
+                self._conn.commit()
+
+    def search(self, app=None, result=None, date_from=None, date_to=None, machine=None,
+               page=0, page_size=PAGE_SIZE):
+        """
+        Busca resultados de apps por ejecución. Retorna (filas, hay_más).
+        Las fechas son 'YYYY-MM-DD' (inclusive).
+        """
+        conditions = []
+        params = []
+
+        if app:
+            conditions.append("apps.app LIKE ?")
+            params.append(f"%{app}%")
+        if result:
+            conditions.append("apps.result = ?")
+            params.append(result)
+        if date_from:
+            conditions.append("runs.started >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("runs.started < date(?, '+1 day')")
+            params.append(date_to)
+        if machine:
+            conditions.append("runs.machine LIKE ?")
+            params.append(f"%{machine}%")
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = (
+            "SELECT runs.log_path, runs.mode, runs.machine, runs.started, "
+            "apps.app, apps.result, apps.seconds "
+            "FROM apps JOIN runs ON runs.id = apps.run_id "
+            f"{where} ORDER BY runs.started DESC, apps.id "
+            "LIMIT ? OFFSET ?"
+        )
+        params += [page_size + 1, page * page_size]
+
+        with self._lock:
+            rows = [dict(row) for row in self._conn.execute(query, params)]
+
+        for row in rows:
+            row["log_path"] = os.path.join(self.folder, row["log_path"])
+
+        return rows[:page_size], len(rows) > page_size
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+import os
+import gzip
+import time
+import shutil
+import tempfile
+
+GZ_SUFFIX = ".gz"
+# Archivos de cada ejecución (se comprimen) y reportes que también rotan
+RUN_SUFFIXES = (".log", ".jsonl")
+REPORT_SUFFIXES = (".html",)
+
+
+def existing_variant(path):
+    """Retorna `path` si existe, o su versión comprimida .gz si existe"""
+    if path and os.path.exists(path):
+        return path
+    if path and not path.endswith(GZ_SUFFIX) and os.path.exists(path + GZ_SUFFIX):
+        return path + GZ_SUFFIX
+    return None
+
+
+def strip_gz(path):
+    return path[:-len(GZ_SUFFIX)] if path.endswith(GZ_SUFFIX) else path
+
+
+def open_text(path):
+    """Abre en modo texto una bitácora, descomprimiéndola si es .gz"""
+    if path.endswith(GZ_SUFFIX):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def plain_copy(path):
+    """
+    Ruta a una versión sin comprimir de la bitácora, para leerla por
+    bloques. Los .gz se descomprimen una sola vez a una carpeta temporal.
+    """
+    if not path.endswith(GZ_SUFFIX):
+        return path
+
+    cache_dir = os.path.join(tempfile.gettempdir(), "AutoInstaller_logs")
+    os.makedirs(cache_dir, exist_ok=True)
+    target = os.path.join(cache_dir, os.path.basename(strip_gz(path)))
+
+    if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(path):
+        tmp_path = target + ".tmp"
+        with gzip.open(path, "rb") as src, open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp_path, target)
+
+    return target
+
+
+def _compress(path):
+    gz_path = path + GZ_SUFFIX
+    tmp_path = gz_path + ".tmp"
+    with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    shutil.copystat(path, tmp_path)
+    os.replace(tmp_path, gz_path)
+    os.remove(path)
+
+
+def rotate_logs(
+    folder,
+    max_runs=200,
+    max_reports=None,
+    max_age_days=90,
+    max_total_mb=500,
+    keep_uncompressed=5,
+    exclude=(),
+    on_removed=None,
+):
+    """
+    Aplica la política de retención sobre la carpeta de logs:
+
+    - Las ejecuciones más recientes (`keep_uncompressed`) quedan en texto;
+      las anteriores se comprimen con gzip (.log.gz / .jsonl.gz).
+    - Se eliminan las ejecuciones que excedan `max_runs` y los reportes que
+      excedan `max_reports` (por defecto el mismo tope, contado aparte para
+      que los reportes no desplacen bitácoras), los que tengan más de
+      `max_age_days` o, empezando por los más antiguos, hasta que la carpeta
+      quede bajo `max_total_mb`.
+
+    `exclude` son rutas en uso (la ejecución actual). `on_removed(nombre)`
+    se llama con el nombre .log de cada ejecución eliminada.
+    Retorna (comprimidos, eliminados).
+    """
+    excluded = {os.path.normcase(os.path.abspath(path)) for path in exclude if path}
+    groups = {}
+
+    for entry in os.scandir(folder):
+        if not entry.is_file():
+            continue
+        name = strip_gz(entry.name)
+        stem, ext = os.path.splitext(name)
+        if ext.lower() in RUN_SUFFIXES:
+            key = (stem, False)
+        elif ext.lower() in REPORT_SUFFIXES:
+            key = (name, True)
+        else:
+            continue
+
+        group = groups.setdefault(
+            key, {"files": [], "mtime": 0, "size": 0, "busy": False, "report": key[1]}
+        )
+        stat = entry.stat()
+        group["files"].append(entry.path)
+        group["mtime"] = max(group["mtime"], stat.st_mtime)
+        group["size"] += stat.st_size
+        if os.path.normcase(os.path.abspath(entry.path)) in excluded:
+            group["busy"] = True
+
+    ordered = sorted(groups.values(), key=lambda group: group["mtime"], reverse=True)
+    cutoff = time.time() - max_age_days * 86400 if max_age_days else None
+    max_total = max_total_mb * 1024 * 1024 if max_total_mb else None
+    compressed = 0
+    removed = 0
+    if max_reports is None:
+        max_reports = max_runs
+    seen = {False: 0, True: 0}
+    limits = {False: max_runs, True: max_reports}
+    kept_size = 0
+    survivors = []
+
+    # De la más reciente a la más antigua: se conserva mientras quepa
+    for group in ordered:
+        if group["busy"]:
+            kept_size += group["size"]
+            survivors.append(group)
+            continue
+
+        # Ejecuciones y reportes se cuentan por separado
+        seen[group["report"]] += 1
+        limit = limits[group["report"]]
+        too_many = limit and seen[group["report"]] > limit
+        too_old = cutoff and group["mtime"] < cutoff
+        too_big = max_total and kept_size + group["size"] > max_total
+
+        if not (too_many or too_old or too_big):
+            kept_size += group["size"]
+            survivors.append(group)
+            continue
+
+        for path in group["files"]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        removed += 1
+
+        if on_removed:
+            for path in group["files"]:
+                if strip_gz(path).lower().endswith(".log"):
+                    on_removed(os.path.basename(strip_gz(path)))
+
+    # Comprimir las ejecuciones que ya no están entre las más recientes
+    plain_runs = 0
+    for group in survivors:
+        if group["busy"] or group["report"]:
+            continue
+
+        plain_runs += 1
+        if plain_runs <= keep_uncompressed:
+            continue
+
+        for path in group["files"]:
+            if path.endswith(GZ_SUFFIX):
+                continue
+            try:
+                _compress(path)
+                compressed += 1
+            except OSError:
+                pass
+
+    return compressed, removed
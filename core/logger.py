@@ -1,20 +1,224 @@
 # -*- coding: utf-8 -*-
 
 import os
+import json
+import atexit
+import threading
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
 from datetime import datetime
 import tkinter as tk
 
+from core.log_index import LogIndex
+from core.log_rotation import existing_variant, open_text, rotate_logs, strip_gz
+
+# Umbrales de escritura a disco del hilo de bitácora
+FLUSH_BYTES = 64 * 1024
+FLUSH_INTERVAL = 0.5
+QUEUE_SIZE = 10000
+MAX_OPEN_FILES = 4
+# Tope de lo que se conserva en memoria de la sesión (last_log_content)
+TAIL_MAX_LINES = 20000
+TAIL_MAX_BYTES = 4 * 1024 * 1024
+# Cada cuánto se vuelcan a la consola las líneas acumuladas (ms)
+CONSOLE_INTERVAL_MS = 50
+
+
+def events_path_for(log_path: str) -> str:
+    """Ruta del .jsonl de eventos que acompaña a una bitácora .log"""
+    return os.path.splitext(strip_gz(log_path))[0] + ".jsonl"
+
+
+class _LogWriter:
+    """
+    Escribe la bitácora en un hilo de fondo.
+
+    Las líneas se acumulan en una cola acotada (si se llena, quien registra
+    espera en lugar de perder líneas) y el hilo las escribe por lotes sobre
+    un archivo que se mantiene abierto. Se despierta al acumular FLUSH_BYTES,
+    cada FLUSH_INTERVAL segundos o cuando se pide flush().
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = []
+        self._pending_bytes = 0
+        self._flush_requested = 0
+        self._flush_done = 0
+        self._thread = None
+        self._files = {}
+
+    def write(self, path, text):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="bitacora", daemon=True)
+                self._thread.start()
+
+            while len(self._pending) >= QUEUE_SIZE:
+                self._cond.wait()
+
+            self._pending.append((path, text))
+            self._pending_bytes += len(text)
+            if self._pending_bytes >= FLUSH_BYTES:
+                self._cond.notify_all()
+
+    def flush(self, timeout=5):
+        """Espera a que todo lo encolado esté escrito en disco"""
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                return
+            self._flush_requested += 1
+            ticket = self._flush_requested
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._flush_done >= ticket, timeout=timeout)
+
+    def _open(self, path):
+        f = self._files.get(path)
+        if f:
+            return f
+
+        # Solo se mantienen abiertos los archivos de la ejecución actual
+        if len(self._files) >= MAX_OPEN_FILES:
+            self._close_files()
+
+        try:
+            f = open(path, "a", encoding="utf-8")
+        except Exception:
+            return None
+
+        self._files[path] = f
+        return f
+
+    def _close_files(self):
+        for f in self._files.values():
+            try:
+                f.close()
+            except Exception:
+                pass
+        self._files = {}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._pending_bytes >= FLUSH_BYTES
+                    or self._flush_requested > self._flush_done,
+                    timeout=FLUSH_INTERVAL,
+                )
+                batch = self._pending
+                ticket = self._flush_requested
+                self._pending = []
+                self._pending_bytes = 0
+                self._cond.notify_all()
+
+            self._write_batch(batch)
+
+            with self._cond:
+                self._flush_done = ticket
+                self._cond.notify_all()
+
+    def _write_batch(self, batch):
+        # Una sola escritura por archivo (bitácora y eventos), en orden
+        by_path = {}
+        for path, text in batch:
+            by_path.setdefault(path, []).append(text)
+
+        for path, texts in by_path.items():
+            f = self._open(path)
+            if f:
+                try:
+                    f.write("".join(texts))
+                    f.flush()
+                except Exception:
+                    pass
+
+
 class Logger:
     """Sistema de logging para la aplicación"""
     
-    def __init__(self, console_widget=None):
+    def __init__(self, console_widget=None, max_lines=TAIL_MAX_LINES, max_bytes=TAIL_MAX_BYTES):
         self.log_file_path = None
+        self.events_file_path = None
+        self._index = None
+        self._index_lock = threading.Lock()
         self.console = console_widget
-        self.last_log_content = ""
+        self._lock = threading.Lock()
+        self._tail = deque()
+        self._tail_bytes = 0
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writer = _LogWriter()
+        self._console_pending = []
+        self._console_clear = False
+        self._console_generation = 0
+
+        # La bitácora se completa aunque la aplicación se cierre o falle
+        atexit.register(self.flush)
     
     def set_console(self, console_widget):
-        """Establece el widget de consola para mostrar logs"""
-        self.console = console_widget
+        """
+        Establece el widget de consola para mostrar logs. Se llama desde el
+        hilo de Tk: ahí mismo arranca el sondeo que vuelca a la consola lo
+        que registran los demás hilos, que nunca tocan el widget.
+        """
+        with self._lock:
+            self.console = console_widget
+            self._console_pending = []
+            self._console_clear = False
+            self._console_generation += 1
+            generation = self._console_generation
+
+        if console_widget is not None:
+            self._poll_console(generation)
+
+    def flush(self):
+        """Escribe en disco todo lo pendiente de la bitácora"""
+        self._writer.flush()
+
+    @property
+    def last_log_content(self) -> str:
+        """
+        Últimas líneas registradas en la sesión. Se guardan en un búfer
+        circular acotado y solo se unen en un texto al leerlas.
+        """
+        with self._lock:
+            return "".join(self._tail)
+
+    @last_log_content.setter
+    def last_log_content(self, value: str):
+        with self._lock:
+            self._tail.clear()
+            self._tail_bytes = 0
+            if value:
+                self._append_tail(value.splitlines(keepends=True))
+
+    def tail(self, lines: int = 100) -> str:
+        """Retorna las últimas `lines` líneas sin unir todo el búfer"""
+        with self._lock:
+            last = list(islice(reversed(self._tail), max(0, lines)))
+        return "".join(reversed(last))
+
+    def set_buffer_limits(self, max_lines=None, max_bytes=None):
+        """Ajusta el tope de líneas / bytes (aprox.) conservados en memoria"""
+        with self._lock:
+            if max_lines:
+                self.max_lines = int(max_lines)
+            if max_bytes:
+                self.max_bytes = int(max_bytes)
+            self._append_tail([])
+
+    def _append_tail(self, lines):
+        # Se mide en caracteres como aproximación de bytes, sin codificar
+        for line in lines:
+            self._tail.append(line)
+            self._tail_bytes += len(line)
+
+        while self._tail and (
+            len(self._tail) > self.max_lines or self._tail_bytes > self.max_bytes
+        ):
+            self._tail_bytes -= len(self._tail.popleft())
     
     def create_log_file(self, mode_name: str) -> str:
         """Crea un nuevo archivo de log para una ejecución"""
@@ -24,21 +228,68 @@ class Logger:
         safe_mode = mode_name.replace(" ", "_").replace("/", "_").replace("\\", "_")
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.log_file_path = os.path.join(log_dir, f"{safe_mode}_{timestamp}.log")
+        self.events_file_path = events_path_for(self.log_file_path)
+
+        index = self.get_index()
+        if index:
+            try:
+                index.start_run(self.log_file_path, mode_name)
+            except Exception:
+                pass
+
         return self.log_file_path
 
+    def rotate_logs(self, **policy):
+        """
+        Comprime y elimina bitácoras antiguas según la política (ver
+        core.log_rotation.rotate_logs), sin tocar la ejecución actual, y
+        quita del índice las ejecuciones eliminadas.
+        """
+        index = self.get_index()
+        try:
+            return rotate_logs(
+                self.get_logs_folder(),
+                exclude=(self.log_file_path, getattr(self, "events_file_path", None)),
+                on_removed=index.forget if index else None,
+                **policy,
+            )
+        except Exception as e:
+            self.log(f"⚠️ No se pudo rotar los logs: {e}")
+            return 0, 0
+
     def get_logs_folder(self) -> str:
         """Retorna la carpeta de logs"""
         folder = os.path.join(os.getcwd(), "logs")
         os.makedirs(folder, exist_ok=True)
         return folder
 
+    def get_index(self):
+        """Índice SQLite de la carpeta de logs (None si no se pudo abrir)"""
+        with self._index_lock:
+            if self._index is None:
+                try:
+                    self._index = LogIndex(self.get_logs_folder())
+                except Exception:
+                    self._index = False
+            return self._index or None
+
     def get_latest_log_file(self):
         """Obtiene el archivo de log más reciente"""
+        index = self.get_index()
+        if index:
+            try:
+                index.sync()
+                latest = index.latest_log()
+                if latest:
+                    return latest
+            except Exception:
+                pass
+
         folder = self.get_logs_folder()
         log_files = [
             os.path.join(folder, f)
             for f in os.listdir(folder)
-            if f.lower().endswith(".log")
+            if f.lower().endswith((".log", ".log.gz"))
         ]
 
         if not log_files:
@@ -48,41 +299,150 @@ class Logger:
 
     def read_log_content(self, path: str) -> str:
         """Lee el contenido de un archivo de log"""
+        if path == self.log_file_path:
+            self.flush()
+
         try:
-            with open(path, "r", encoding="utf-8") as f:
+            with open_text(existing_variant(path) or path) as f:
                 return f.read()
         except Exception as e:
             return f"No se pudo leer la bitácora.\n\nDetalle: {e}"
 
+    @contextmanager
+    def lane(self, name: str):
+        """
+        Prefija con [name] los mensajes registrados desde el hilo actual.
+        Permite distinguir las líneas de apps que se instalan en paralelo.
+        """
+        previous = getattr(self._local, "lane", None)
+        self._local.lane = name
+        try:
+            yield
+        finally:
+            self._local.lane = previous
+
+    def current_lane(self):
+        """Retorna el prefijo activo del hilo actual (para heredarlo en otros hilos)"""
+        return getattr(self._local, "lane", None)
+
+    def is_buffering(self):
+        """True si el hilo actual está dentro de una sección agrupada"""
+        return getattr(self._local, "buffer", None) is not None
+
+    @contextmanager
+    def section(self):
+        """
+        Agrupa los mensajes del hilo actual y los escribe juntos al salir,
+        para que una sección no quede intercalada con la de otros hilos.
+        """
+        if getattr(self._local, "buffer", None) is not None:
+            yield
+            return
+
+        self._local.buffer = []
+        try:
+            yield
+        finally:
+            lines = self._local.buffer
+            self._local.buffer = None
+            self._emit(lines)
+
     def log(self, msg: str):
         """Registra un mensaje en consola y archivo"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        lane = getattr(self._local, "lane", None)
+        if lane and msg:
+            msg = f"[{lane}] {msg}"
         line = f"[{timestamp}] {msg}"
-        
-        # Mostrar en consola si existe
-        if self.console:
-            self.console.insert(tk.END, line + "\n")
-            self.console.see(tk.END)
-        
-        # Escribir en archivo
-        self._write_to_file(line)
-        self.last_log_content += line + "\n"
 
-    def _write_to_file(self, line: str):
-        """Escribe una línea en el archivo de log"""
-        if not self.log_file_path:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is not None:
+            buffer.append(line)
             return
 
+        self._emit([line])
+
+    def _emit(self, lines):
+        if not lines:
+            return
+
+        text = "\n".join(lines) + "\n"
+
+        with self._lock:
+            # La consola la actualiza el hilo de Tk en _poll_console
+            if self.console:
+                self._console_pending.append(text)
+            
+            # Escribir en archivo
+            self._write_to_file(text[:-1])
+            self._append_tail(line + "\n" for line in lines)
+
+    def _poll_console(self, generation):
+        """
+        Vuelca a la consola el texto acumulado y se vuelve a agendar cada
+        CONSOLE_INTERVAL_MS. Corre siempre en el hilo de Tk; termina cuando
+        se reemplaza la consola o el widget se destruye.
+        """
+        with self._lock:
+            if generation != self._console_generation:
+                return
+            console = self.console
+            text = "".join(self._console_pending)
+            self._console_pending = []
+            clear, self._console_clear = self._console_clear, False
+
+        try:
+            if clear:
+                console.delete("1.0", tk.END)
+            if text:
+                console.insert(tk.END, text)
+                console.see(tk.END)
+            console.after(CONSOLE_INTERVAL_MS, lambda: self._poll_console(generation))
+        except tk.TclError:
+            # El widget se destruyó (p. ej. se cambió de vista)
+            with self._lock:
+                if generation == self._console_generation:
+                    self.console = None
+                    self._console_pending = []
+
+    def event(self, event_type: str, **fields):
+        """
+        Registra un evento estructurado en el .jsonl de la ejecución
+        (una línea JSON por evento, junto a la bitácora de texto).
+        """
+        if not self.events_file_path:
+            return
+
+        record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "event": event_type}
+        record.update(fields)
+
         try:
-            with open(self.log_file_path, "a", encoding="utf-8") as f:
-                f.write(line + "\n")
+            line = json.dumps(record, ensure_ascii=False, default=str)
         except Exception:
-            pass
+            return
+
+        self._writer.write(self.events_file_path, line + "\n")
+
+        index = self.get_index()
+        if index:
+            try:
+                index.add_event(self.log_file_path, record)
+            except Exception:
+                pass
+
+    def _write_to_file(self, line: str):
+        """Encola una línea para el hilo que escribe el archivo de log"""
+        if not self.log_file_path:
+            return
+
+        self._writer.write(self.log_file_path, line + "\n")
 
     def clear(self):
         """Limpia la consola"""
-        if self.console:
-            self.console.delete("1.0", tk.END)
+        with self._lock:
+            self._console_pending = []
+            # Puede llamarse desde el hilo de instalación: el borrado lo hace Tk
+            self._console_clear = self.console is not None
         self.last_log_content = ""
 
 # Instancia global del logger
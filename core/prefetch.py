@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from core.logger import global_logger as logger
+from core.run_control import InstallCancelled
+from utils.file_utils import stage_to_temp
+
+# Espacio libre mínimo que se deja en el disco de TEMP
+MIN_FREE_BYTES = 1024 * 1024 * 1024
+# Cada cuánto revisa take() el punto de control mientras espera una copia
+TAKE_POLL_SECONDS = 0.5
+# Espera máxima al hilo de precarga en stop()
+STOP_JOIN_SECONDS = 5
+
+
+class _PrefetchItem:
+    def __init__(self, source):
+        self.source = source
+        self.status = "pending"   # pending | copying | ready | taken | skipped | error
+        self.path = None
+        self.size = 0
+        # take() dejó de esperar la copia en curso (lote cancelado)
+        self.abandoned = False
+
+
+class InstallerPrefetcher:
+    """
+    Copia a TEMP, en un hilo de fondo, los instaladores de las siguientes
+    apps del perfil mientras la actual se instala.
+
+    - lookahead: cuántos instaladores por delante del último consumido se
+      pueden tener copiados o en copia.
+    - budget_bytes: tope de bytes copiados pendientes de consumir.
+
+    Los instaladores que no alcanzaron a precargarse (o que exceden el
+    presupuesto) se devuelven como None en take() y el llamador los copia
+    como siempre con stage_to_temp.
+
+    Una copia que termina después de stop(), o que take() dejó de esperar
+    por una cancelación, se elimina al terminar en lugar de quedar en TEMP.
+    """
+
+    def __init__(
+        self,
+        sources,
+        lookahead=2,
+        budget_bytes=4096 * 1024 * 1024,
+        stage_func=None,
+        discard_func=None,
+    ):
+        self.items = [_PrefetchItem(src) for src in sources]
+        self.lookahead = max(0, int(lookahead))
+        self.budget_bytes = max(0, int(budget_bytes))
+        self.stage_func = stage_func or stage_to_temp
+        self.discard_func = discard_func or os.remove
+
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._taken_max = 0
+        self._pending_bytes = 0
+        self._thread = None
+
+    def start(self):
+        if not self.items or self.lookahead == 0:
+            return
+        self._thread = threading.Thread(target=self._worker, name="precarga", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Detiene la precarga y elimina copias que nadie consumió. Si una copia
+        sigue en curso al vencer la espera, el hilo la elimina al terminarla.
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+        if self._thread:
+            self._thread.join(timeout=STOP_JOIN_SECONDS)
+
+        with self._cond:
+            leftovers = [item for item in self.items if item.status == "ready" and item.path]
+            for item in leftovers:
+                item.status = "skipped"
+
+        for item in leftovers:
+            self._discard(item.path)
+
+    def take(self, source, checkpoint=None):
+        """
+        Devuelve la ruta local ya copiada de `source`, esperando si la copia
+        está en curso. Retorna None si no se precargó.
+
+        Mientras espera llama a `checkpoint` (el del lote): una pausa espera
+        ahí y una cancelación se propaga sin esperar a que termine la copia.
+        """
+        with self._cond:
+            index = next(
+                (i for i, item in enumerate(self.items)
+                 if item.source == source and item.status in ("pending", "copying", "ready")),
+                None
+            )
+            if index is None:
+                return None
+
+            item = self.items[index]
+            self._taken_max = max(self._taken_max, index)
+
+            if item.status == "pending":
+                # El llamador copiará por su cuenta; el hilo lo salta
+                item.status = "taken"
+                self._cond.notify_all()
+                return None
+
+        while True:
+            with self._cond:
+                if item.status != "copying" or self._stopped:
+                    break
+                self._cond.wait(timeout=TAKE_POLL_SECONDS)
+                if item.status != "copying" or self._stopped:
+                    break
+
+            if checkpoint:
+                try:
+                    checkpoint()
+                except InstallCancelled:
+                    with self._cond:
+                        item.abandoned = True
+                    raise
+
+        with self._cond:
+            path = item.path if item.status == "ready" else None
+            if item.status == "ready":
+                self._pending_bytes -= item.size
+            item.status = "taken"
+            self._cond.notify_all()
+            return path
+
+    def _has_room(self, index, size):
+        if index > self._taken_max + self.lookahead:
+            return False
+
+        if self._pending_bytes and self._pending_bytes + size > self.budget_bytes:
+            return False
+
+        try:
+            free = shutil.disk_usage(tempfile.gettempdir()).free
+            return free - size >= MIN_FREE_BYTES
+        except Exception:
+            return True
+
+    def _worker(self):
+        for index, item in enumerate(self.items):
+            try:
+                item.size = os.path.getsize(item.source)
+            except Exception:
+                item.status = "skipped"
+                continue
+
+            with self._cond:
+                if item.size > self.budget_bytes:
+                    item.status = "skipped"
+                    continue
+
+                while not self._stopped and item.status == "pending" and not self._has_room(index, item.size):
+                    self._cond.wait(timeout=1)
+
+                if self._stopped:
+                    return
+                if item.status != "pending":
+                    continue
+
+                item.status = "copying"
+                self._pending_bytes += item.size
+
+            start = time.time()
+            cancelled = False
+            try:
+                path = self.stage_func(item.source)
+                status = "ready"
+            except InstallCancelled:
+                path = None
+                status = "error"
+                cancelled = True
+            except Exception as e:
+                path = None
+                status = "error"
+                logger.log(f"Precarga fallida de {os.path.basename(item.source)}: {e}")
+
+            with self._cond:
+                unwanted = path if status == "ready" and (self._stopped or item.abandoned) else None
+                if unwanted:
+                    status = "skipped"
+                    path = None
+                item.path = path
+                item.status = status
+                if status != "ready":
+                    self._pending_bytes -= item.size
+                self._cond.notify_all()
+
+            if unwanted:
+                self._discard(unwanted)
+            if cancelled or unwanted:
+                return
+
+            if status == "ready":
+                logger.log(
+                    f"Precarga lista: {os.path.basename(item.source)} "
+                    f"({time.time() - start:.1f} s)"
+                )
+
+    def _discard(self, path):
+        try:
+            self.discard_func(path)
+        except Exception:
+            pass
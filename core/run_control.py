@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+
+class InstallCancelled(BaseException):
+    """
+    La ejecución fue cancelada por el usuario.
+
+    Hereda de BaseException (como asyncio.CancelledError) para que los
+    `except Exception` del instalador no la traten como un fallo más y
+    llegue hasta el punto que cierra la app en curso.
+    """
+
+
+class RunControl:
+    """
+    Cancelación y pausa cooperativas de un lote de instalación.
+
+    El instalador llama a checkpoint() entre fases (copia, instalación,
+    post, permisos): si hay una pausa pedida espera ahí hasta reanudar, y
+    si se canceló lanza InstallCancelled. El proceso hijo en curso se
+    termina aparte (ver Installer.cancel).
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._cancelled = False
+        self._paused = False
+
+    def reset(self):
+        with self._cond:
+            self._cancelled = False
+            self._paused = False
+            self._cond.notify_all()
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def cancel(self):
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    def pause(self):
+        with self._cond:
+            self._paused = True
+
+    def resume(self):
+        with self._cond:
+            self._paused = False
+            self._cond.notify_all()
+
+    def checkpoint(self):
+        """Punto de pausa/cancelación entre fases"""
+        with self._cond:
+            while self._paused and not self._cancelled:
+                self._cond.wait()
+            if self._cancelled:
+                raise InstallCancelled()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+
+from core.log_rotation import existing_variant, open_text
+
+# Tipos de evento del .jsonl de cada ejecución
+APP_START = "app_start"
+STAGE_COPY = "stage_copy"
+ENGINE_DETECTED = "engine_detected"
+ATTEMPT = "attempt"
+APP_END = "app_end"
+RUN_SUMMARY = "run_summary"
+
+RESULT_LABELS = {
+    "success": "OK",
+    "failed": "FALLÓ",
+    "skipped": "OMITIDA",
+    "cancelled": "CANCELADA",
+}
+
+
+def read_run_events(path):
+    """
+    Lee los eventos de un .jsonl (o .jsonl.gz) en una sola pasada, línea
+    por línea. Las líneas incompletas (p. ej. si la ejecución se cortó) se
+    ignoran.
+    """
+    path = existing_variant(path)
+    if not path:
+        return
+
+    try:
+        with open_text(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        return
+
+
+def _format_event(event):
+    kind = event.get("event")
+    ts = (event.get("ts") or "").replace("T", " ")[:19]
+    app = event.get("app", "")
+
+    if kind == APP_START:
+        return f"[{ts}] ▶ {app} ({event.get('index')}/{event.get('total')}, {event.get('tipo')})"
+
+    if kind == STAGE_COPY:
+        mb = (event.get("bytes") or 0) / (1024 * 1024)
+        origin = app or os.path.basename(event.get("source") or "")
+        label = "precarga" if event.get("prefetch") else "copia"
+        return f"[{ts}]   {origin}: {label} {mb:.1f} MB en {event.get('seconds', 0):.1f} s"
+
+    if kind == ENGINE_DETECTED:
+        return f"[{ts}]   {app}: motor {event.get('engine')}"
+
+    if kind == ATTEMPT:
+        status = "timeout" if event.get("timed_out") else f"código {event.get('exit_code')}"
+        args = event.get("args")
+        label = f" [{args}]" if args else ""
+        line = f"[{ts}]   {app}: intento{label} → {status} ({event.get('seconds', 0):.1f} s)"
+        errors = event.get("errors") or []
+        return "\n".join([line] + [f"{' ' * 24}⚠️ {error}" for error in errors])
+
+    if kind == APP_END:
+        result = RESULT_LABELS.get(event.get("result"), event.get("result"))
+        return f"[{ts}] ■ {app}: {result} ({event.get('seconds', 0):.1f} s)"
+
+    if kind == RUN_SUMMARY:
+        return (
+            f"[{ts}] Resumen: {event.get('success', 0)} correctas, "
+            f"{event.get('failed', 0)} fallidas, {event.get('skipped', 0)} omitidas, "
+            f"{event.get('cancelled', 0)} canceladas "
+            f"de {event.get('total', 0)} en {event.get('seconds', 0):.1f} s"
+        )
+
+    return None
+
+
+def render_run_events(path):
+    """Texto legible a partir de los eventos de una ejecución"""
+    lines = []
+    for event in read_run_events(path):
+        line = _format_event(event)
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
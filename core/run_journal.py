@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import hashlib
+import threading
+from datetime import datetime
+
+from utils.file_utils import get_program_data_dir
+
+JOURNAL_NAME = "run_journal.jsonl"
+
+# Códigos de salida de instaladores relacionados con reinicio
+REBOOT_INITIATED = 1641
+REBOOT_REQUIRED = 3010
+REBOOT_CODES = (REBOOT_INITIATED, REBOOT_REQUIRED)
+
+# Estados finales del lote
+STATUS_COMPLETED = "completed"
+STATUS_CANCELLED = "cancelled"
+STATUS_REBOOT = "reboot"
+
+RUNONCE_KEY = r"Software\Microsoft\Windows\CurrentVersion\RunOnce"
+RUNONCE_VALUE = "AutoInstallerReanudar"
+RESUME_ARG = "--reanudar"
+
+
+class RunJournal:
+    """
+    Bitácora durable del lote en curso (JSON Lines, solo se agrega).
+
+    Cada registro se escribe con flush + fsync antes de continuar, así que
+    un corte de luz o un reinicio pierde como mucho la línea que se estaba
+    escribiendo (que se ignora al leer). El primer registro guarda el modo
+    y la lista completa de apps, de modo que el lote puede continuarse al
+    abrir de nuevo la aplicación sin volver a seleccionarlo.
+
+    Registros:
+        {"type": "batch", "key", "mode", "apps", "ts"}
+        {"type": "resume", "ts"}
+        {"type": "app", "app", "state": "started" | resultado, "reboot"?, "ts"}
+        {"type": "end", "status": "cancelled" | "reboot", "ts"}
+
+    Un lote que termina completo borra el archivo.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_program_data_dir(), JOURNAL_NAME)
+        self._lock = threading.Lock()
+        self._file = None
+
+    @staticmethod
+    def batch_key(mode_name, apps):
+        items = [
+            [app.get("nombre", ""), app.get("tipo", ""), app.get("ruta", ""), app.get("paises_seleccionados", [])]
+            for app in apps
+        ]
+        raw = json.dumps([mode_name, items], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ===== lectura =====
+    def _replay(self):
+        """Reconstruye el estado del lote a partir de los registros"""
+        state = None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Línea cortada por un apagado: se ignora
+                        continue
+
+                    kind = record.get("type")
+                    if kind == "batch":
+                        state = {
+                            "key": record.get("key"),
+                            "mode": record.get("mode", ""),
+                            "apps": record.get("apps", []),
+                            "started": record.get("ts"),
+                            "results": {},
+                            "reboot": {},
+                            "status": None,
+                        }
+                    elif state is None:
+                        continue
+                    elif kind == "resume":
+                        state["status"] = None
+                    elif kind == "app" and record.get("state") != "started":
+                        state["results"][record.get("app")] = record.get("state")
+                        if record.get("reboot"):
+                            state["reboot"][record.get("app")] = record.get("reboot")
+                    elif kind == "end":
+                        state["status"] = record.get("status")
+        except FileNotFoundError:
+            return None
+        except Exception:
+            return None
+
+        return state
+
+    def pending(self):
+        """
+        Lote sin terminar, o None. Retorna un dict con mode, apps, status
+        (None si se interrumpió sin cerrar, "cancelled" o "reboot") y done
+        (nombres de las apps que ya terminaron correctamente).
+        """
+        state = self._replay()
+        if not state or not state["apps"] or state["status"] == STATUS_COMPLETED:
+            return None
+
+        done = {name for name, result in state["results"].items() if result == "success"}
+        if all(app.get("nombre", "Desconocido") in done for app in state["apps"]):
+            return None
+
+        return {
+            "mode": state["mode"],
+            "apps": state["apps"],
+            "status": state["status"],
+            "started": state["started"],
+            "done": done,
+        }
+
+    # ===== escritura =====
+    def _append(self, record):
+        record = dict(record, ts=datetime.now().isoformat(timespec="seconds"))
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def begin(self, mode_name, apps):
+        """
+        Abre el journal del lote. Si es el mismo lote que quedó sin terminar
+        se continúa y se retornan los nombres de las apps que ya terminaron
+        correctamente; si no, se empieza uno nuevo.
+        """
+        key = self.batch_key(mode_name, apps)
+        state = self._replay()
+        self.close()
+
+        if state and state["key"] == key and state["status"] != STATUS_COMPLETED:
+            with self._lock:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._append({"type": "resume"})
+            return {name for name, result in state["results"].items() if result == "success"}
+
+        with self._lock:
+            self._file = open(self.path, "w", encoding="utf-8")
+        self._append({"type": "batch", "key": key, "mode": mode_name, "apps": apps})
+        return set()
+
+    def app_started(self, nombre):
+        self._append({"type": "app", "app": nombre, "state": "started"})
+
+    def record(self, nombre, result, reboot=None):
+        record = {"type": "app", "app": nombre, "state": result}
+        if reboot:
+            record["reboot"] = reboot
+        self._append(record)
+
+    def finish(self, status=STATUS_COMPLETED):
+        """Cierra el lote: completo borra el journal; cancelado o por reinicio lo conserva"""
+        if status == STATUS_COMPLETED:
+            self.close()
+            self.discard()
+            return
+
+        self._append({"type": "end", "status": status})
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self):
+        """Olvida el lote pendiente (p. ej. si el usuario no quiere continuarlo)"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _resume_command():
+    if getattr(sys, "frozen", False):
+        return f'"{sys.executable}" {RESUME_ARG}'
+    return f'"{sys.executable}" "{os.path.abspath(sys.argv[0])}" {RESUME_ARG}'
+
+
+def register_resume_on_boot():
+    """
+    Agrega una entrada RunOnce (del usuario actual) para que la aplicación
+    se abra tras el reinicio y continúe el lote. Retorna True si se registró.
+    """
+    try:
+        import winreg
+    except ImportError:
+        return False
+
+    try:
+        with winreg.CreateKey(winreg.HKEY_CURRENT_USER, RUNONCE_KEY) as key:
+            winreg.SetValueEx(key, RUNONCE_VALUE, 0, winreg.REG_SZ, _resume_command())
+        return True
+    except OSError:
+        return False
+
+
+def clear_resume_on_boot():
+    try:
+        import winreg
+    except ImportError:
+        return
+
+    try:
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, RUNONCE_KEY, 0, winreg.KEY_SET_VALUE) as key:
+            winreg.DeleteValue(key, RUNONCE_VALUE)
+    except OSError:
+        pass
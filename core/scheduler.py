@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+import heapq
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from core.logger import global_logger as logger
+
+
+class SchedulerError(Exception):
+    """Error en la definición de dependencias de un perfil"""
+
+
+class InstallScheduler:
+    """
+    Planificador de instalaciones basado en un grafo de dependencias (DAG).
+
+    Cada entrada del perfil es un nodo. Las claves opcionales de la entrada son:
+        - depends_on: nombre (o lista de nombres) de apps que deben terminar
+          correctamente antes de iniciar esta.
+        - exclusive: si es True la app completa se ejecuta reteniendo el
+          mutex del instalador (nada más instala mientras tanto).
+
+    Las apps listas se ejecutan en un pool acotado respetando el orden del
+    perfil. La serialización de instaladores (mutex de Windows Installer)
+    se hace con `exclusive_lock`, que el Installer también usa alrededor de
+    cada ejecución de msiexec / setup.
+    """
+
+    def __init__(self, apps, max_workers=3, exclusive_lock=None):
+        self.apps = list(apps)
+        self.max_workers = max(1, int(max_workers or 1))
+        self.exclusive_lock = exclusive_lock or threading.RLock()
+        self.dependencies = self._build_dependencies()
+        self._check_cycles()
+
+    @staticmethod
+    def _normalize_depends(value):
+        if not value:
+            return []
+        if isinstance(value, str):
+            return [value]
+        return [str(v) for v in value if v]
+
+    def _build_dependencies(self):
+        """Retorna {indice: [indices de los que depende]}"""
+        by_name = {}
+        for index, app in enumerate(self.apps):
+            by_name.setdefault(app.get("nombre", ""), index)
+
+        dependencies = {}
+        for index, app in enumerate(self.apps):
+            deps = []
+            for name in self._normalize_depends(app.get("depends_on")):
+                dep_index = by_name.get(name)
+                # Dependencias fuera del lote actual se consideran satisfechas
+                if dep_index is not None and dep_index != index:
+                    deps.append(dep_index)
+            dependencies[index] = deps
+
+        return dependencies
+
+    def _check_cycles(self):
+        """Valida que el grafo no tenga ciclos (algoritmo de Kahn)"""
+        pending = {i: len(deps) for i, deps in self.dependencies.items()}
+        dependents = self._dependents()
+        ready = [i for i, count in pending.items() if count == 0]
+        visited = 0
+
+        while ready:
+            node = ready.pop()
+            visited += 1
+            for child in dependents[node]:
+                pending[child] -= 1
+                if pending[child] == 0:
+                    ready.append(child)
+
+        if visited != len(self.apps):
+            nombres = [
+                self.apps[i].get("nombre", "Desconocido")
+                for i, count in pending.items() if count > 0
+            ]
+            raise SchedulerError(
+                "Dependencias circulares en el perfil: " + ", ".join(nombres)
+            )
+
+    def _dependents(self):
+        dependents = {i: [] for i in range(len(self.apps))}
+        for index, deps in self.dependencies.items():
+            for dep in deps:
+                dependents[dep].append(index)
+        return dependents
+
+    def _run_node(self, worker, index):
+        app = self.apps[index]
+        try:
+            if app.get("exclusive"):
+                with self.exclusive_lock:
+                    return worker(app, index + 1)
+            return worker(app, index + 1)
+        except Exception as e:
+            nombre = app.get("nombre", "Desconocido")
+            logger.log(f"Error inesperado procesando {nombre}: {e}")
+            for line in traceback.format_exc().rstrip().splitlines():
+                logger.log(line)
+            logger.log("")
+            return "failed"
+
+    def run(self, worker, on_done=None, on_blocked=None, should_stop=None):
+        """
+        Ejecuta todas las apps.
+
+        Args:
+            worker: callable(app, index) -> "success" | "failed" | "skipped" | "cancelled"
+            on_done: callable(app, index, result), se invoca en el hilo que
+                llama a run() cada vez que una app termina.
+            on_blocked: callable(app, index, dependency_app), se invoca cuando
+                una app se omite porque una dependencia no se completó.
+            should_stop: callable() -> bool. Si retorna True, las apps que
+                aún no empezaron terminan como "cancelled" sin ejecutarse.
+
+        Returns:
+            Lista de resultados en el mismo orden que `apps`.
+        """
+        results = [None] * len(self.apps)
+        pending = {i: len(deps) for i, deps in self.dependencies.items()}
+        dependents = self._dependents()
+
+        ready = [i for i, count in pending.items() if count == 0]
+        heapq.heapify(ready)
+
+        def finish(index, result):
+            results[index] = result
+            if on_done:
+                on_done(self.apps[index], index + 1, result)
+
+            for child in dependents[index]:
+                pending[child] -= 1
+                if pending[child] == 0:
+                    heapq.heappush(ready, child)
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="instalador"
+        ) as pool:
+            running = {}
+
+            while ready or running:
+                # Solo se entrega al pool lo que puede empezar ya: lo demás
+                # espera en `ready`, donde aún cuentan el orden y should_stop
+                while ready and len(running) < self.max_workers:
+                    index = heapq.heappop(ready)
+                    if should_stop and should_stop():
+                        finish(index, "cancelled")
+                        continue
+
+                    failed_dep = next(
+                        (d for d in self.dependencies[index] if results[d] != "success"),
+                        None
+                    )
+
+                    if failed_dep is not None:
+                        if on_blocked:
+                            on_blocked(self.apps[index], index + 1, self.apps[failed_dep])
+                        finish(index, "skipped")
+                        continue
+
+                    future = pool.submit(self._run_node, worker, index)
+                    running[future] = index
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=running.get):
+                    index = running.pop(future)
+                    finish(index, future.result())
+
+        return results
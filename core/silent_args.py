@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import threading
+
+from utils.file_utils import get_program_data_dir
+from utils.installer_cache import file_sha256
+
+# Resultados que se registran por intento
+RESULTS = ("ok", "fail", "timeout")
+
+
+class SilentArgsStore:
+    """
+    Conocimiento persistente de argumentos silenciosos.
+
+    Por cada instalador (identificado por su SHA-256) se guarda cuántas veces
+    cada conjunto de argumentos funcionó, falló o se colgó, y además un
+    acumulado por motor (inno, nsis, ...). Con eso los candidatos se reordenan
+    para que el que ya funcionó se pruebe primero y los que se colgaron al
+    final, evitando esperar el timeout en cada despliegue.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_program_data_dir(), "silent_args.json")
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data.setdefault("installers", {})
+                data.setdefault("engines", {})
+                data.setdefault("fingerprints", {})
+                return data
+        except Exception:
+            pass
+        return {"installers": {}, "engines": {}, "fingerprints": {}}
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            pass
+
+    def fingerprint(self, installer_path):
+        """
+        SHA-256 del instalador. Se recuerda por nombre + tamaño + fecha para
+        no volver a leer el archivo completo en cada ejecución.
+        """
+        stat = os.stat(installer_path)
+        quick_key = f"{os.path.basename(installer_path).lower()}|{stat.st_size}|{stat.st_mtime_ns}"
+
+        with self._lock:
+            sha256 = self._data["fingerprints"].get(quick_key)
+        if sha256:
+            return sha256
+
+        sha256 = file_sha256(installer_path)
+        with self._lock:
+            self._data["fingerprints"][quick_key] = sha256
+            self._save()
+        return sha256
+
+    @staticmethod
+    def _score(stats):
+        """Tasa de éxito suavizada (sin historial = 0.5)"""
+        ok = stats.get("ok", 0)
+        bad = stats.get("fail", 0) + stats.get("timeout", 0)
+        return (ok + 1) / (ok + bad + 2)
+
+    def rank(self, sha256, engine, candidates):
+        """
+        Reordena los candidatos según el historial. El último conjunto que
+        funcionó con este mismo instalador va primero aunque no esté en la
+        lista original.
+        """
+        with self._lock:
+            installer = self._data["installers"].get(sha256, {}) if sha256 else {}
+            by_installer = installer.get("args", {})
+            by_engine = self._data["engines"].get(engine, {})
+            winner = installer.get("winner")
+
+        ordered = list(candidates)
+        if winner is not None and winner not in ordered:
+            ordered.insert(0, winner)
+
+        def key(item):
+            index, candidate = item
+            own = by_installer.get(candidate, {})
+            return (
+                candidate != winner,
+                own.get("timeout", 0) > 0 and not own.get("ok", 0),
+                -self._score(own),
+                -self._score(by_engine.get(candidate, {})),
+                index,
+            )
+
+        return [candidate for _, candidate in sorted(enumerate(ordered), key=key)]
+
+    def record(self, sha256, engine, nombre, candidate, result):
+        """Registra el resultado de un intento: ok, fail o timeout"""
+        if result not in RESULTS:
+            return
+
+        with self._lock:
+            if sha256:
+                installer = self._data["installers"].setdefault(sha256, {"args": {}})
+                installer["nombre"] = nombre
+                installer["engine"] = engine
+                stats = installer["args"].setdefault(candidate, {})
+                stats[result] = stats.get(result, 0) + 1
+                stats["last"] = time.time()
+                if result == "ok":
+                    installer["winner"] = candidate
+                elif installer.get("winner") == candidate:
+                    installer.pop("winner", None)
+
+            engine_stats = self._data["engines"].setdefault(engine or "unknown", {})
+            stats = engine_stats.setdefault(candidate, {})
+            stats[result] = stats.get(result, 0) + 1
+
+            self._save()
+
+    def known_winner(self, sha256):
+        with self._lock:
+            return self._data["installers"].get(sha256, {}).get("winner")
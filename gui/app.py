@@ -5,6 +5,8 @@ from gui.components import create_menu_button, InstallProgressDialog
 from core.catalog_manager import CatalogManager
 from core.logger import Logger, global_logger
 from core.installer import Installer
+from core.config import load_config
+from core.run_journal import RunJournal, STATUS_REBOOT, clear_resume_on_boot
 from gui.components import create_menu_button, InstallProgressDialog
 from version.github_updater import APP_VERSION
 from gui.views import (
@@ -75,14 +77,19 @@ class AutoInstallerApp:
             'progress_stop_activity': self.progress_stop_activity,
         }
         
-        self.installer = Installer(installer_callbacks)
+        self.installer = Installer(installer_callbacks, catalog=self.catalog)
 
         # Mostrar vista inicial
         self.show_home()
     
     def show_progress_dialog(self):
         if self.progress_dialog is None or not self.progress_dialog.winfo_exists():
-            self.progress_dialog = InstallProgressDialog(self.root)
+            self.progress_dialog = InstallProgressDialog(
+                self.root,
+                on_cancel=self.installer.cancel,
+                on_pause=self.installer.pause,
+                on_resume=self.installer.resume,
+            )
             self.progress_dialog.grab_set()
 
     def close_progress_dialog(self):
@@ -500,7 +507,12 @@ class AutoInstallerApp:
     
     def show_progress_dialog(self):
         if self.progress_dialog is None or not self.progress_dialog.winfo_exists():
-            self.progress_dialog = InstallProgressDialog(self.root)
+            self.progress_dialog = InstallProgressDialog(
+                self.root,
+                on_cancel=self.installer.cancel,
+                on_pause=self.installer.pause,
+                on_resume=self.installer.resume,
+            )
 
     def close_progress_dialog(self):
         if self.progress_dialog and self.progress_dialog.winfo_exists():
@@ -536,6 +548,46 @@ class AutoInstallerApp:
             daemon=True
         ).start()
 
+    def resume_pending_batch(self, from_reboot=False):
+        """
+        Si quedó un lote sin terminar (reinicio, corte de luz, cierre o
+        cancelación) lo continúa desde la primera app pendiente.
+
+        instalacion.reanudar_al_iniciar en config.json: "preguntar" (por
+        defecto), "automatico" o "nunca". Al abrirse tras un reinicio pedido
+        por un instalador (from_reboot) se continúa sin preguntar.
+        """
+        config = load_config() or {}
+        policy = config.get("instalacion", {}).get("reanudar_al_iniciar", "preguntar")
+        if policy == "nunca":
+            return
+
+        journal = RunJournal()
+        pending = journal.pending()
+        if not pending:
+            return
+
+        total = len(pending["apps"])
+        done = len(pending["done"])
+        automatic = policy == "automatico" or (from_reboot and pending["status"] == STATUS_REBOOT)
+
+        if not automatic:
+            resume = messagebox.askyesno(
+                "Instalación pendiente",
+                f"Quedó sin terminar la instalación \"{pending['mode']}\" "
+                f"({done} de {total} aplicaciones completadas).\n\n"
+                "¿Desea continuarla ahora?",
+            )
+            if not resume:
+                journal.discard()
+                clear_resume_on_boot()
+                return
+
+        self.current_apps = pending["apps"]
+        self.current_mode_name = pending["mode"]
+        self.set_status(f"Continuando instalación pendiente: {pending['mode']}")
+        self.start_installation()
+
     def save_new_app(self, app_data):
         self.catalog.add_app(app_data)
         self.show_applications()
@@ -2,7 +2,10 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+from tkinter import font as tkfont
 from core.config import load_config
+from core.log_rotation import GZ_SUFFIX, existing_variant, plain_copy
+from utils.line_index import LineIndex
 
 def create_menu_button(parent, text, command):
     """Crea un botón de menú con estilo consistente"""
@@ -100,13 +103,20 @@ def create_info_table(parent, data):
         )
         value_label.grid(row=i, column=1, sticky="nsew")
 
+# Líneas nuevas del progreso se dibujan a lo sumo una vez por cuadro (~60 fps)
+LOG_FRAME_MS = 16
+LOG_MAX_LINES = 2000
+# Cada cuánto el visor revisa si el log abierto creció
+LOG_REFRESH_MS = 1000
+
+
 class InstallProgressDialog(tk.Toplevel):
-    def __init__(self, parent):
+    def __init__(self, parent, on_cancel=None, on_pause=None, on_resume=None):
         super().__init__(parent)
         self.title("Progreso de instalación")
-        self.geometry("580x360")
-        self.minsize(580, 360)
-        self.maxsize(580, 360)
+        self.geometry("580x400")
+        self.minsize(580, 400)
+        self.maxsize(580, 400)
         self.resizable(False, False)
         self.transient(parent)
         self.configure(bg="#eef2f7")
@@ -115,6 +125,12 @@ class InstallProgressDialog(tk.Toplevel):
         self.status_var = tk.StringVar(value="Preparando instalación...")
         self.current_app_var = tk.StringVar(value="Esperando...")
         self.progress_var = tk.IntVar(value=0)
+        self._pending_log = []
+        self._log_scheduled = False
+        self._on_cancel = on_cancel
+        self._on_pause = on_pause
+        self._on_resume = on_resume
+        self._paused = False
 
         self._center_window(parent)
         self._build_ui()
@@ -122,7 +138,7 @@ class InstallProgressDialog(tk.Toplevel):
     def _center_window(self, parent):
         self.update_idletasks()
         width = 580
-        height = 360
+        height = 400
 
         if parent and parent.winfo_exists():
             parent.update_idletasks()
@@ -199,14 +215,53 @@ class InstallProgressDialog(tk.Toplevel):
             padx=10,
             pady=10
         )
-        self.log_box.pack(fill="both", expand=True, padx=20, pady=(0, 18))
+        self.log_box.pack(fill="both", expand=True, padx=20, pady=(0, 10))
         self.log_box.config(state="disabled")
 
+        buttons = tk.Frame(card, bg="white")
+        buttons.pack(fill="x", padx=20, pady=(0, 14))
+
+        self.cancel_button = ttk.Button(buttons, text="Cancelar", command=self._cancel)
+        self.cancel_button.pack(side="right")
+        self.pause_button = ttk.Button(buttons, text="Pausar", command=self._toggle_pause)
+        self.pause_button.pack(side="right", padx=(0, 8))
+
+        if not self._on_cancel:
+            self.cancel_button.config(state="disabled")
+        if not (self._on_pause and self._on_resume):
+            self.pause_button.config(state="disabled")
+
         self.log_box.tag_configure("success", foreground="#15803d")
         self.log_box.tag_configure("error", foreground="#b91c1c")
         self.log_box.tag_configure("info", foreground="#2563eb")
         self.log_box.tag_configure("normal", foreground="#111827")
 
+    def _toggle_pause(self):
+        if self._paused:
+            self._paused = False
+            self.pause_button.config(text="Pausar")
+            self._on_resume()
+        else:
+            self._paused = True
+            self.pause_button.config(text="Reanudar")
+            self._on_pause()
+
+    def _cancel(self):
+        confirm = messagebox.askyesno(
+            "Cancelar instalación",
+            "¿Desea cancelar la instalación?\n\n"
+            "Se detendrá el instalador en curso y no se iniciarán más aplicaciones. "
+            "Al volver a ejecutar el mismo lote se continuará desde la primera "
+            "aplicación sin terminar.",
+            parent=self,
+        )
+        if not confirm:
+            return
+
+        self.cancel_button.config(state="disabled")
+        self.pause_button.config(state="disabled")
+        self._on_cancel()
+
     def set_current_app(self, text):
         self.current_app_var.set(text)
         self.update_idletasks()
@@ -235,11 +290,35 @@ class InstallProgressDialog(tk.Toplevel):
         self.update_idletasks()
 
     def append_log(self, message, level="normal"):
+        """
+        Acumula la línea y la dibuja en el siguiente cuadro junto con las
+        demás que lleguen, en lugar de redibujar por cada línea.
+        """
+        self._pending_log.append((message, level))
+        if not self._log_scheduled:
+            self._log_scheduled = True
+            self.after(LOG_FRAME_MS, self._flush_log)
+
+    def _flush_log(self):
+        self._log_scheduled = False
+        pending, self._pending_log = self._pending_log, []
+        if not pending or not self.winfo_exists():
+            return
+
+        args = []
+        for message, level in pending:
+            args.extend((message + "\n", level))
+
         self.log_box.config(state="normal")
-        self.log_box.insert("end", message + "\n", level)
+        self.log_box.insert("end", *args)
+
+        # Solo se conservan las últimas líneas en la ventana de progreso
+        lines = int(self.log_box.index("end-1c").split(".")[0])
+        if lines > LOG_MAX_LINES:
+            self.log_box.delete("1.0", f"{lines - LOG_MAX_LINES}.0")
+
         self.log_box.see("end")
         self.log_box.config(state="disabled")
-        self.update_idletasks()
 
 
 class AppFormDialog(tk.Toplevel):
@@ -270,6 +349,7 @@ class AppFormDialog(tk.Toplevel):
         self.ruta_var = tk.StringVar(value=self.app_data.get("ruta", ""))
         self.args_var = tk.StringVar(value=self.app_data.get("args", ""))
         self.copiar_temp_var = tk.BooleanVar(value=self.app_data.get("copiar_a_temp", True))
+        self.incremental_var = tk.BooleanVar(value=self.app_data.get("modo_copia") == "incremental")
         self.modo_argumentos_var = tk.StringVar(value="automatico")
         self.tipo_origen_var = tk.StringVar(value="archivo")
         self.show_advanced_var = tk.BooleanVar(value=False)
@@ -438,6 +518,12 @@ class AppFormDialog(tk.Toplevel):
             justify="left"
         ).grid(row=2, column=0, sticky="w", padx=12, pady=(0, 10))
 
+        ttk.Checkbutton(
+            self.advanced_frame,
+            text="Carpetas: sincronizar solo cambios (incremental) en lugar de reemplazar todo",
+            variable=self.incremental_var
+        ).grid(row=3, column=0, sticky="w", padx=12, pady=(0, 10))
+
         tk.Label(
             body,
             textvariable=self.status_var,
@@ -591,7 +677,358 @@ class AppFormDialog(tk.Toplevel):
             "copiar_a_temp": copiar_temp
         }
 
+        if tipo in ["copy_folder", "carpeta"]:
+            app_data["modo_copia"] = "incremental" if self.incremental_var.get() else "reemplazar"
+
         self.on_save(app_data)
         self.destroy()
 
-    
\ No newline at end of file
+    
+
+class LogSearchPanel(tk.Frame):
+    """
+    Buscador de ejecuciones sobre el índice de bitácoras.
+    Filtra por app, resultado, fechas y equipo, y muestra los resultados
+    por páginas. Al hacer doble clic se llama on_open(ruta_del_log).
+    """
+
+    RESULTS = {
+        "Todos": None,
+        "Correctas": "success",
+        "Fallidas": "failed",
+        "Omitidas": "skipped",
+        "Canceladas": "cancelled",
+    }
+    RESULT_LABELS = {
+        "success": "Correcta",
+        "failed": "Fallida",
+        "skipped": "Omitida",
+        "cancelled": "Cancelada",
+    }
+
+    def __init__(self, parent, index, on_open):
+        super().__init__(parent, bg="#ffffff")
+        self.index = index
+        self.on_open = on_open
+        self.page = 0
+        self._paths = {}
+
+        self.app_var = tk.StringVar()
+        self.result_var = tk.StringVar(value="Todos")
+        self.date_from_var = tk.StringVar()
+        self.date_to_var = tk.StringVar()
+        self.machine_var = tk.StringVar()
+        self.page_var = tk.StringVar()
+
+        self._build()
+
+    def _build(self):
+        filters = tk.Frame(self, bg="#ffffff")
+        filters.pack(fill="x")
+
+        fields = [
+            ("Aplicación", ttk.Entry(filters, textvariable=self.app_var, width=18)),
+            ("Resultado", ttk.Combobox(
+                filters,
+                textvariable=self.result_var,
+                values=list(self.RESULTS),
+                state="readonly",
+                width=11
+            )),
+            ("Desde (AAAA-MM-DD)", ttk.Entry(filters, textvariable=self.date_from_var, width=12)),
+            ("Hasta", ttk.Entry(filters, textvariable=self.date_to_var, width=12)),
+            ("Equipo", ttk.Entry(filters, textvariable=self.machine_var, width=14)),
+        ]
+
+        for column, (label, widget) in enumerate(fields):
+            tk.Label(
+                filters,
+                text=label,
+                bg="#ffffff",
+                fg="#374151",
+                font=("Segoe UI", 9)
+            ).grid(row=0, column=column, sticky="w", padx=(0, 8))
+            widget.grid(row=1, column=column, sticky="w", padx=(0, 8))
+
+        tk.Button(
+            filters,
+            text="Buscar",
+            bg="#0d6efd",
+            fg="white",
+            relief="flat",
+            cursor="hand2",
+            font=("Segoe UI", 9, "bold"),
+            command=self.search
+        ).grid(row=1, column=len(fields), sticky="w")
+
+        tk.Button(
+            filters,
+            text="Reindexar",
+            bg="#6c757d",
+            fg="white",
+            relief="flat",
+            cursor="hand2",
+            font=("Segoe UI", 9, "bold"),
+            command=self.reindex
+        ).grid(row=1, column=len(fields) + 1, sticky="w", padx=(8, 0))
+
+        columns = ("fecha", "equipo", "modo", "app", "resultado", "duracion")
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=6)
+        for column, title, width in [
+            ("fecha", "Fecha", 130),
+            ("equipo", "Equipo", 110),
+            ("modo", "Modo", 130),
+            ("app", "Aplicación", 200),
+            ("resultado", "Resultado", 80),
+            ("duracion", "Duración", 70),
+        ]:
+            self.tree.heading(column, text=title)
+            self.tree.column(column, width=width, anchor="w")
+        self.tree.pack(fill="x", pady=(8, 4))
+        self.tree.bind("<Double-1>", self._on_double_click)
+
+        pager = tk.Frame(self, bg="#ffffff")
+        pager.pack(fill="x")
+
+        self.prev_button = ttk.Button(pager, text="< Anterior", command=lambda: self._go(-1))
+        self.prev_button.pack(side="left")
+        tk.Label(pager, textvariable=self.page_var, bg="#ffffff", fg="#4b5563").pack(side="left", padx=8)
+        self.next_button = ttk.Button(pager, text="Siguiente >", command=lambda: self._go(1))
+        self.next_button.pack(side="left")
+
+    def search(self):
+        self.page = 0
+        try:
+            self.index.sync()
+        except Exception:
+            pass
+        self._load_page()
+
+    def reindex(self):
+        """Vuelve a recorrer la carpeta de bitácoras (archivos copiados o borrados a mano)"""
+        try:
+            self.index.sync(force=True)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo reindexar las bitácoras.\n\n{e}")
+            return
+        self.page = 0
+        self._load_page()
+
+    def _go(self, delta):
+        self.page = max(0, self.page + delta)
+        self._load_page()
+
+    def _load_page(self):
+        try:
+            rows, has_more = self.index.search(
+                app=self.app_var.get().strip() or None,
+                result=self.RESULTS.get(self.result_var.get()),
+                date_from=self.date_from_var.get().strip() or None,
+                date_to=self.date_to_var.get().strip() or None,
+                machine=self.machine_var.get().strip() or None,
+                page=self.page,
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo consultar el índice de bitácoras.\n\n{e}")
+            return
+
+        self.tree.delete(*self.tree.get_children())
+        self._paths = {}
+
+        for row in rows:
+            seconds = row.get("seconds")
+            item = self.tree.insert("", "end", values=(
+                (row.get("started") or "").replace("T", " "),
+                row.get("machine") or "",
+                row.get("mode") or "",
+                row.get("app") or "",
+                self.RESULT_LABELS.get(row.get("result"), row.get("result") or ""),
+                f"{seconds:.0f} s" if seconds is not None else "",
+            ))
+            self._paths[item] = row["log_path"]
+
+        self.page_var.set(f"Página {self.page + 1}")
+        self.prev_button.state(["!disabled"] if self.page > 0 else ["disabled"])
+        self.next_button.state(["!disabled"] if has_more else ["disabled"])
+
+    def _on_double_click(self, _event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._paths:
+            self.on_open(self._paths[selection[0]])
+
+
+class VirtualLogView(tk.Frame):
+    """
+    Visor de bitácoras que solo dibuja las líneas visibles.
+
+    El archivo se indexa con LineIndex (memoria mapeada + índice por
+    bloques) y el Text muestra una ventana de líneas que se reemplaza al
+    desplazarse, de modo que abrir un log de decenas de MB es inmediato.
+    También puede mostrar un texto cualquiera (mensajes, vista de eventos).
+
+    Mientras un log sin comprimir está abierto se revisa cada
+    LOG_REFRESH_MS si creció (una ejecución en curso) y se agrega lo nuevo.
+    """
+
+    def __init__(self, parent, **text_options):
+        super().__init__(parent, bg=parent.cget("bg"))
+        self._index = None
+        self._lines = []
+        self._top = 0
+        self._line_height = 0
+        # Líneas que realmente caben con el ajuste de línea (se mide al dibujar)
+        self._shown = 1
+        self._refresh_job = None
+
+        self.text = tk.Text(self, wrap="word", **text_options)
+        self.text.grid(row=0, column=0, sticky="nsew")
+        self.text.config(state="disabled")
+
+        self.vscroll = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.vscroll.grid(row=0, column=1, sticky="ns")
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.text.bind(sequence, self._on_wheel)
+        for key, delta in (("<Prior>", -1), ("<Next>", 1)):
+            self.text.bind(key, lambda _e, d=delta: self._scroll_pages(d))
+        self.text.bind("<Configure>", lambda _e: self._render())
+        self.bind("<Destroy>", lambda _e: self._close_index())
+
+    # ===== contenido =====
+    def open_file(self, path, follow_end=True):
+        """
+        Muestra un archivo; con follow_end se posiciona al final. Las
+        bitácoras comprimidas (.gz) se descomprimen a una copia temporal.
+        """
+        self._close_index()
+        source = existing_variant(path) or path
+        try:
+            self._index = LineIndex(plain_copy(source))
+        except Exception as e:
+            self.show_text(f"No se pudo leer la bitácora.\n\nDetalle: {e}")
+            return False
+
+        # Una copia descomprimida de un .gz no crece: solo se sigue el log real
+        live = not source.endswith(GZ_SUFFIX)
+        if not self._index.line_count and not live:
+            self.show_text("La bitácora está vacía.")
+            return True
+        if live:
+            self._schedule_refresh()
+
+        self._lines = []
+        self._top = max(0, self._total() - self._rows()) if follow_end else 0
+        self._render()
+        return True
+
+    def show_text(self, content):
+        self._close_index()
+        self._lines = content.split("\n")
+        self._top = 0
+        self._render()
+
+    def refresh(self):
+        """Relee lo agregado al archivo abierto (si creció)"""
+        if not self._index:
+            return
+        previous = self._index.line_count
+        try:
+            grew = self._index.refresh()
+        except OSError:
+            return
+        if grew:
+            # Si se estaba viendo el final, se sigue el final
+            if self._top + self._rows() >= previous:
+                self._top = max(0, self._total() - self._rows())
+            self._render()
+
+    def _schedule_refresh(self):
+        self._refresh_job = self.after(LOG_REFRESH_MS, self._on_refresh_timer)
+
+    def _on_refresh_timer(self):
+        self._refresh_job = None
+        if self._index:
+            self.refresh()
+            self._schedule_refresh()
+
+    def _close_index(self):
+        if self._refresh_job:
+            try:
+                self.after_cancel(self._refresh_job)
+            except tk.TclError:
+                pass
+            self._refresh_job = None
+        if self._index:
+            self._index.close()
+            self._index = None
+
+    # ===== ventana visible =====
+    def _total(self):
+        return self._index.line_count if self._index else len(self._lines)
+
+    def _rows(self):
+        if not self._line_height:
+            self._line_height = max(1, tkfont.Font(font=self.text.cget("font")).metrics("linespace"))
+        return max(1, self.text.winfo_height() // self._line_height)
+
+    def _window(self, first, count):
+        if self._index:
+            return self._index.lines(first, count)
+        return self._lines[first:first + count]
+
+    def _render(self):
+        total = self._total()
+        rows = self._rows()
+        self._top = max(0, min(self._top, total - rows))
+
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", "\n".join(self._window(self._top, rows)))
+        self.text.config(state="disabled")
+
+        # Con ajuste de línea puede que no quepan todas: al final del archivo
+        # se asegura que la última línea quede visible
+        if self._top + rows >= total:
+            self.text.see("end")
+        self._shown = self._visible_lines()
+
+        if total <= rows:
+            self.vscroll.set(0, 1)
+        else:
+            self.vscroll.set(self._top / total, min(1.0, (self._top + self._shown) / total))
+
+    def _visible_lines(self):
+        try:
+            first = int(self.text.index("@0,0").split(".")[0])
+            last = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+            return max(1, last - first)
+        except (tk.TclError, ValueError):
+            return max(1, self._rows() - 1)
+
+    def _scroll_to(self, top):
+        self._top = int(top)
+        self._render()
+
+    def _scroll_pages(self, pages):
+        self._scroll_to(self._top + pages * self._shown)
+        return "break"
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(float(value) * self._total())
+        elif action == "scroll":
+            step = self._shown if unit == "pages" else 1
+            self._scroll_to(self._top + int(value) * step)
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4:
+            delta = -3
+        elif getattr(event, "num", None) == 5:
+            delta = 3
+        else:
+            delta = -3 if event.delta > 0 else 3
+        self._scroll_to(self._top + delta)
+        return "break"
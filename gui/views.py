@@ -2,13 +2,16 @@ import tkinter as tk
 import os
 from tkinter import messagebox
 from core.config import load_json_file
-from core.logger import global_logger as logger
+from core.logger import global_logger as logger, events_path_for
+from core.log_rotation import existing_variant
+from core.run_events import render_run_events
 from gui.components import create_profile_card, create_info_table
-from utils.system_info import (get_system_info,open_driver_support_page,update_drivers,export_system_info_html)
+from utils.system_info import (open_driver_support_page,update_drivers,export_system_info_html)
+from utils.inventory_cache import inventory_cache
 from tkinter import ttk
 from gui.domain_view import DomainView
 from utils.admin_utils import is_admin
-from gui.components import AppFormDialog
+from gui.components import AppFormDialog, LogSearchPanel, VirtualLogView
 from core.catalog_manager import CatalogManager
 
 # ============= VISTA INICIO =============
@@ -492,8 +495,6 @@ def show_equipo(app):
         font=("Segoe UI", 10)
     ).pack(anchor="w", pady=(0, 12))
 
-    info = get_system_info()
-
     table_container = tk.Frame(app.content_area, bg="#ffffff")
     table_container.pack(fill="both", expand=True, pady=(5, 10))
 
@@ -512,15 +513,58 @@ def show_equipo(app):
     canvas.pack(side="left", fill="both", expand=True)
     scrollbar.pack(side="right", fill="y")
 
-    # Crear tabla de información
-    create_info_table(scrollable_frame, info)
+    # La consulta completa corre en segundo plano (inventory_cache); la
+    # primera vez se muestra un estado de carga y la tabla se llena al terminar
+    current = {"info": inventory_cache.cached()}
+
+    def render(info):
+        try:
+            if not scrollable_frame.winfo_exists():
+                return False
+        except tk.TclError:
+            return False
+
+        for widget in scrollable_frame.winfo_children():
+            widget.destroy()
+
+        if info is None:
+            tk.Label(
+                scrollable_frame,
+                text="Cargando información del equipo...",
+                bg="#ffffff",
+                fg="#6c757d",
+                font=("Segoe UI", 10, "italic")
+            ).grid(row=0, column=0, sticky="w", padx=10, pady=8)
+            return True
+
+        current["info"] = info
+        create_info_table(scrollable_frame, info)
+        return True
+
+    def load(force=False):
+        render(None)
+        inventory_cache.refresh(
+            on_done=lambda info: app.root.after(0, lambda: on_loaded(info)),
+            force=force
+        )
+
+    def on_loaded(info):
+        if render(info) and "Error" not in info:
+            app.set_status("Información del equipo actualizada")
+
+    if current["info"] is None:
+        load()
+    else:
+        render(current["info"])
 
     buttons_frame = tk.Frame(app.content_area, bg="#ffffff")
     buttons_frame.pack(fill="x", pady=(15, 5))
 
     def refresh_info():
-        show_equipo(app)
-        app.set_status("Información del equipo actualizada")
+        if inventory_cache.is_loading:
+            return
+        app.set_status("Actualizando información del equipo...")
+        load(force=True)
 
     def on_open_drivers():
         try:
@@ -542,7 +586,10 @@ def show_equipo(app):
 
     def on_export_html():
         try:
-            report_path = export_system_info_html(info)
+            if current["info"] is None:
+                messagebox.showinfo("Equipo", "La información del equipo aún se está cargando.")
+                return
+            report_path = export_system_info_html(current["info"])
             os.startfile(report_path)
             app.set_status("Reporte HTML generado correctamente")
         except Exception as e:
@@ -645,6 +692,16 @@ def show_bitacora(app):
         font=("Segoe UI", 10)
     ).pack(anchor="w", pady=(0, 12))
 
+    search_panel = None
+    log_index = logger.get_index()
+    if log_index:
+        search_panel = LogSearchPanel(
+            app.content_area,
+            log_index,
+            on_open=lambda path: load_log_into_box(path)
+        )
+        search_panel.pack(fill="x", pady=(0, 10))
+
     info_var = tk.StringVar()
     info_label = tk.Label(
         app.content_area,
@@ -657,57 +714,60 @@ def show_bitacora(app):
     )
     info_label.pack(anchor="w", pady=(0, 10))
 
-    log_box_frame = tk.Frame(app.content_area, bg="#ffffff")
-    log_box_frame.pack(fill="both", expand=True)
-
-    log_box = tk.Text(
-        log_box_frame,
+    # Solo se dibujan las líneas visibles; el archivo no se carga completo
+    log_view = VirtualLogView(
+        app.content_area,
         height=18,
         bg="#f8fafc",
         fg="#111827",
         insertbackground="#111827",
         relief="solid",
         bd=1,
-        wrap="word",
         font=("Consolas", 10),
         padx=10,
         pady=10
     )
-    log_box.pack(side="left", fill="both", expand=True)
-
-    log_scroll = ttk.Scrollbar(log_box_frame, orient="vertical", command=log_box.yview)
-    log_scroll.pack(side="right", fill="y")
-    log_box.configure(yscrollcommand=log_scroll.set)
+    log_view.pack(fill="both", expand=True)
 
-    def load_log_into_box():
-        log_box.config(state="normal")
-        log_box.delete("1.0", tk.END)
+    events_var = tk.BooleanVar(value=False)
+    opened = {"path": None}
 
+    def load_log_into_box(path=None):
         # Determinar qué log mostrar
         selected_log = None
 
-        # Primero intentar con el log actual de la sesión
-        if logger.log_file_path and os.path.exists(logger.log_file_path):
+        # Una ejecución elegida en el buscador, o el log actual de la sesión
+        if path and existing_variant(path):
+            selected_log = existing_variant(path)
+            opened["path"] = path
+        elif logger.log_file_path and os.path.exists(logger.log_file_path):
             selected_log = logger.log_file_path
         else:
             selected_log = logger.get_latest_log_file()
 
         if not selected_log:
             info_var.set("No se encontraron archivos de bitácora.")
-            log_box.insert("1.0", "Todavía no existe ninguna bitácora para mostrar.")
-            log_box.config(state="disabled")
+            log_view.show_text("Todavía no existe ninguna bitácora para mostrar.")
+            return
+
+        if selected_log == logger.log_file_path:
+            logger.flush()
+
+        events_path = existing_variant(events_path_for(selected_log))
+        if events_var.get() and events_path:
+            info_var.set(f"Eventos cargados: {events_path}")
+            content = render_run_events(events_path)
+            log_view.show_text(content if content.strip() else "La bitácora está vacía.")
             return
 
         info_var.set(f"Archivo cargado: {selected_log}")
-        content = logger.read_log_content(selected_log)
-        log_box.insert("1.0", content if content.strip() else "La bitácora está vacía.")
-        log_box.config(state="disabled")
+        log_view.open_file(selected_log)
 
     buttons_frame = tk.Frame(app.content_area, bg="#ffffff")
     buttons_frame.pack(fill="x", pady=(12, 0))
 
     def refresh_log():
-        load_log_into_box()
+        load_log_into_box(opened["path"])
         app.set_status("Bitácora actualizada")
 
     def open_logs_folder():
@@ -736,7 +796,20 @@ def show_bitacora(app):
         command=open_logs_folder
     ).pack(side="left")
 
+    tk.Checkbutton(
+        buttons_frame,
+        text="Vista de eventos",
+        variable=events_var,
+        bg="#ffffff",
+        fg="#111827",
+        font=("Segoe UI", 10),
+        activebackground="#ffffff",
+        command=refresh_log
+    ).pack(side="left", padx=(12, 0))
+
     load_log_into_box()
+    if search_panel:
+        search_panel.search()
     app.set_status("Vista de bitácora")
 
 
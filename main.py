@@ -7,7 +7,9 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from core.admin import ensure_admin
 from core.network_auth import ensure_network_access
+from core.run_journal import RESUME_ARG
 from gui.app import AutoInstallerApp
+from utils.inventory_cache import inventory_cache
 from version.github_updater import check_and_update
 
 
@@ -23,6 +25,9 @@ def main():
 
     app = AutoInstallerApp()
 
+    # La información del equipo se consulta en segundo plano desde el inicio
+    inventory_cache.refresh()
+
     share_root = r"\\10.0.5.157\Soporte"
     ok = ensure_network_access(app.root, share_root)
 
@@ -34,6 +39,9 @@ def main():
         app.root.destroy()
         return
 
+    # Continuar un lote que quedó sin terminar (p. ej. tras un reinicio)
+    app.root.after(500, lambda: app.resume_pending_batch(from_reboot=RESUME_ARG in sys.argv))
+
     app.run()
 
 
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+# Las pruebas importan los módulos igual que main.py (core.*, utils.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from utils import copy_engine
+from utils.copy_engine import CopyStats, JOURNAL_SUFFIX, PARTIAL_SUFFIX, copy_tree, sync_tree
+
+CHUNK = 64 * 1024
+
+
+class Interrupted(Exception):
+    pass
+
+
+def _interrupt_after(chunks):
+    calls = {"n": 0}
+
+    def checkpoint():
+        calls["n"] += 1
+        if calls["n"] > chunks:
+            raise Interrupted()
+
+    return checkpoint
+
+
+@pytest.fixture
+def source(tmp_path):
+    src = tmp_path / "origen"
+    src.mkdir()
+    (src / "grande.bin").write_bytes(os.urandom(CHUNK * 40))
+    return src
+
+
+def test_sync_with_delete_resumes_interrupted_file(tmp_path, source):
+    dst = tmp_path / "destino"
+    chunks_done = copy_engine.JOURNAL_EVERY * 2 + 1
+
+    with pytest.raises(Interrupted):
+        sync_tree(str(source), str(dst), chunk_size=CHUNK, workers=1,
+                  checkpoint=_interrupt_after(chunks_done))
+
+    assert (dst / ("grande.bin" + PARTIAL_SUFFIX)).exists()
+    assert (dst / ("grande.bin" + JOURNAL_SUFFIX)).exists()
+
+    stats = sync_tree(str(source), str(dst), chunk_size=CHUNK, workers=1, stats=CopyStats())
+
+    assert stats.bytes_resumed == CHUNK * copy_engine.JOURNAL_EVERY * 2
+    assert stats.files_deleted == 0
+    assert (dst / "grande.bin").read_bytes() == (source / "grande.bin").read_bytes()
+    assert not (dst / ("grande.bin" + PARTIAL_SUFFIX)).exists()
+    assert not (dst / ("grande.bin" + JOURNAL_SUFFIX)).exists()
+
+
+def test_sync_with_delete_removes_orphan_partials(tmp_path, source):
+    dst = tmp_path / "destino"
+    dst.mkdir()
+    orphan = dst / ("borrado.bin" + PARTIAL_SUFFIX)
+    orphan.write_bytes(b"x")
+    extra = dst / "sobra.txt"
+    extra.write_text("x")
+
+    stats = sync_tree(str(source), str(dst), chunk_size=CHUNK, workers=1)
+
+    assert not orphan.exists()
+    assert not extra.exists()
+    assert stats.files_deleted == 2
+
+
+def test_copy_tree_drops_staged_files_removed_from_source(tmp_path, source):
+    (source / "viejo.txt").write_text("x")
+    (source / "sub").mkdir()
+    (source / "sub" / "nota.txt").write_text("x")
+    dst = tmp_path / "destino"
+
+    # Interrumpida después de copiar viejo.txt y a mitad de grande.bin
+    files = sorted(os.listdir(source))
+    with pytest.raises(Interrupted):
+        copy_tree(str(source), str(dst), chunk_size=CHUNK, workers=1,
+                  checkpoint=_interrupt_after(copy_engine.JOURNAL_EVERY + 1 + len(files)))
+
+    staging = tmp_path / ("destino" + PARTIAL_SUFFIX)
+    assert (staging / "viejo.txt").exists()
+    assert (staging / "sub").is_dir()
+
+    (source / "viejo.txt").unlink()
+    (source / "sub" / "nota.txt").unlink()
+    (source / "sub").rmdir()
+
+    stats = copy_tree(str(source), str(dst), chunk_size=CHUNK, workers=1, stats=CopyStats())
+
+    assert sorted(os.listdir(dst)) == ["grande.bin"]
+    assert (dst / "grande.bin").read_bytes() == (source / "grande.bin").read_bytes()
+    assert stats.bytes_resumed > 0
+    assert stats.files_deleted == 0
+    assert not staging.exists()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import file_utils
+
+
+@pytest.fixture
+def temp_dir(tmp_path, monkeypatch):
+    target = tmp_path / "temp"
+    target.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(target))
+    monkeypatch.setattr(file_utils, "unblock_file", lambda path: None)
+    return target
+
+
+def _make_sources(tmp_path, count, name="setup.exe"):
+    sources = []
+    for i in range(count):
+        folder = tmp_path / f"share{i}"
+        folder.mkdir()
+        path = folder / name
+        path.write_bytes(os.urandom(256 * 1024) + bytes([i]))
+        sources.append(str(path))
+    return sources
+
+
+def test_same_basename_staged_in_parallel(tmp_path, temp_dir):
+    sources = _make_sources(tmp_path, 3)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        staged = list(pool.map(file_utils.stage_to_temp, sources))
+
+    assert len(set(staged)) == 3
+    for src, dst in zip(sources, staged):
+        assert os.path.basename(dst) == "setup.exe"
+        with open(src, "rb") as a, open(dst, "rb") as b:
+            assert a.read() == b.read()
+
+
+def test_same_source_twice_gets_separate_copies(tmp_path, temp_dir):
+    src = _make_sources(tmp_path, 1)[0]
+
+    first = file_utils.stage_to_temp(src)
+    second = file_utils.stage_to_temp(src)
+
+    assert first != second
+    assert os.path.exists(first) and os.path.exists(second)
+
+
+def test_remove_staged_frees_folder_for_reuse(tmp_path, temp_dir):
+    src = _make_sources(tmp_path, 1)[0]
+
+    first = file_utils.stage_to_temp(src)
+    file_utils.remove_staged(first)
+    assert not os.path.exists(os.path.dirname(first))
+
+    second = file_utils.stage_to_temp(src)
+    assert second == first
+
+
+def test_interrupted_copy_is_retried_in_same_folder(tmp_path, temp_dir, monkeypatch):
+    src = _make_sources(tmp_path, 1)[0]
+    original = file_utils.copy_file
+    monkeypatch.setattr(
+        file_utils,
+        "copy_file",
+        lambda src_path, dst_path, **kwargs: original(src_path, dst_path, chunk_size=64 * 1024, **kwargs),
+    )
+
+    calls = {"n": 0}
+
+    def checkpoint():
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise RuntimeError("corte")
+
+    with pytest.raises(RuntimeError):
+        file_utils.stage_to_temp(src, checkpoint=checkpoint)
+    partials = [
+        os.path.join(root, name)
+        for root, _, names in os.walk(temp_dir)
+        for name in names if name.endswith(".partial")
+    ]
+    assert len(partials) == 1
+
+    staged = file_utils.stage_to_temp(src)
+
+    assert os.path.dirname(staged) == os.path.dirname(partials[0])
+    assert os.path.getsize(staged) == os.path.getsize(src)
+    assert not os.path.exists(staged + ".partial")
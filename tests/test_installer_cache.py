@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+
+import pytest
+
+from utils import installer_cache
+from utils.installer_cache import InstallerCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(installer_cache, "unblock_file", lambda path: None)
+    return InstallerCache(root=str(tmp_path / "cache"), verify_sha256=True)
+
+
+def _source(tmp_path, name, size=64 * 1024):
+    folder = tmp_path / "share"
+    folder.mkdir(exist_ok=True)
+    path = folder / name
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def test_hit_after_miss(tmp_path, cache):
+    src = _source(tmp_path, "a.exe")
+
+    first = cache.fetch(src)
+    second = cache.fetch(src)
+
+    assert first == second and cache.owns(first)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_corrupted_copy_is_replaced(tmp_path, cache):
+    src = _source(tmp_path, "a.exe")
+    cached = cache.fetch(src)
+    with open(cached, "r+b") as f:
+        f.write(b"XX")
+
+    assert cache.fetch(src) == cached
+    assert (cache.hits, cache.misses) == (0, 2)
+    with open(src, "rb") as a, open(cached, "rb") as b:
+        assert a.read() == b.read()
+
+
+def test_hash_check_does_not_block_other_keys(tmp_path, cache, monkeypatch):
+    slow_src = _source(tmp_path, "slow.exe")
+    fast_src = _source(tmp_path, "fast.exe")
+    slow_cached = cache.fetch(slow_src)
+    cache.fetch(fast_src)
+
+    hashing = threading.Event()
+    release = threading.Event()
+    original = installer_cache.file_sha256
+
+    def file_sha256(path, *args, **kwargs):
+        if path == slow_cached:
+            hashing.set()
+            release.wait(10)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(installer_cache, "file_sha256", file_sha256)
+
+    slow = threading.Thread(target=cache.fetch, args=(slow_src,))
+    slow.start()
+    try:
+        assert hashing.wait(5)
+        fast = threading.Thread(target=cache.fetch, args=(fast_src,))
+        fast.start()
+        fast.join(2)
+        assert not fast.is_alive()
+    finally:
+        release.set()
+        slow.join(5)
+
+    assert cache.hits == 2
+
+
+def test_key_locks_are_released(tmp_path, cache):
+    sources = [_source(tmp_path, f"app{i}.exe") for i in range(5)]
+    threads = [threading.Thread(target=cache.fetch, args=(src,)) for src in sources * 2]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+
+    assert cache._key_locks == {}
+    assert cache.hits + cache.misses == 10 and cache.misses == 5
+
+
+def test_eviction_keeps_newest_entry(tmp_path, monkeypatch):
+    monkeypatch.setattr(installer_cache, "unblock_file", lambda path: None)
+    cache = InstallerCache(root=str(tmp_path / "cache"), max_bytes=100 * 1024)
+    old = cache.fetch(_source(tmp_path, "old.exe"))
+    new = cache.fetch(_source(tmp_path, "new.exe"))
+
+    assert not os.path.exists(old)
+    assert os.path.exists(new)
+    assert len(cache._entries) == 1
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+from core.log_rotation import GZ_SUFFIX, rotate_logs
+
+
+def _touch(folder, name, age_minutes, text="x"):
+    path = folder / name
+    path.write_text(text)
+    stamp = time.time() - age_minutes * 60
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_reports_do_not_count_against_max_runs(tmp_path):
+    # Reportes más recientes que todas las ejecuciones
+    for i in range(5):
+        _touch(tmp_path, f"reporte_equipo_{i}.html", age_minutes=i)
+    for i in range(3):
+        _touch(tmp_path, f"Modo_{i}.log", age_minutes=10 + i)
+        _touch(tmp_path, f"Modo_{i}.jsonl", age_minutes=10 + i)
+
+    removed = []
+    _, count = rotate_logs(
+        str(tmp_path), max_runs=3, max_reports=2, max_age_days=0, max_total_mb=0,
+        keep_uncompressed=10, on_removed=removed.append,
+    )
+
+    names = sorted(os.listdir(tmp_path))
+    assert [n for n in names if n.endswith(".log")] == ["Modo_0.log", "Modo_1.log", "Modo_2.log"]
+    assert [n for n in names if n.endswith(".html")] == ["reporte_equipo_0.html", "reporte_equipo_1.html"]
+    assert count == 3 and removed == []
+
+
+def test_max_reports_defaults_to_max_runs(tmp_path):
+    for i in range(4):
+        _touch(tmp_path, f"reporte_{i}.html", age_minutes=i)
+        _touch(tmp_path, f"Modo_{i}.log", age_minutes=i)
+
+    rotate_logs(str(tmp_path), max_runs=2, max_age_days=0, max_total_mb=0, keep_uncompressed=10)
+
+    assert sorted(os.listdir(tmp_path)) == ["Modo_0.log", "Modo_1.log", "reporte_0.html", "reporte_1.html"]
+
+
+def test_old_runs_are_compressed_and_reports_left_alone(tmp_path):
+    for i in range(3):
+        _touch(tmp_path, f"Modo_{i}.log", age_minutes=i)
+    _touch(tmp_path, "reporte.html", age_minutes=5)
+
+    compressed, _ = rotate_logs(str(tmp_path), max_runs=10, keep_uncompressed=1)
+
+    assert compressed == 2
+    assert sorted(os.listdir(tmp_path)) == [
+        "Modo_0.log", "Modo_1.log" + GZ_SUFFIX, "Modo_2.log" + GZ_SUFFIX, "reporte.html",
+    ]
+
+
+def test_current_run_is_never_removed(tmp_path):
+    current = _touch(tmp_path, "Actual.log", age_minutes=60 * 24 * 365)
+    _touch(tmp_path, "Otra.log", age_minutes=60 * 24 * 365)
+
+    rotate_logs(str(tmp_path), max_age_days=30, exclude=(str(current),))
+
+    assert os.listdir(tmp_path) == ["Actual.log"]
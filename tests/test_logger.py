@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import tkinter as tk
+
+import pytest
+
+from core.logger import Logger
+
+
+class FakeConsole:
+    """Imita los métodos de tk.Text que usa el logger y anota el hilo que los llama"""
+
+    def __init__(self):
+        self.text = ""
+        self.scheduled = []
+        self.threads = set()
+        self.destroyed = False
+
+    def _touch(self):
+        self.threads.add(threading.get_ident())
+        if self.destroyed:
+            raise tk.TclError("invalid command name")
+
+    def after(self, ms, callback):
+        self._touch()
+        self.scheduled.append(callback)
+
+    def insert(self, index, text):
+        self._touch()
+        self.text += text
+
+    def see(self, index):
+        self._touch()
+
+    def delete(self, start, end):
+        self._touch()
+        self.text = ""
+
+    def pump(self):
+        """Ejecuta lo agendado, como lo haría el mainloop de Tk"""
+        callbacks, self.scheduled = self.scheduled, []
+        for callback in callbacks:
+            callback()
+
+
+@pytest.fixture
+def logger():
+    return Logger()
+
+
+def _log_from_thread(logger, *messages):
+    thread = threading.Thread(target=lambda: [logger.log(m) for m in messages])
+    thread.start()
+    thread.join()
+
+
+def test_worker_threads_never_touch_the_console(logger):
+    console = FakeConsole()
+    logger.set_console(console)
+
+    _log_from_thread(logger, "uno", "dos")
+    assert console.threads == {threading.get_ident()}
+    assert console.text == ""
+
+    console.pump()
+    assert "] uno\n" in console.text and console.text.endswith("] dos\n")
+    assert console.threads == {threading.get_ident()}
+    assert len(console.scheduled) == 1
+
+
+def test_clear_from_worker_is_applied_on_tk_thread(logger):
+    console = FakeConsole()
+    logger.set_console(console)
+    logger.log("antes")
+    console.pump()
+
+    thread = threading.Thread(target=lambda: (logger.clear(), logger.log("despues")))
+    thread.start()
+    thread.join()
+    console.pump()
+
+    assert "antes" not in console.text and "despues" in console.text
+    assert console.threads == {threading.get_ident()}
+
+
+def test_replaced_console_stops_polling(logger):
+    old = FakeConsole()
+    logger.set_console(old)
+    new = FakeConsole()
+    logger.set_console(new)
+
+    logger.log("hola")
+    old.pump()
+    new.pump()
+
+    assert old.text == "" and old.scheduled == []
+    assert "hola" in new.text
+
+
+def test_destroyed_console_is_dropped(logger):
+    console = FakeConsole()
+    logger.set_console(console)
+    console.destroyed = True
+    logger.log("hola")
+    console.pump()
+
+    assert logger.console is None
+    assert console.scheduled == []
+    logger.log("sin consola")
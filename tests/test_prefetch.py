@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+import time
+
+import pytest
+
+from core import prefetch
+from core.prefetch import InstallerPrefetcher
+from core.run_control import InstallCancelled, RunControl
+
+
+class SlowStager:
+    """stage_func que copia a `dest` y espera `release` antes de terminar"""
+
+    def __init__(self, dest):
+        self.dest = dest
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.finished = threading.Event()
+
+    def __call__(self, src):
+        self.started.set()
+        self.release.wait(10)
+        path = os.path.join(self.dest, os.path.basename(src))
+        with open(src, "rb") as fsrc, open(path, "wb") as fdst:
+            fdst.write(fsrc.read())
+        self.finished.set()
+        return path
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "setup.exe"
+    path.write_bytes(b"MZ" * 1024)
+    dest = tmp_path / "temp"
+    dest.mkdir()
+    return str(path), str(dest)
+
+
+def _wait_gone(path, timeout=5):
+    deadline = time.time() + timeout
+    while os.path.exists(path) and time.time() < deadline:
+        time.sleep(0.02)
+    return not os.path.exists(path)
+
+
+def test_take_returns_prefetched_copy(source):
+    src, dest = source
+    stager = SlowStager(dest)
+    prefetcher = InstallerPrefetcher([src], stage_func=stager)
+    prefetcher.start()
+    assert stager.started.wait(5)
+
+    # take() espera la copia en curso
+    threading.Timer(0.2, stager.release.set).start()
+    path = prefetcher.take(src, checkpoint=RunControl().checkpoint)
+    prefetcher.stop()
+
+    assert path == os.path.join(dest, "setup.exe")
+    assert os.path.exists(path)
+
+
+def test_take_stops_waiting_when_batch_is_cancelled(source, monkeypatch):
+    monkeypatch.setattr(prefetch, "TAKE_POLL_SECONDS", 0.05)
+    src, dest = source
+    stager = SlowStager(dest)
+    control = RunControl()
+    prefetcher = InstallerPrefetcher([src], stage_func=stager)
+    prefetcher.start()
+    assert stager.started.wait(5)
+
+    threading.Timer(0.2, control.cancel).start()
+    start = time.time()
+    with pytest.raises(InstallCancelled):
+        prefetcher.take(src, checkpoint=control.checkpoint)
+    assert time.time() - start < 2
+
+    # La copia abandonada se elimina en cuanto termina
+    stager.release.set()
+    assert stager.finished.wait(5)
+    assert _wait_gone(os.path.join(dest, "setup.exe"))
+    prefetcher.stop()
+
+
+def test_copy_finishing_after_stop_is_removed(source, monkeypatch):
+    monkeypatch.setattr(prefetch, "STOP_JOIN_SECONDS", 0.1)
+    src, dest = source
+    stager = SlowStager(dest)
+    prefetcher = InstallerPrefetcher([src], stage_func=stager)
+    prefetcher.start()
+    assert stager.started.wait(5)
+
+    prefetcher.stop()
+    stager.release.set()
+
+    assert stager.finished.wait(5)
+    assert _wait_gone(os.path.join(dest, "setup.exe"))
+
+
+def test_stop_removes_unconsumed_copies(source):
+    src, dest = source
+    stager = SlowStager(dest)
+    stager.release.set()
+    prefetcher = InstallerPrefetcher([src], stage_func=stager)
+    prefetcher.start()
+    assert stager.finished.wait(5)
+
+    prefetcher.stop()
+    assert not os.path.exists(os.path.join(dest, "setup.exe"))
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from utils.process_monitor import ProcessStallMonitor
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="usa sleep como instalador de prueba")
+
+BUSY = "import time\nend = time.time() + 30\nwhile time.time() < end: pass"
+
+
+@pytest.fixture
+def spawn():
+    processes = []
+
+    def start(*args):
+        process = subprocess.Popen(list(args))
+        processes.append(process)
+        return process
+
+    yield start
+    for process in processes:
+        process.kill()
+        process.wait()
+
+
+def _idle_after(monitor, seconds):
+    monitor.idle_seconds()
+    time.sleep(seconds)
+    return monitor.idle_seconds()
+
+
+def test_unrelated_msiexec_does_not_count(spawn, tmp_path):
+    # Un msiexec del sistema (p. ej. Windows Update) ocupado en otra cosa
+    msiexec = tmp_path / "msiexec.exe"
+    msiexec.symlink_to(sys.executable)
+    unrelated = spawn(str(msiexec), "-c", BUSY)
+    idle = spawn("sleep", "30")
+    time.sleep(0.3)
+
+    monitor = ProcessStallMonitor(idle.pid, stall_seconds=1)
+
+    assert unrelated.pid not in {p.pid for p in monitor._tree()}
+    assert _idle_after(monitor, 1.2) >= 1
+    assert monitor.is_stalled()
+
+
+def test_busy_child_keeps_the_installer_active(spawn):
+    parent = spawn(
+        sys.executable, "-c",
+        f"import subprocess, sys; subprocess.run([sys.executable, '-c', {BUSY!r}])",
+    )
+    time.sleep(0.3)
+
+    monitor = ProcessStallMonitor(parent.pid, stall_seconds=1)
+
+    assert len(monitor._tree()) == 2
+    assert _idle_after(monitor, 1.2) < 1
+    assert not monitor.is_stalled()
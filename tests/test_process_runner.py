@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+from utils import process_runner
+from utils.process_runner import CANCELLED_CODE, TIMEOUT_CODE, ProcessRunner
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="usa sh y sleep como instaladores de prueba")
+
+PYTHON = sys.executable
+
+
+@pytest.fixture
+def runner():
+    return ProcessRunner()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # Un zombi ya terminó aunque su pid siga reservado
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+def _wait_for_file(path, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path) as f:
+                return f.read().strip()
+        time.sleep(0.02)
+    raise AssertionError(f"{path} no se creó")
+
+
+def test_exit_code_and_streamed_output(runner):
+    lines = []
+    script = "import sys; print('uno'); print('dos', file=sys.stderr); print('tres'); sys.exit(3)"
+
+    result = runner.run([PYTHON, "-c", script], on_output=lambda source, line: lines.append((source, line)))
+
+    assert result.returncode == 3
+    assert not (result.timed_out or result.stalled or result.cancelled)
+    assert [line for source, line in lines if source == "stdout"] == ["uno", "tres"]
+    assert ("stderr", "dos") in lines
+
+
+def test_output_arrives_while_process_runs(runner):
+    seen = threading.Event()
+
+    def on_output(source, line):
+        if line == "listo":
+            seen.set()
+
+    future = runner.submit(
+        [PYTHON, "-u", "-c", "import time; print('listo'); time.sleep(1)"],
+        on_output=on_output,
+    )
+    assert seen.wait(5)
+    assert not future.done()
+    assert future.result(5).returncode == 0
+
+
+def test_shell_command_string(runner):
+    lines = []
+    result = runner.run("echo hola && exit 4", on_output=lambda source, line: lines.append(line))
+    assert result.returncode == 4
+    assert lines == ["hola"]
+
+
+def test_timeout_kills_whole_tree(runner, tmp_path):
+    pid_file = tmp_path / "child.pid"
+    start = time.time()
+
+    result = runner.run(f"sleep 30 & echo $! > '{pid_file}'; wait", timeout=1)
+
+    assert result.timed_out and not result.stalled
+    assert result.returncode == TIMEOUT_CODE
+    assert time.time() - start < 10
+    assert not _alive(int(_wait_for_file(pid_file)))
+
+
+def test_stall_detection_kills_idle_process(runner, monkeypatch):
+    monkeypatch.setattr(process_runner, "STALL_POLL_SECONDS", 0.2)
+
+    result = runner.run(["sleep", "30"], stall_seconds=1, timeout=20)
+
+    assert result.stalled and result.timed_out
+    assert result.seconds < 10
+
+
+def test_busy_process_is_not_stalled(runner, monkeypatch):
+    monkeypatch.setattr(process_runner, "STALL_POLL_SECONDS", 0.2)
+    script = "import time\nend = time.time() + 2\nwhile time.time() < end: pass"
+
+    result = runner.run([PYTHON, "-c", script], stall_seconds=1, timeout=20)
+
+    assert result.returncode == 0 and not result.stalled
+
+
+def test_group_cancel_only_stops_its_own_processes(runner, tmp_path):
+    pid_file = tmp_path / "child.pid"
+    batch = runner.group()
+    other = runner.submit(["sleep", "2"])
+
+    cancelled = batch.submit(f"sleep 30 & echo $! > '{pid_file}'; wait")
+    child = int(_wait_for_file(pid_file))
+    batch.cancel()
+
+    result = cancelled.result(10)
+    assert result.cancelled and result.returncode == CANCELLED_CODE
+    assert not _alive(child)
+
+    assert not other.done()
+    assert other.result(10).returncode == 0
+
+
+def test_cancelled_group_does_not_start_new_processes(runner):
+    batch = runner.group()
+    batch.cancel()
+
+    result = batch.run(["sleep", "5"])
+    assert result.cancelled
+    assert result.seconds < 1
+    assert runner.group().run(["true"]).returncode == 0
+
+
+def test_missing_program_is_reported_not_raised(runner):
+    result = runner.run(["/no/existe/instalador"])
+    assert result.returncode == process_runner.ERROR_CODE
+    assert result.error
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+import pytest
+
+from core import installer as installer_module
+from core.installer import Installer
+from core.scheduler import InstallScheduler, SchedulerError
+
+
+def _apps(*specs):
+    apps = []
+    for spec in specs:
+        name, _, deps = spec.partition(">")
+        app = {"nombre": name}
+        if deps:
+            app["depends_on"] = deps.split(",")
+        apps.append(app)
+    return apps
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(SchedulerError) as error:
+        InstallScheduler(_apps("A>C", "B>A", "C>B", "D"))
+
+    assert str(error.value).endswith(": A, B, C")
+
+
+def test_unknown_dependency_is_ignored():
+    scheduler = InstallScheduler(_apps("A>No existe"))
+    assert scheduler.run(lambda app, index: "success") == ["success"]
+
+
+def test_dependents_of_failed_app_are_skipped():
+    blocked = []
+    results = InstallScheduler(_apps("A", "B>A", "C>B", "D"), max_workers=2).run(
+        lambda app, index: "failed" if app["nombre"] == "A" else "success",
+        on_blocked=lambda app, index, dep: blocked.append((app["nombre"], index, dep["nombre"])),
+    )
+
+    assert results == ["failed", "skipped", "skipped", "success"]
+    assert blocked == [("B", 2, "A"), ("C", 3, "B")]
+
+
+def test_worker_exception_counts_as_failure():
+    def worker(app, index):
+        if app["nombre"] == "A":
+            raise RuntimeError("boom")
+        return "success"
+
+    results = InstallScheduler(_apps("A", "B>A")).run(worker)
+    assert results == ["failed", "skipped"]
+
+
+def test_independent_apps_run_in_parallel():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def worker(app, index):
+        barrier.wait()
+        return "success"
+
+    results = InstallScheduler(_apps("A", "B", "C"), max_workers=3).run(worker)
+    assert results == ["success"] * 3
+
+
+def test_dependency_finishes_before_dependent_starts():
+    finished = set()
+    order_ok = []
+
+    def worker(app, index):
+        for dep in app.get("depends_on", []):
+            order_ok.append(dep in finished)
+        time.sleep(0.02)
+        finished.add(app["nombre"])
+        return "success"
+
+    InstallScheduler(_apps("A", "B", "C>A,B"), max_workers=3).run(worker)
+    assert order_ok == [True, True]
+
+
+def test_exclusive_app_holds_the_installer_lock():
+    lock = threading.RLock()
+    intervals = {}
+
+    def worker(app, index):
+        if app.get("exclusive"):
+            start = time.monotonic()
+            time.sleep(0.2)
+        else:
+            # Como el Installer: cada ejecución de instalador toma el mutex
+            time.sleep(0.01)
+            with lock:
+                start = time.monotonic()
+                time.sleep(0.02)
+        intervals[app["nombre"]] = (start, time.monotonic())
+        return "success"
+
+    apps = _apps("SQL", "A", "B", "C")
+    apps[0]["exclusive"] = True
+    InstallScheduler(apps, max_workers=4, exclusive_lock=lock).run(worker)
+
+    sql_start, sql_end = intervals.pop("SQL")
+    for start, end in intervals.values():
+        assert end <= sql_start or start >= sql_end
+
+
+def test_should_stop_cancels_apps_not_started():
+    ran = []
+    stop = threading.Event()
+
+    def worker(app, index):
+        ran.append(app["nombre"])
+        stop.set()
+        return "success"
+
+    done = []
+    results = InstallScheduler(_apps("A", "B", "C"), max_workers=1).run(
+        worker,
+        on_done=lambda app, index, result: done.append((index, result)),
+        should_stop=stop.is_set,
+    )
+
+    assert ran == ["A"]
+    assert results == ["success", "cancelled", "cancelled"]
+    assert done == [(1, "success"), (2, "cancelled"), (3, "cancelled")]
+
+
+class FakeRunner:
+    """command_runner que registra los comandos y retorna códigos por nombre"""
+
+    def __init__(self, codes):
+        self.codes = codes
+        self.commands = []
+        self._lock = threading.Lock()
+
+    def __call__(self, command, timeout=None, cwd=None, hidden=False, stall_seconds=None, on_output=None):
+        with self._lock:
+            self.commands.append(command)
+        if on_output:
+            on_output("stdout", f"ejecutando {command}")
+        for name, code in self.codes.items():
+            if name in command:
+                return code, False
+        return 0, False
+
+
+def test_installer_runs_profile_through_fake_runner(tmp_path, monkeypatch):
+    share = tmp_path / "share"
+    share.mkdir()
+    for name in ("a", "b", "c", "d"):
+        (share / f"{name}.exe").write_bytes(b"MZ")
+
+    config = {
+        "rutas_base": {"soporte": str(share)},
+        "instalacion": {"max_workers": 2, "retomar_lote": False},
+        "cache_instaladores": {"enabled": False},
+        "argumentos_silenciosos": {"aprendizaje": False},
+        "tiempos_instalacion": {"adaptativo": False, "sin_actividad_segundos": 0},
+        "logs": {"rotacion": {"enabled": False}},
+    }
+    monkeypatch.setattr(installer_module, "load_config", lambda: config)
+    monkeypatch.setenv("ProgramData", str(tmp_path / "programdata"))
+    monkeypatch.chdir(tmp_path)
+
+    summaries = []
+    callbacks = {
+        "set_status": lambda text: None,
+        "update_progress": lambda value: None,
+        "enable_run_button": lambda enabled=True: None,
+        "show_summary": summaries.append,
+    }
+
+    def app(nombre, archivo, **extra):
+        entry = {
+            "nombre": nombre,
+            "base": "soporte",
+            "ruta": archivo,
+            "args": "/S",
+            "copiar_a_temp": False,
+        }
+        entry.update(extra)
+        return entry
+
+    apps = [
+        app("A", "a.exe"),
+        app("B", "b.exe", depends_on=["A"]),
+        app("C", "c.exe"),
+        app("D", "d.exe", depends_on=["C"]),
+    ]
+
+    runner = FakeRunner({"c.exe": 1603})
+    Installer(callbacks, command_runner=runner).execute_apps("Prueba", apps)
+
+    ran = sorted(command.split('"')[1].rsplit("/", 1)[-1] for command in runner.commands)
+    assert ran == ["a.exe", "b.exe", "c.exe"]
+    assert all(command.endswith(" /S") for command in runner.commands)
+
+    assert len(summaries) == 1
+    assert "Instaladas correctamente: 2" in summaries[0]
+    assert "Fallidas: 1" in summaries[0]
+    assert "Omitidas: 1" in summaries[0]
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils import hardware_inventory
+from utils import system_info
+from utils.system_info import SnapshotMemo
+
+MEMORY_JSON = (
+    '[{"DeviceLocator": "DIMM A", "Capacity": 8589934592, "Speed": 3200, "Manufacturer": "Samsung"},'
+    ' {"DeviceLocator": "DIMM B", "Capacity": 8589934592, "Speed": 3200, "Manufacturer": "Samsung"}]'
+)
+ARRAY_JSON = '{"MemoryDevices": 2, "MaxCapacity": 33554432}'
+
+
+class CountingRunner:
+    """Ejecutor falso de run_cmd que cuenta cuántas veces se lanzó cada consulta"""
+
+    def __init__(self, delay=0.0):
+        self.calls = Counter()
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, command):
+        with self._lock:
+            self.calls[command] += 1
+        time.sleep(self.delay)
+        if "Win32_PhysicalMemoryArray" in command:
+            return ARRAY_JSON
+        if "Win32_PhysicalMemory" in command:
+            return MEMORY_JSON
+        return ""
+
+
+@pytest.fixture
+def runner():
+    """Inventario CIM sin salida (se usan los respaldos) y run_cmd falso"""
+    fake = CountingRunner(delay=0.05)
+    inventory_calls = []
+    hardware_inventory.set_inventory_runner(lambda script: inventory_calls.append(script) or "")
+    system_info.set_command_runner(fake)
+    fake.inventory_calls = inventory_calls
+    yield fake
+    system_info.set_command_runner(None)
+    hardware_inventory.set_inventory_runner(None)
+
+
+def test_memo_computes_each_key_once():
+    memo = SnapshotMemo()
+    calls = Counter()
+
+    def compute(key):
+        calls[key] += 1
+        return key.upper()
+
+    for _ in range(3):
+        assert memo.get("a", lambda: compute("a")) == "A"
+        assert memo.get("b", lambda: compute("b")) == "B"
+
+    assert calls == {"a": 1, "b": 1}
+
+
+def test_memo_invalidate_starts_new_snapshot():
+    memo = SnapshotMemo()
+    values = iter([1, 2])
+
+    assert memo.get("k", lambda: next(values)) == 1
+    assert memo.get("k", lambda: next(values)) == 1
+    memo.invalidate()
+    assert memo.get("k", lambda: next(values)) == 2
+
+
+def test_memo_concurrent_callers_share_one_call():
+    memo = SnapshotMemo()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return "valor"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: memo.get("k", compute), range(8)))
+
+    assert results == ["valor"] * 8
+    assert len(calls) == 1
+
+
+def test_memo_failed_call_is_not_cached():
+    memo = SnapshotMemo()
+
+    def boom():
+        raise RuntimeError("fallo")
+
+    with pytest.raises(RuntimeError):
+        memo.get("k", boom)
+    assert memo.get("k", lambda: "ok") == "ok"
+
+
+def test_ram_queries_run_once_per_snapshot(runner):
+    slots = system_info.get_ram_slots_info()
+    modules = system_info.get_ram_modules_info()
+    modules_dict = system_info.get_ram_modules_dict()
+
+    assert slots == "2 / 2 Slots (Máx. 32.00 GB)"
+    assert modules == ["DIMM A, 8 GB, 3200 MHz, Samsung", "DIMM B, 8 GB, 3200 MHz, Samsung"]
+    assert modules_dict == {"RAM módulo 1": modules[0], "RAM módulo 2": modules[1]}
+    assert len(runner.calls) == 2
+    assert set(runner.calls.values()) == {1}
+    assert len(runner.inventory_calls) == 1
+
+
+def test_new_snapshot_runs_queries_again(runner):
+    system_info.get_ram_modules_info()
+    system_info.invalidate_system_info()
+    system_info.get_ram_modules_info()
+
+    assert set(runner.calls.values()) == {2}
+    assert len(runner.inventory_calls) == 2
+
+
+def test_concurrent_probes_share_queries(runner):
+    results, timings = system_info.run_probes({
+        "Slots RAM": (system_info.get_ram_slots_info, "No disponible"),
+        "Módulos RAM": (system_info.get_ram_modules_info, ["No disponible"]),
+        "Módulos RAM (detalle)": (system_info.get_ram_modules_dict, {}),
+    })
+
+    assert all(item["status"] == "ok" for item in timings)
+    assert results["Slots RAM"].startswith("2 / 2")
+    assert set(runner.calls.values()) == {1}
+    assert len(runner.inventory_calls) == 1
+
+
+def test_memoized_results_are_copies(runner):
+    modules = system_info.get_ram_modules_info()
+    modules.append("modificado")
+
+    assert "modificado" not in system_info.get_ram_modules_info()
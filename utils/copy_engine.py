@@ -0,0 +1,416 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import zlib
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Bloques grandes y alineados a 4 KB (tamaño de página / sector)
+CHUNK_SIZE = 8 * 1024 * 1024
+# Cada cuántos bloques se sincroniza a disco y se actualiza el journal
+JOURNAL_EVERY = 8
+# Archivos que se copian en paralelo dentro de una carpeta
+DEFAULT_WORKERS = 8
+
+PARTIAL_SUFFIX = ".partial"
+JOURNAL_SUFFIX = ".partial.json"
+
+
+class CopyStats:
+    """Acumula bytes y tiempo de una copia para reportar throughput"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.files = 0
+        self.bytes_copied = 0
+        self.bytes_resumed = 0
+        self.files_skipped = 0
+        self.bytes_skipped = 0
+        self.files_deleted = 0
+        self.started = time.time()
+        self.finished = None
+
+    def add(self, **counters):
+        """Suma contadores de forma segura entre hilos"""
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def stop(self):
+        self.finished = time.time()
+        return self
+
+    @property
+    def seconds(self):
+        return max((self.finished or time.time()) - self.started, 1e-6)
+
+    @property
+    def mb_per_s(self):
+        return self.bytes_copied / (1024 * 1024) / self.seconds
+
+    @property
+    def files_per_s(self):
+        return self.files / self.seconds
+
+    def text(self):
+        mb = self.bytes_copied / (1024 * 1024)
+        line = (
+            f"{self.files} archivo(s), {mb:.1f} MB en {self.seconds:.1f} s "
+            f"({self.mb_per_s:.1f} MB/s, {self.files_per_s:.0f} archivos/s)"
+        )
+        if self.bytes_resumed:
+            line += f", {self.bytes_resumed / (1024 * 1024):.1f} MB retomados"
+        if self.files_skipped:
+            line += (
+                f", {self.files_skipped} sin cambios "
+                f"({self.bytes_skipped / (1024 * 1024):.1f} MB omitidos)"
+            )
+        if self.files_deleted:
+            line += f", {self.files_deleted} eliminado(s)"
+        return line
+
+
+def _source_signature(src_stat, chunk_size):
+    return {
+        "size": src_stat.st_size,
+        "mtime_ns": src_stat.st_mtime_ns,
+        "chunk_size": chunk_size,
+    }
+
+
+def _read_journal(journal_path):
+    try:
+        with open(journal_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _write_journal(journal_path, signature, verified, last_crc, last_len):
+    data = dict(signature, verified=verified, last_crc=last_crc, last_len=last_len)
+    tmp_path = journal_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, journal_path)
+
+
+def _resume_offset(partial_path, journal_path, signature):
+    """
+    Retorna el offset desde el que se puede retomar una copia interrumpida.
+    Se valida el último bloque confirmado contra el CRC del journal.
+    """
+    journal = _read_journal(journal_path)
+    if not journal or not os.path.exists(partial_path):
+        return 0
+
+    if any(journal.get(k) != v for k, v in signature.items()):
+        return 0
+
+    verified = int(journal.get("verified", 0))
+    if verified <= 0 or os.path.getsize(partial_path) < verified:
+        return 0
+
+    last_len = int(journal.get("last_len", 0))
+    try:
+        with open(partial_path, "rb") as f:
+            f.seek(verified - last_len)
+            block = f.read(last_len)
+        if zlib.crc32(block) != journal.get("last_crc"):
+            return 0
+    except Exception:
+        return 0
+
+    return verified
+
+
+def copy_file(src, dst, chunk_size=CHUNK_SIZE, progress=None, stats=None, checkpoint=None):
+    """
+    Copia `src` a `dst` por bloques, de forma reanudable y atómica.
+
+    Los datos se escriben en `dst.partial` y un journal `dst.partial.json`
+    registra el último bloque confirmado en disco. Si la copia se corta
+    (p. ej. se cae la VPN), la siguiente llamada retoma desde ese bloque.
+    Al terminar se renombra a `dst` en un solo paso.
+
+    Args:
+        progress: callable(bytes_done, total_bytes) opcional
+        stats: CopyStats opcional donde acumular el throughput
+        checkpoint: callable() opcional que se invoca por bloque; puede
+            bloquear (pausa) o lanzar una excepción para cortar la copia,
+            que queda reanudable.
+    """
+    stats = stats or CopyStats()
+    src_stat = os.stat(src)
+    signature = _source_signature(src_stat, chunk_size)
+
+    partial_path = dst + PARTIAL_SUFFIX
+    journal_path = dst + JOURNAL_SUFFIX
+
+    parent = os.path.dirname(dst)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+    offset = _resume_offset(partial_path, journal_path, signature)
+
+    # Archivos pequeños no necesitan un búfer del tamaño completo del bloque
+    buffer = bytearray(max(1, min(chunk_size, src_stat.st_size - offset)))
+    view = memoryview(buffer)
+    done = offset
+    last_crc = 0
+    last_len = 0
+    pending_chunks = 0
+
+    try:
+        with open(src, "rb") as fsrc, open(partial_path, "r+b" if offset else "wb") as fdst:
+            if offset:
+                fsrc.seek(offset)
+                fdst.seek(offset)
+                fdst.truncate(offset)
+
+            while True:
+                if checkpoint:
+                    checkpoint()
+
+                read = fsrc.readinto(buffer)
+                if not read:
+                    break
+
+                fdst.write(view[:read])
+                last_crc = zlib.crc32(view[:read])
+                last_len = read
+                done += read
+                pending_chunks += 1
+
+                if pending_chunks >= JOURNAL_EVERY:
+                    fdst.flush()
+                    os.fsync(fdst.fileno())
+                    _write_journal(journal_path, signature, done, last_crc, last_len)
+                    pending_chunks = 0
+
+                if progress:
+                    progress(done, src_stat.st_size)
+
+            # Un archivo de un solo bloque no tiene journal que proteger
+            if src_stat.st_size > chunk_size:
+                fdst.flush()
+                os.fsync(fdst.fileno())
+    finally:
+        stats.add(bytes_copied=done - offset, bytes_resumed=offset)
+
+    shutil.copystat(src, partial_path)
+    os.replace(partial_path, dst)
+
+    try:
+        os.remove(journal_path)
+    except FileNotFoundError:
+        pass
+
+    stats.add(files=1)
+    return stats
+
+
+def _walk(src):
+    """
+    Recorre el árbol de origen una sola vez.
+    Retorna [(carpeta_relativa, subcarpetas, archivos), ...] en orden padre-hijo.
+    """
+    tree = []
+    for root, dirs, files in os.walk(src):
+        rel = os.path.relpath(root, src)
+        tree.append(("" if rel == "." else rel, dirs, files))
+    return tree
+
+
+def _run_parallel(job, items, workers):
+    """Ejecuta job(item) en un pool; propaga el primer error"""
+    workers = max(1, int(workers or 1))
+    if workers == 1 or len(items) < 2:
+        for item in items:
+            job(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="copia") as pool:
+        for _ in pool.map(job, items):
+            pass
+
+
+def _copy_metadata_bottom_up(src, dst, tree):
+    # Las fechas de carpetas se fijan al final: copiar archivos las modifica
+    for rel, _, _ in reversed(tree):
+        try:
+            shutil.copystat(os.path.join(src, rel), os.path.join(dst, rel))
+        except OSError:
+            pass
+
+
+def copy_tree(src, dst, chunk_size=CHUNK_SIZE, stats=None, workers=DEFAULT_WORKERS, checkpoint=None):
+    """
+    Copia una carpeta completa sin dejar el destino a medias.
+
+    La copia se arma en `dst.partial`; si se interrumpe, la siguiente llamada
+    conserva los archivos ya completos y retoma los parciales, y descarta lo
+    que ya no existe en origen. Solo al final se reemplaza el destino
+    anterior por la copia nueva.
+
+    Las carpetas se crean primero y los archivos se copian en `workers`
+    hilos, ya que con muchos archivos pequeños el costo lo domina la latencia
+    por archivo de SMB y no el ancho de banda.
+    """
+    stats = stats or CopyStats()
+    staging = dst + PARTIAL_SUFFIX
+
+    tree = _walk(src)
+    # Lo que quedó de una copia interrumpida y ya no está en origen no debe
+    # llegar al destino; no cuenta como eliminado porque nunca estuvo en dst
+    pruned = CopyStats()
+    for rel, dirs, files in tree:
+        staging_dir = os.path.join(staging, rel)
+        os.makedirs(staging_dir, exist_ok=True)
+        _delete_extras(set(dirs), set(files), staging_dir, pruned)
+
+    def copy_one(rel_file):
+        src_file = os.path.join(src, rel_file)
+        dst_file = os.path.join(staging, rel_file)
+
+        if _same_file(src_file, dst_file):
+            stats.add(bytes_resumed=os.path.getsize(dst_file))
+            return
+
+        copy_file(src_file, dst_file, chunk_size=chunk_size, stats=stats, checkpoint=checkpoint)
+
+    files = [os.path.join(rel, name) for rel, _, names in tree for name in names]
+    _run_parallel(copy_one, files, workers)
+    _copy_metadata_bottom_up(src, staging, tree)
+
+    _swap_into_place(staging, dst)
+    return stats.stop()
+
+
+def sync_tree(
+    src,
+    dst,
+    use_hash=False,
+    delete=True,
+    chunk_size=CHUNK_SIZE,
+    stats=None,
+    workers=DEFAULT_WORKERS,
+    checkpoint=None,
+):
+    """
+    Sincroniza `dst` con `src` copiando solo lo que cambió (estilo rsync).
+
+    Un archivo se considera igual si coincide en tamaño y fecha de
+    modificación; con `use_hash` los de igual tamaño se comparan además por
+    SHA-256 (útil cuando las fechas no son confiables). Con `delete` se
+    eliminan del destino los archivos y carpetas que ya no existen en origen.
+    """
+    stats = stats or CopyStats()
+
+    tree = _walk(src)
+    for rel, dirs, files in tree:
+        target_dir = os.path.join(dst, rel)
+        os.makedirs(target_dir, exist_ok=True)
+        if delete:
+            _delete_extras(set(dirs), set(files), target_dir, stats)
+
+    def sync_one(rel_file):
+        src_file = os.path.join(src, rel_file)
+        dst_file = os.path.join(dst, rel_file)
+
+        if _unchanged(src_file, dst_file, use_hash):
+            stats.add(files_skipped=1, bytes_skipped=os.path.getsize(src_file))
+            return
+
+        copy_file(src_file, dst_file, chunk_size=chunk_size, stats=stats, checkpoint=checkpoint)
+
+    files = [os.path.join(rel, name) for rel, _, names in tree for name in names]
+    _run_parallel(sync_one, files, workers)
+    _copy_metadata_bottom_up(src, dst, tree)
+
+    return stats.stop()
+
+
+def _unchanged(src_file, dst_file, use_hash):
+    try:
+        s = os.stat(src_file)
+        d = os.stat(dst_file)
+    except OSError:
+        return False
+
+    if s.st_size != d.st_size:
+        return False
+
+    # Tolerancia de 2 s por la resolución de FAT / SMB
+    if abs(s.st_mtime - d.st_mtime) < 2:
+        return True
+
+    if use_hash and _sha256(src_file) == _sha256(dst_file):
+        shutil.copystat(src_file, dst_file)
+        return True
+
+    return False
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _resumable_leftover(name, src_files):
+    """True si `name` es el .partial (o su journal) de un archivo que sigue en origen"""
+    for suffix in (JOURNAL_SUFFIX, PARTIAL_SUFFIX):
+        if name.endswith(suffix):
+            return name[:-len(suffix)] in src_files
+    return False
+
+
+def _delete_extras(src_dirs, src_files, target_dir, stats):
+    for entry in os.scandir(target_dir):
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name not in src_dirs:
+                shutil.rmtree(entry.path)
+                stats.add(files_deleted=1)
+        elif entry.name not in src_files:
+            # Lo que dejó una sincronización interrumpida se conserva para retomarla
+            if _resumable_leftover(entry.name, src_files):
+                continue
+            os.remove(entry.path)
+            stats.add(files_deleted=1)
+
+
+def _same_file(src_file, dst_file):
+    try:
+        s = os.stat(src_file)
+        d = os.stat(dst_file)
+        return s.st_size == d.st_size and int(s.st_mtime) == int(d.st_mtime)
+    except OSError:
+        return False
+
+
+def _swap_into_place(staging, dst):
+    """Reemplaza `dst` por `staging` minimizando el tiempo sin destino"""
+    backup = None
+    if os.path.exists(dst):
+        backup = dst + ".old"
+        if os.path.exists(backup):
+            shutil.rmtree(backup, ignore_errors=True)
+        os.replace(dst, backup)
+
+    try:
+        os.replace(staging, dst)
+    except Exception:
+        if backup:
+            os.replace(backup, dst)
+        raise
+
+    if backup:
+        shutil.rmtree(backup, ignore_errors=True)
@@ -1,45 +1,130 @@
 # -*- coding: utf-8 -*-
 
 import os
-import shutil
+import hashlib
 import tempfile
-import time
-import subprocess
+import threading
 
-from utils.subprocess_utils import hidden_run
+from utils.copy_engine import copy_file
+from utils.process_runner import run_process
 
-def stage_to_temp(src_path: str) -> str:
+UNBLOCK_TIMEOUT = 60
+
+# Copias locales de instaladores: TEMP/AutoInstaller_staging/<hash del origen>/
+STAGING_DIR = "AutoInstaller_staging"
+
+_claimed_dirs = set()
+_claimed_lock = threading.Lock()
+
+def get_program_data_dir(*parts) -> str:
     """
-    Copia un archivo a la carpeta temporal y lo desbloquea (PowerShell)
+    Retorna (y crea) una carpeta persistente de la aplicación bajo ProgramData.
+    Fuera de Windows usa la carpeta temporal.
     """
-    temp_dir = tempfile.gettempdir()
-    base_name = os.path.basename(src_path)
+    base = os.environ.get("ProgramData") or tempfile.gettempdir()
+    path = os.path.join(base, "AutoInstaller", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
 
-    dst_path = os.path.join(temp_dir, base_name)
-    if os.path.exists(dst_path):
-        name, ext = os.path.splitext(base_name)
-        dst_path = os.path.join(temp_dir, f"{name}_{int(time.time())}{ext}")
+def unblock_file(path: str):
+    """Quita la marca de "procedente de otro equipo" (PowerShell)"""
+    run_process(
+        [
+            "powershell",
+            "-NoProfile",
+            "-ExecutionPolicy",
+            "Bypass",
+            "-Command",
+            f'Unblock-File -Path "{path}"'
+        ],
+        timeout=UNBLOCK_TIMEOUT,
+        hidden=True
+    )
 
-    shutil.copy2(src_path, dst_path)
+def stage_to_temp(src_path: str, cache=None, stats=None, checkpoint=None) -> str:
+    """
+    Copia un archivo a la carpeta temporal y lo desbloquea (PowerShell).
+    Si se indica una caché de instaladores, la copia local sale de ella.
+    La copia es reanudable: si una ejecución previa quedó a medias, se retoma.
+    `checkpoint` se invoca por bloque copiado (pausa / cancelación).
+    """
+    if cache is not None:
+        cached_path = cache.fetch(src_path, stats=stats, checkpoint=checkpoint)
+        if cached_path:
+            return cached_path
+
+    staging_dir = _claim_staging_dir(src_path)
+    dst_path = os.path.join(staging_dir, os.path.basename(src_path))
+    try:
+        copy_file(src_path, dst_path, stats=stats, checkpoint=checkpoint)
+    except BaseException:
+        # La carpeta se libera para que un reintento retome el .partial
+        _release_staging_dir(staging_dir)
+        raise
 
     # Desbloquear archivo en Windows (quitar marca de "procedente de otro equipo")
+    unblock_file(dst_path)
+
+    return dst_path
+
+
+def _staging_root():
+    return os.path.join(tempfile.gettempdir(), STAGING_DIR)
+
+
+def _claim_staging_dir(src_path):
+    """
+    Carpeta de TEMP para copiar `src_path`.
+
+    Depende de la ruta completa del origen y no solo del nombre, así que dos
+    instaladores `setup.exe` copiados en paralelo no comparten el .partial ni
+    el journal; el mismo origen reutiliza su carpeta y retoma una copia
+    interrumpida. La carpeta queda reservada hasta remove_staged(); si ya
+    está reservada (el mismo instalador en dos apps a la vez) o tiene una
+    copia vieja que no se puede borrar, se reserva una nueva con mkdtemp.
+    """
+    root = _staging_root()
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(src_path)).encode("utf-8")).hexdigest()[:16]
+    path = os.path.join(root, key)
+    target = os.path.join(path, os.path.basename(src_path))
+
+    with _claimed_lock:
+        if path not in _claimed_dirs:
+            try:
+                os.makedirs(path, exist_ok=True)
+                if os.path.exists(target):
+                    os.remove(target)
+                _claimed_dirs.add(path)
+                return path
+            except OSError:
+                pass
+
+        os.makedirs(root, exist_ok=True)
+        path = tempfile.mkdtemp(prefix=key + "_", dir=root)
+        _claimed_dirs.add(path)
+        return path
+
+
+def _release_staging_dir(path):
+    with _claimed_lock:
+        _claimed_dirs.discard(path)
+
+
+def remove_staged(path):
+    """Elimina una copia de stage_to_temp, libera su carpeta y la borra si quedó vacía"""
     try:
-        hidden_run(
-            [
-                "powershell",
-                "-NoProfile",
-                "-ExecutionPolicy",
-                "Bypass",
-                "-Command",
-                f'Unblock-File -Path "{dst_path}"'
-            ],
-            capture_output=True,
-            text=True
-        )
-    except Exception:
+        os.remove(path)
+    except FileNotFoundError:
         pass
+    parent = os.path.dirname(path)
+    if os.path.dirname(parent) != _staging_root():
+        return
 
-    return dst_path
+    _release_staging_dir(parent)
+    try:
+        os.rmdir(parent)
+    except OSError:
+        pass
 
 def ensure_directory(path: str) -> bool:
     """Asegura que un directorio existe, lo crea si no"""
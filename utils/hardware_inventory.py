@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import base64
+import threading
+
+from utils.subprocess_utils import hidden_run
+
+# Tiempo máximo para la consulta completa (CIM puede tardar en el primer arranque)
+INVENTORY_TIMEOUT = 60
+
+# Una sola ejecución de PowerShell consulta todas las clases CIM que usa la
+# vista "Equipo". Cada clase se consulta por separado dentro de un try, así
+# que una clase que falla deja su sección vacía sin afectar al resto. Las
+# secciones siempre son listas (`,@(...)` evita que PowerShell las desarme).
+INVENTORY_SCRIPT = r"""
+$ErrorActionPreference = 'Stop'
+[Console]::OutputEncoding = New-Object System.Text.UTF8Encoding $false
+
+function Query([string]$Class, [string[]]$Properties, [string]$Filter, [string]$Namespace = 'root/cimv2') {
+    try {
+        if ($Filter) {
+            $items = Get-CimInstance -Namespace $Namespace -ClassName $Class -Filter $Filter
+        } else {
+            $items = Get-CimInstance -Namespace $Namespace -ClassName $Class
+        }
+        return ,@($items | Select-Object -Property $Properties)
+    } catch {
+        return ,@()
+    }
+}
+
+[ordered]@{
+    os = Query 'Win32_OperatingSystem' @('Caption', 'Version', 'BuildNumber', 'OSArchitecture')
+    system = Query 'Win32_ComputerSystem' @('Manufacturer', 'Model', 'Domain', 'PartOfDomain', 'Workgroup', 'TotalPhysicalMemory')
+    bios = Query 'Win32_BIOS' @('SerialNumber', 'SMBIOSBIOSVersion')
+    memory = Query 'Win32_PhysicalMemory' @('DeviceLocator', 'BankLabel', 'Capacity', 'Speed', 'ConfiguredClockSpeed', 'Manufacturer', 'PartNumber')
+    memory_array = Query 'Win32_PhysicalMemoryArray' @('MemoryDevices', 'MaxCapacity', 'MaxCapacityEx')
+    battery = Query 'Win32_Battery' @('Name', 'EstimatedChargeRemaining', 'BatteryStatus', 'DesignCapacity', 'FullChargeCapacity')
+    disks = Query 'Win32_LogicalDisk' @('DeviceID', 'VolumeName', 'Size', 'FreeSpace') 'DriveType=3'
+    battery_static = Query 'BatteryStaticData' @('InstanceName', 'DesignedCapacity') $null 'root/wmi'
+    battery_full = Query 'BatteryFullChargedCapacity' @('InstanceName', 'FullChargedCapacity') $null 'root/wmi'
+} | ConvertTo-Json -Depth 4 -Compress
+"""
+
+SECTIONS = (
+    "os",
+    "system",
+    "bios",
+    "memory",
+    "memory_array",
+    "battery",
+    "disks",
+    "battery_static",
+    "battery_full",
+)
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, dict):
+        return [value]
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, dict)]
+    return []
+
+
+class HardwareInventory:
+    """
+    Resultado de una consulta de inventario: una lista de dicts por clase
+    CIM (sección). Si la consulta falló `ok` es False y todas las secciones
+    están vacías, de modo que los getters usan sus métodos de respaldo.
+    """
+
+    def __init__(self, data=None, error=None, seconds=0.0):
+        data = data if isinstance(data, dict) else {}
+        self.sections = {name: _as_list(data.get(name)) for name in SECTIONS}
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def section(self, name):
+        return self.sections.get(name, [])
+
+    def first(self, name):
+        """Primer elemento de la sección, o un dict vacío"""
+        items = self.section(name)
+        return items[0] if items else {}
+
+    def value(self, name, key):
+        """Valor de una propiedad del primer elemento, o None si está vacío"""
+        value = self.first(name).get(key)
+        if isinstance(value, str):
+            value = value.strip()
+        return value if value not in ("", None) else None
+
+
+def parse_inventory(output):
+    """Convierte la salida JSON del script en un HardwareInventory"""
+    text = (output or "").lstrip("\ufeff").strip()
+    if not text:
+        return HardwareInventory(error="Sin salida")
+
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        return HardwareInventory(error=f"JSON inválido: {e}")
+
+    if not isinstance(data, dict):
+        return HardwareInventory(error="Formato inesperado")
+    return HardwareInventory(data)
+
+
+def run_inventory_script(script, timeout=INVENTORY_TIMEOUT):
+    """
+    Ejecuta el script de PowerShell y retorna su salida estándar.
+    Se pasa codificado (-EncodedCommand) para no depender del escape de
+    comillas y saltos de línea en la línea de comandos.
+    """
+    encoded = base64.b64encode(script.encode("utf-16-le")).decode("ascii")
+    result = hidden_run(
+        [
+            "powershell",
+            "-NoProfile",
+            "-NonInteractive",
+            "-ExecutionPolicy",
+            "Bypass",
+            "-EncodedCommand",
+            encoded
+        ],
+        capture_output=True,
+        timeout=timeout
+    )
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def collect_inventory(runner=None):
+    """
+    Lanza el script de inventario una sola vez y lo interpreta.
+
+    Args:
+        runner: callable(script) -> salida; por defecto PowerShell oculto.
+    """
+    runner = runner or run_inventory_script
+    start = time.time()
+    try:
+        inventory = parse_inventory(runner(INVENTORY_SCRIPT))
+    except Exception as e:
+        inventory = HardwareInventory(error=str(e))
+    inventory.seconds = time.time() - start
+    return inventory
+
+
+_current = None
+_current_lock = threading.Lock()
+_runner = None
+
+
+def set_inventory_runner(runner=None):
+    """
+    Reemplaza el ejecutor del script: callable(script) -> salida. Sirve para
+    pruebas con un ejecutor falso; None restaura PowerShell.
+    """
+    global _runner
+    _runner = runner
+    invalidate_inventory()
+
+
+def get_inventory(refresh=False):
+    """
+    Inventario compartido por los getters de system_info.
+
+    La primera llamada (o una con `refresh`) lanza la consulta; las demás
+    reutilizan el resultado. El lock hace que llamadas simultáneas esperen a
+    esa única consulta en lugar de lanzar PowerShell cada una.
+    """
+    global _current
+    with _current_lock:
+        if _current is None or refresh:
+            _current = collect_inventory(_runner)
+        return _current
+
+
+def invalidate_inventory():
+    """Descarta el inventario compartido; la próxima lectura lo vuelve a consultar"""
+    global _current
+    with _current_lock:
+        _current = None
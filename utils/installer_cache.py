@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+from utils.copy_engine import copy_file
+from utils.file_utils import get_program_data_dir, unblock_file
+
+
+def file_sha256(path: str, chunk_size: int = 4 * 1024 * 1024) -> str:
+    """Calcula el SHA-256 de un archivo leyendo por bloques"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class InstallerCache:
+    """
+    Caché local y persistente de instaladores copiados desde la red.
+
+    Cada entrada se identifica por ruta origen + tamaño + fecha de
+    modificación, de modo que un instalador actualizado en la compartida
+    genera una entrada nueva. Opcionalmente se valida el SHA-256 de la copia
+    al reutilizarla. Cuando la caché supera `max_bytes` se eliminan las
+    entradas usadas hace más tiempo (LRU).
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(self, root=None, max_bytes=20 * 1024 ** 3, verify_sha256=False):
+        self.root = root or get_program_data_dir("cache")
+        self.max_bytes = int(max_bytes)
+        self.verify_sha256 = verify_sha256
+        self.index_path = os.path.join(self.root, self.INDEX_NAME)
+
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._entries = self._load_index()
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_reused = 0
+        self.bytes_copied = 0
+
+    # ===== índice =====
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except Exception:
+            pass
+
+    @staticmethod
+    def make_key(src_path: str, size: int, mtime_ns: int) -> str:
+        normalized = os.path.normcase(os.path.abspath(src_path))
+        return hashlib.sha1(f"{normalized}|{size}|{mtime_ns}".encode("utf-8")).hexdigest()
+
+    def owns(self, path) -> bool:
+        """True si la ruta pertenece a la caché (no debe borrarse tras instalar)"""
+        if not path:
+            return False
+        root = os.path.normcase(os.path.abspath(self.root))
+        return os.path.normcase(os.path.abspath(path)).startswith(root + os.sep)
+
+    # ===== operación =====
+    def fetch(self, src_path: str, stats=None, checkpoint=None):
+        """
+        Devuelve la ruta local en caché de `src_path`, copiándolo si no está.
+        Retorna None si el archivo no cabe en la caché.
+        """
+        stat = os.stat(src_path)
+        key = self.make_key(src_path, stat.st_size, stat.st_mtime_ns)
+
+        # Dos apps con el mismo instalador no deben copiarlo a la vez
+        key_lock = self._key_lock(key)
+        try:
+            with key_lock:
+                return self._fetch_locked(src_path, key, stat, stats, checkpoint)
+        finally:
+            self._release_key_lock(key)
+
+    def _key_lock(self, key):
+        """Lock de la clave; se registra quién lo usa para poder liberarlo"""
+        with self._lock:
+            holder = self._key_locks.get(key)
+            if holder is None:
+                holder = self._key_locks[key] = [threading.Lock(), 0]
+            holder[1] += 1
+            return holder[0]
+
+    def _release_key_lock(self, key):
+        # Sin usuarios el lock se descarta: el dict no crece con cada clave vista
+        with self._lock:
+            holder = self._key_locks.get(key)
+            if holder:
+                holder[1] -= 1
+                if holder[1] <= 0:
+                    del self._key_locks[key]
+
+    def _fetch_locked(self, src_path, key, stat, stats, checkpoint):
+        with self._lock:
+            entry = self._entries.get(key)
+            entry = dict(entry) if entry else None
+
+        if entry:
+            cached_path = os.path.join(self.root, key, entry["file"])
+            # El SHA-256 se calcula fuera del lock global para no frenar
+            # las consultas de otras claves mientras se lee el archivo
+            valid = self._is_valid(cached_path, entry)
+
+            with self._lock:
+                current = self._entries.get(key)
+                if valid and current is not None and os.path.exists(cached_path):
+                    current["last_used"] = time.time()
+                    self.hits += 1
+                    self.bytes_reused += current["size"]
+                    self._save_index()
+                    return cached_path
+
+                if current is not None:
+                    self._remove_entry(key)
+
+        if stat.st_size > self.max_bytes:
+            return None
+
+        cached_path = self._store(src_path, key, stats, checkpoint)
+        sha256 = file_sha256(cached_path) if self.verify_sha256 else None
+
+        with self._lock:
+            self._entries[key] = {
+                "file": os.path.basename(cached_path),
+                "source": src_path,
+                "size": stat.st_size,
+                "last_used": time.time(),
+                "sha256": sha256,
+            }
+            self.misses += 1
+            self.bytes_copied += stat.st_size
+            self._evict(keep=key)
+            self._save_index()
+
+        return cached_path
+
+    def _is_valid(self, cached_path, entry):
+        try:
+            if os.path.getsize(cached_path) != entry.get("size"):
+                return False
+            if self.verify_sha256 and entry.get("sha256"):
+                return file_sha256(cached_path) == entry["sha256"]
+            return True
+        except Exception:
+            return False
+
+    def _store(self, src_path, key, stats=None, checkpoint=None):
+        entry_dir = os.path.join(self.root, key)
+        os.makedirs(entry_dir, exist_ok=True)
+
+        # La carpeta de la entrada es estable, así que una copia cortada se retoma
+        cached_path = os.path.join(entry_dir, os.path.basename(src_path))
+        copy_file(src_path, cached_path, stats=stats, checkpoint=checkpoint)
+        unblock_file(cached_path)
+        return cached_path
+
+    def _remove_entry(self, key):
+        entry_dir = os.path.join(self.root, key)
+        try:
+            shutil.rmtree(entry_dir)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # En uso (p. ej. instalador en ejecución): se reintenta luego
+            return False
+
+        self._entries.pop(key, None)
+        return True
+
+    def _evict(self, keep=None):
+        total = sum(entry.get("size", 0) for entry in self._entries.values())
+        if total <= self.max_bytes:
+            return
+
+        by_age = sorted(self._entries.items(), key=lambda item: item[1].get("last_used", 0))
+        for key, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            if self._remove_entry(key):
+                total -= entry.get("size", 0)
+
+    def stats_text(self) -> str:
+        reused_mb = self.bytes_reused / (1024 * 1024)
+        copied_mb = self.bytes_copied / (1024 * 1024)
+        return (
+            f"Caché de instaladores: {self.hits} aciertos, {self.misses} fallos, "
+            f"{reused_mb:.1f} MB reutilizados, {copied_mb:.1f} MB copiados"
+        )
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+from utils.system_info import (
+    get_system_info,
+    get_memory_usage,
+    get_disk_usage,
+    get_battery_info,
+    get_ip_address,
+)
+
+# Campos que cambian con el equipo encendido: (segundos de vigencia, probe,
+# en_linea). Los probes en línea solo leen psutil y se recalculan al momento
+# en cached(); los demás pueden tardar (DNS para la IP, PowerShell como
+# respaldo de la batería), así que se recalculan en un hilo y cached()
+# entrega el último valor mientras tanto. El resto de campos (serial, modelo,
+# RAM instalada, SO...) se consulta una vez y vale para toda la sesión.
+VOLATILE_PROBES = {
+    "memoria": (5, get_memory_usage, True),
+    "disco": (30, get_disk_usage, True),
+    "bateria": (15, get_battery_info, False),
+    "red": (60, lambda: {"IP": get_ip_address()}, False),
+}
+
+
+class InventoryCache:
+    """
+    Caché de la información del equipo para la vista "Equipo".
+
+    La consulta completa (get_system_info) corre en un hilo en segundo
+    plano; mientras tanto `cached()` retorna None y la vista muestra un
+    estado de carga. Una vez cargada, `cached()` retorna al instante; los
+    campos volátiles vencidos se recalculan sin bloquear al hilo de la GUI.
+    """
+
+    def __init__(self, loader=get_system_info, volatile_probes=None):
+        self._loader = loader
+        self._probes = VOLATILE_PROBES if volatile_probes is None else volatile_probes
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._info = None
+        self._stamps = {}
+        self._loading = False
+        self._callbacks = []
+        self._background_running = False
+        self.error = None
+        self.loaded_at = None
+
+    @property
+    def is_loading(self):
+        return self._loading
+
+    def cached(self):
+        """
+        Información ya cargada o None. No bloquea: los campos volátiles de
+        psutil se actualizan al momento y los lentos en segundo plano.
+        """
+        with self._lock:
+            if self._info is None:
+                return None
+            self._refresh_inline()
+            slow = self._expired(inline=False)
+            if slow and not self._background_running:
+                self._background_running = True
+            else:
+                slow = []
+            info = dict(self._info)
+
+        if slow:
+            threading.Thread(
+                target=self._refresh_background,
+                args=(slow,),
+                name="inventario-volatil",
+                daemon=True
+            ).start()
+        return info
+
+    def get(self, timeout=None):
+        """Como cached(), pero si no hay datos lanza la carga y la espera"""
+        info = self.cached()
+        if info is not None:
+            return info
+
+        self.refresh()
+        self._loaded.wait(timeout)
+        return self.cached() or {"Error": self.error or "Información no disponible"}
+
+    def refresh(self, on_done=None, force=False):
+        """
+        Carga la información completa en segundo plano.
+
+        Args:
+            on_done: callable(info) opcional; se llama desde el hilo de carga
+                (la GUI debe pasarlo a su hilo con root.after).
+            force: vuelve a consultar aunque ya haya datos.
+        """
+        with self._lock:
+            if self._info is not None and not force:
+                info = dict(self._info)
+            else:
+                info = None
+                if on_done:
+                    self._callbacks.append(on_done)
+                if self._loading:
+                    return
+                self._loading = True
+                self._loaded.clear()
+
+        if info is not None:
+            if on_done:
+                on_done(info)
+            return
+
+        threading.Thread(target=self._load, name="inventario", daemon=True).start()
+
+    def invalidate(self):
+        """Olvida los datos; la próxima consulta vuelve a cargarlos"""
+        with self._lock:
+            self._info = None
+            self._stamps = {}
+
+    # ===== interno =====
+    def _load(self):
+        try:
+            info = self._loader()
+        except Exception as e:
+            info = {"Error": str(e)}
+
+        now = time.time()
+        with self._lock:
+            if "Error" in info:
+                # No se guarda un error para toda la sesión: se reintenta al volver
+                self.error = info["Error"]
+            else:
+                self._info = dict(info)
+                self._stamps = {name: now for name in self._probes}
+                self.error = None
+                self.loaded_at = now
+            callbacks, self._callbacks = self._callbacks, []
+            self._loading = False
+            self._loaded.set()
+
+        for callback in callbacks:
+            try:
+                callback(dict(info))
+            except Exception:
+                pass
+
+    def _expired(self, inline):
+        now = time.time()
+        return [
+            name for name, (ttl, _, is_inline) in self._probes.items()
+            if is_inline == inline and now - self._stamps.get(name, 0) >= ttl
+        ]
+
+    def _refresh_inline(self):
+        for name in self._expired(inline=True):
+            try:
+                self._info.update(self._probes[name][1]())
+            except Exception:
+                continue
+            self._stamps[name] = time.time()
+
+    def _refresh_background(self, names):
+        try:
+            for name in names:
+                try:
+                    values = self._probes[name][1]()
+                except Exception:
+                    continue
+                with self._lock:
+                    if self._info is not None:
+                        self._info.update(values)
+                        self._stamps[name] = time.time()
+        finally:
+            with self._lock:
+                self._background_running = False
+
+
+inventory_cache = InventoryCache()
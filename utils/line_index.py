@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import os
+import mmap
+from bisect import bisect_right
+
+# Tamaño aproximado de cada bloque del índice
+BLOCK_SIZE = 64 * 1024
+
+
+class LineIndex:
+    """
+    Acceso por número de línea a un archivo de texto grande sin cargarlo.
+
+    El archivo se mapea en memoria y se divide en bloques de ~64 KB que
+    empiezan justo después de un salto de línea. Por cada bloque se guarda
+    su offset y el número de su primera línea (contado con bytes.count, en
+    C), así que indexar 50 MB toma milisegundos y leer una ventana de líneas
+    solo toca los bloques que la contienen.
+    """
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self._file = None
+        self._map = None
+        self._size = 0
+        self._block_offsets = []
+        self._block_lines = []
+        self.line_count = 0
+        self.refresh()
+
+    def close(self):
+        if self._map:
+            self._map.close()
+            self._map = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def refresh(self):
+        """Reindexa solo lo agregado si el archivo creció (bitácora en curso)"""
+        size = os.path.getsize(self.path)
+        if size == self._size and self._map is not None:
+            return False
+
+        if size < self._size:
+            self._block_offsets = []
+            self._block_lines = []
+            self.line_count = 0
+
+        self.close()
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._size = size
+        self._index_from_last_block()
+        return True
+
+    def _index_from_last_block(self):
+        # El último bloque puede haber crecido: se vuelve a contar desde él
+        if self._block_offsets:
+            start = self._block_offsets.pop()
+            line = self._block_lines.pop()
+        else:
+            start, line = 0, 0
+
+        data = self._map
+        while data is not None and start < self._size:
+            end = min(start + BLOCK_SIZE, self._size)
+            if end < self._size:
+                newline = data.find(b"\n", end)
+                end = self._size if newline == -1 else newline + 1
+
+            self._block_offsets.append(start)
+            self._block_lines.append(line)
+            line += data[start:end].count(b"\n")
+            start = end
+
+        # Una última línea sin salto final también cuenta
+        if self._size and data[self._size - 1:self._size] != b"\n":
+            line += 1
+
+        self.line_count = line
+
+    def lines(self, first, count):
+        """Retorna hasta `count` líneas desde la línea `first` (base 0)"""
+        if not self._map or count <= 0 or first >= self.line_count:
+            return []
+
+        first = max(0, first)
+        block = bisect_right(self._block_lines, first) - 1
+        result = []
+
+        while block < len(self._block_offsets) and len(result) < count:
+            start = self._block_offsets[block]
+            end = self._block_offsets[block + 1] if block + 1 < len(self._block_offsets) else self._size
+            block_lines = self._map[start:end].decode(self.encoding, errors="replace").split("\n")
+            if block_lines and block_lines[-1] == "":
+                block_lines.pop()
+
+            skip = max(0, first - self._block_lines[block])
+            result.extend(block_lines[skip:skip + count - len(result)])
+            first = max(first, self._block_lines[block] + len(block_lines))
+            block += 1
+
+        return [line.rstrip("\r") for line in result]
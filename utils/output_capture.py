@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import codecs
+import locale
+import threading
+from collections import deque
+
+# Líneas que indican la causa de un fallo (salida del instalador o log MSI)
+ERROR_PATTERNS = [
+    re.compile(r"Return value 3\b"),
+    re.compile(r"returned actual error code \d+", re.IGNORECASE),
+    re.compile(r"\bError \d{4}\b"),
+    re.compile(r"Installation (operation )?failed", re.IGNORECASE),
+    re.compile(r"MainEngineThread is returning [1-9]\d*"),
+    re.compile(r"^\s*(error|fatal|exception)\b", re.IGNORECASE),
+]
+# Líneas previas que se guardan junto al primer "Return value 3"
+CONTEXT_LINES = 4
+MAX_ERRORS = 25
+# Líneas de salida de consola que se copian a la bitácora por intento
+MAX_OUTPUT_LINES = 200
+READ_CHUNK = 256 * 1024
+
+
+def decode_line(raw):
+    """Decodifica una línea de salida de consola (UTF-8 o página de códigos local)"""
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        text = raw.decode(locale.getpreferredencoding(False) or "latin-1", errors="replace")
+    return text.replace("\x00", "").rstrip("\r\n")
+
+
+class ErrorExtractor:
+    """
+    Detecta las líneas de error en un flujo de líneas. Guarda como máximo
+    `max_errors` y, para el primer "Return value 3" de MSI, las líneas
+    previas que suelen nombrar la acción que falló.
+    """
+
+    def __init__(self, max_errors=MAX_ERRORS):
+        self.max_errors = max_errors
+        self.errors = []
+        self._lock = threading.Lock()
+        self._recent = {}
+        self._seen = set()
+        self._return_value_seen = False
+
+    def feed(self, source, line):
+        """Procesa una línea; retorna las líneas de error nuevas"""
+        text = line.strip()
+        if not text:
+            return []
+
+        with self._lock:
+            recent = self._recent.setdefault(source, deque(maxlen=CONTEXT_LINES))
+            found = []
+
+            if any(pattern.search(text) for pattern in ERROR_PATTERNS):
+                if "Return value 3" in text and not self._return_value_seen:
+                    self._return_value_seen = True
+                    found.extend(recent)
+                found.append(text)
+
+            recent.append(text)
+
+            new_errors = []
+            for error in found:
+                if error in self._seen or len(self.errors) >= self.max_errors:
+                    continue
+                self._seen.add(error)
+                self.errors.append(error)
+                new_errors.append(error)
+            return new_errors
+
+
+class LogFileTail:
+    """
+    Sigue un archivo de log mientras otro proceso lo escribe (p. ej. el
+    log verboso de msiexec) y entrega sus líneas completas a
+    on_line(source, línea). Lee solo lo agregado desde la última vez y
+    detecta la codificación (los logs MSI suelen ser UTF-16 con BOM).
+    """
+
+    def __init__(self, path, on_line, source="msi_log", interval=0.5):
+        self.path = path
+        self.on_line = on_line
+        self.source = source
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+        self._decoder = None
+        self._partial = ""
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="tail-log", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Detiene el seguimiento tras leer lo que quede en el archivo"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._read_available()
+        self._read_available()
+        if self._partial:
+            self.on_line(self.source, self._partial)
+            self._partial = ""
+
+    def _close(self):
+        if self._file:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _read_available(self):
+        try:
+            if self._file is None:
+                if not os.path.exists(self.path):
+                    return
+                self._file = open(self.path, "rb")
+
+            # El archivo se reemplazó o truncó: empezar de nuevo
+            if os.path.getsize(self.path) < self._file.tell():
+                self._close()
+                self._decoder = None
+                self._partial = ""
+                return
+
+            while True:
+                chunk = self._file.read(READ_CHUNK)
+                if not chunk:
+                    return
+                self._feed(chunk)
+        except OSError:
+            self._close()
+
+    def _feed(self, chunk):
+        if self._decoder is None:
+            if chunk.startswith(codecs.BOM_UTF16_LE):
+                encoding = "utf-16-le"
+                chunk = chunk[len(codecs.BOM_UTF16_LE):]
+            elif chunk.startswith(codecs.BOM_UTF8):
+                encoding = "utf-8"
+                chunk = chunk[len(codecs.BOM_UTF8):]
+            else:
+                encoding = locale.getpreferredencoding(False) or "latin-1"
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+        lines = (self._partial + self._decoder.decode(chunk)).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self.on_line(self.source, line.rstrip("\r"))
+
+
+class OutputCollector:
+    """
+    Recibe las líneas de un intento de instalación (stdout, stderr y log
+    MSI) y las reenvía a on_log: la salida de consola hasta `max_lines`
+    líneas y, de cualquier fuente, las líneas de error detectadas.
+    """
+
+    def __init__(self, on_log, max_lines=MAX_OUTPUT_LINES, echo_sources=("stdout", "stderr")):
+        self.on_log = on_log
+        self.max_lines = max_lines
+        self.echo_sources = echo_sources
+        self.extractor = ErrorExtractor()
+        self.line_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def errors(self):
+        return list(self.extractor.errors)
+
+    def add(self, source, line):
+        new_errors = self.extractor.feed(source, line)
+        text = line.strip()
+
+        if source in self.echo_sources and text:
+            with self._lock:
+                self.line_count += 1
+                count = self.line_count
+            if count <= self.max_lines and text not in new_errors:
+                self.on_log(f"  [{source}] {line.rstrip()}")
+            elif count == self.max_lines + 1:
+                self.on_log(f"  [{source}] ... (salida truncada; se siguen buscando errores)")
+
+        for error in new_errors:
+            self.on_log(f"  ⚠️ [{source}] {error}")
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+import psutil
+
+
+class ProcessStallMonitor:
+    """
+    Detecta instaladores colgados observando la actividad de su árbol de
+    procesos (tiempo de CPU y bytes de E/S).
+
+    Un instalador que espera un diálogo oculto o un recurso bloqueado deja de
+    consumir CPU y de leer/escribir disco; si eso dura más de `stall_seconds`
+    se considera detenido.
+
+    Solo cuenta el proceso lanzado y sus descendientes: otro msiexec del
+    equipo (Windows Update, un servicio) no debe ocultar un instalador
+    colgado ni simular actividad. Los instaladores que trabajan en un
+    servicio ajeno al árbol se ejecutan sin este detector.
+    """
+
+    def __init__(self, pid, stall_seconds):
+        self.stall_seconds = stall_seconds
+        self._pid = pid
+        self._last_activity = None
+        self._last_change = time.time()
+
+    def _tree(self):
+        try:
+            root = psutil.Process(self._pid)
+            return [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+
+    def _activity(self):
+        """Firma de actividad: (pids, cpu acumulada, bytes de E/S)"""
+        pids = set()
+        cpu = 0.0
+        io = 0
+
+        for proc in self._tree():
+            try:
+                with proc.oneshot():
+                    times = proc.cpu_times()
+                    cpu += times.user + times.system
+                    try:
+                        counters = proc.io_counters()
+                        io += counters.read_bytes + counters.write_bytes
+                    except (psutil.Error, AttributeError):
+                        pass
+                pids.add(proc.pid)
+            except psutil.Error:
+                continue
+
+        return frozenset(pids), round(cpu, 1), io
+
+    def idle_seconds(self):
+        """Segundos transcurridos desde la última actividad observada"""
+        activity = self._activity()
+        now = time.time()
+
+        if self._last_activity is None:
+            # Primera muestra: solo fija la referencia
+            self._last_activity = activity
+        elif activity != self._last_activity:
+            self._last_activity = activity
+            self._last_change = now
+
+        return now - self._last_change
+
+    def is_stalled(self):
+        return bool(self.stall_seconds) and self.idle_seconds() >= self.stall_seconds
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import signal
+import asyncio
+import threading
+import subprocess
+
+from utils.output_capture import decode_line
+from utils.process_monitor import ProcessStallMonitor
+from utils.subprocess_utils import hidden_kwargs
+
+# Códigos que retorna el runner cuando el proceso no terminó por sí solo
+ERROR_CODE = -1
+CANCELLED_CODE = -998
+TIMEOUT_CODE = -999
+
+# Cada cuánto se revisa la actividad del árbol de procesos
+STALL_POLL_SECONDS = 2
+# Espera máxima a los lectores de salida tras terminar el proceso (un
+# proceso nieto puede heredar los pipes y mantenerlos abiertos)
+READER_GRACE_SECONDS = 5
+KILL_WAIT_SECONDS = 10
+# Líneas de salida más largas que esto se entregan en trozos
+STREAM_LIMIT = 1024 * 1024
+
+
+class ProcessResult:
+    """Resultado de un proceso ejecutado por el ProcessRunner"""
+
+    def __init__(self, returncode, timed_out=False, stalled=False, cancelled=False, error=None,
+                 seconds=0.0):
+        self.returncode = returncode
+        self.timed_out = timed_out
+        self.stalled = stalled
+        self.cancelled = cancelled
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+    def __repr__(self):
+        return (
+            f"ProcessResult(returncode={self.returncode}, timed_out={self.timed_out}, "
+            f"stalled={self.stalled}, cancelled={self.cancelled}, error={self.error!r})"
+        )
+
+
+class ProcessGroup:
+    """
+    Procesos lanzados por un mismo llamador (p. ej. un lote de
+    instalación). `cancel()` termina solo los procesos del grupo, no los de
+    otros usuarios del runner compartido, y los que se lancen después en el
+    grupo se cancelan sin ejecutarse.
+    """
+
+    def __init__(self, runner):
+        self._runner = runner
+        self._tasks = set()
+        self.cancelled = False
+
+    def run(self, command, **options):
+        return self._runner.run(command, group=self, **options)
+
+    def submit(self, command, **options):
+        return self._runner.submit(command, group=self, **options)
+
+    def cancel(self):
+        """Cancela los procesos en curso del grupo (se termina el árbol de cada uno)"""
+        self.cancelled = True
+        loop = self._runner._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._cancel_tasks)
+
+    def _cancel_tasks(self):
+        # Corre en el hilo del bucle, igual que el alta y baja de tareas
+        for task in list(self._tasks):
+            task.cancel()
+
+
+class ProcessRunner:
+    """
+    Ejecuta subprocesos sobre un único bucle asyncio que corre en su propio
+    hilo, en lugar de bloquear un hilo por proceso.
+
+    Cada proceso se supervisa con un tiempo límite opcional, detección de
+    árbol inactivo (`stall_seconds`) y cancelación; al vencer o cancelarse
+    se termina el árbol completo (taskkill /T en Windows, el grupo de
+    procesos en POSIX). La salida puede entregarse línea por línea con
+    on_output(fuente, línea) mientras el proceso corre.
+
+    `run()` bloquea al hilo que llama hasta obtener el ProcessResult;
+    `submit()` retorna un concurrent.futures.Future, y `run_async()` es la
+    corrutina para usar directamente dentro del bucle. Con `group()` un
+    llamador agrupa sus procesos para poder cancelarlos sin afectar a otros.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # ===== bucle =====
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run_loop,
+                    args=(ready,),
+                    name="process-runner",
+                    daemon=True,
+                )
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    def _run_loop(self, ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        ready.set()
+        loop.run_forever()
+
+    # ===== API =====
+    def submit(self, command, **options):
+        """Programa el comando y retorna un Future con su ProcessResult"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self.run_async(command, **options), loop)
+
+    def run(self, command, **options):
+        """Ejecuta el comando y espera su ProcessResult"""
+        return self.submit(command, **options).result()
+
+    def group(self):
+        """Nuevo ProcessGroup para los procesos de un llamador"""
+        return ProcessGroup(self)
+
+    async def run_async(self, command, timeout=None, cwd=None, hidden=False, stall_seconds=None,
+                        on_output=None, group=None):
+        """
+        Ejecuta `command` (texto por shell, o lista de argumentos sin shell).
+        Nunca lanza excepción: los errores se reportan en el ProcessResult.
+        Con `group` el proceso se cancela junto con el resto de su grupo.
+        """
+        if group is not None and group.cancelled:
+            return ProcessResult(CANCELLED_CODE, cancelled=True)
+
+        task = asyncio.current_task()
+        if group is not None:
+            group._tasks.add(task)
+        start = time.time()
+        try:
+            result = await self._execute(command, timeout, cwd, hidden, stall_seconds, on_output)
+        except asyncio.CancelledError:
+            result = ProcessResult(CANCELLED_CODE, cancelled=True)
+        except Exception as e:
+            result = ProcessResult(ERROR_CODE, error=str(e))
+        finally:
+            if group is not None:
+                group._tasks.discard(task)
+
+        result.seconds = time.time() - start
+        return result
+
+    # ===== ejecución =====
+    async def _spawn(self, command, cwd, hidden, stream):
+        options = {
+            "cwd": cwd,
+            "stdin": subprocess.DEVNULL,
+            "stdout": subprocess.PIPE if stream else subprocess.DEVNULL,
+            "stderr": subprocess.PIPE if stream else subprocess.DEVNULL,
+            "limit": STREAM_LIMIT,
+        }
+        if hidden:
+            options.update(hidden_kwargs())
+        if os.name != "nt":
+            # Grupo de procesos propio para poder terminar el árbol completo
+            options["start_new_session"] = True
+
+        if isinstance(command, str):
+            return await asyncio.create_subprocess_shell(command, **options)
+        return await asyncio.create_subprocess_exec(*command, **options)
+
+    async def _execute(self, command, timeout, cwd, hidden, stall_seconds, on_output):
+        process = await self._spawn(command, cwd, hidden, stream=on_output is not None)
+
+        readers = []
+        if on_output is not None:
+            readers = [
+                asyncio.ensure_future(self._pump(process.stdout, "stdout", on_output)),
+                asyncio.ensure_future(self._pump(process.stderr, "stderr", on_output)),
+            ]
+
+        try:
+            outcome = await self._supervise(process, timeout, stall_seconds)
+        except asyncio.CancelledError:
+            await self._kill_tree(process)
+            await self._drain(readers)
+            raise
+
+        if outcome is not None:
+            await self._kill_tree(process)
+        await self._drain(readers)
+
+        if outcome == "timeout":
+            return ProcessResult(TIMEOUT_CODE, timed_out=True)
+        if outcome == "stalled":
+            return ProcessResult(TIMEOUT_CODE, timed_out=True, stalled=True)
+        return ProcessResult(process.returncode)
+
+    async def _supervise(self, process, timeout, stall_seconds):
+        """Espera al proceso; retorna None si terminó, o "timeout"/"stalled" """
+        loop = asyncio.get_running_loop()
+        monitor = ProcessStallMonitor(process.pid, stall_seconds) if stall_seconds else None
+        deadline = loop.time() + timeout if timeout else None
+        waiter = asyncio.ensure_future(process.wait())
+
+        try:
+            while True:
+                interval = STALL_POLL_SECONDS if monitor else None
+                if deadline is not None:
+                    remaining = max(0.1, deadline - loop.time())
+                    interval = min(interval, remaining) if interval else remaining
+
+                done, _ = await asyncio.wait({waiter}, timeout=interval)
+                if done:
+                    return None
+
+                if deadline is not None and loop.time() >= deadline:
+                    return "timeout"
+
+                # psutil bloquea unos milisegundos: fuera del bucle
+                if monitor and await loop.run_in_executor(None, monitor.is_stalled):
+                    return "stalled"
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+
+    @staticmethod
+    async def _pump(stream, source, on_output):
+        while True:
+            try:
+                raw = await stream.readline()
+            except (ValueError, asyncio.LimitOverrunError):
+                raw = await stream.read(STREAM_LIMIT)
+            if not raw:
+                return
+            try:
+                on_output(source, decode_line(raw))
+            except Exception:
+                pass
+
+    @staticmethod
+    async def _drain(readers):
+        if not readers:
+            return
+        _, pending = await asyncio.wait(readers, timeout=READER_GRACE_SECONDS)
+        for reader in pending:
+            reader.cancel()
+
+    async def _kill_tree(self, process):
+        if process.returncode is not None:
+            return
+
+        try:
+            if os.name == "nt":
+                killer = await asyncio.create_subprocess_exec(
+                    "taskkill", "/PID", str(process.pid), "/T", "/F",
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    **hidden_kwargs()
+                )
+                await killer.wait()
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except (OSError, ProcessLookupError):
+            pass
+
+        try:
+            await asyncio.wait_for(process.wait(), KILL_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+_default_runner = None
+_default_lock = threading.Lock()
+
+
+def get_process_runner():
+    """Runner compartido por toda la aplicación"""
+    global _default_runner
+    with _default_lock:
+        if _default_runner is None:
+            _default_runner = ProcessRunner()
+        return _default_runner
+
+
+def run_process(command, **options):
+    """Atajo: ejecuta un comando en el runner compartido y espera su resultado"""
+    return get_process_runner().run(command, **options)
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import os
 import subprocess
 
 
@@ -8,6 +9,16 @@ def get_hidden_startupinfo():
     return startupinfo
 
 
+def hidden_kwargs():
+    """Argumentos de Popen para no mostrar ventana (vacío fuera de Windows)"""
+    if os.name != "nt":
+        return {}
+    return {
+        "startupinfo": get_hidden_startupinfo(),
+        "creationflags": subprocess.CREATE_NO_WINDOW,
+    }
+
+
 def hidden_run(command, **kwargs):
     return subprocess.run(
         command,
@@ -23,4 +34,4 @@ def hidden_popen(command, **kwargs):
         startupinfo=get_hidden_startupinfo(),
         creationflags=subprocess.CREATE_NO_WINDOW,
         **kwargs
-    )
\ No newline at end of file
+    )
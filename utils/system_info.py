@@ -8,34 +8,166 @@ import os
 import webbrowser
 import json
 import re
+import copy
 import tempfile
 from bs4 import BeautifulSoup
 import subprocess
 
 from utils.subprocess_utils import hidden_popen
 from utils.subprocess_utils import hidden_run
+from utils.hardware_inventory import INVENTORY_TIMEOUT, get_inventory, invalidate_inventory
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import threading
+import time
+
+BATTERY_REPORT_TIMEOUT = 30
+BATTERY_CAPACITY_PATTERN = re.compile(r"(\d[\d,\.]*)\s*mWh", re.IGNORECASE)
+# Caracteres que se revisan tras una etiqueta antes de darla por perdida
+BATTERY_SCAN_WINDOW = 2000
+
+# Tiempo máximo por probe en get_system_info (s). Los probes que leen el
+# inventario CIM esperan a esa única consulta, así que su límite parte de
+# INVENTORY_TIMEOUT; la salud de batería puede además generar el reporte
+# de powercfg como respaldo.
+PROBE_MARGIN = 15
+PROBE_TIMEOUT = INVENTORY_TIMEOUT + PROBE_MARGIN
+PROBE_TIMEOUTS = {
+    "IP": 10,
+    "Salud de batería": INVENTORY_TIMEOUT + BATTERY_REPORT_TIMEOUT + PROBE_MARGIN,
+}
+PROBE_WORKERS = 8
+
+_probe_timings = []
+_probe_timings_lock = threading.Lock()
+
+
+class SnapshotMemo:
+    """
+    Memoización con alcance de una toma de inventario.
 
+    Cada clave se calcula una sola vez hasta el próximo invalidate(); si
+    varios hilos la piden a la vez (los probes de get_system_info corren en
+    paralelo) los demás esperan el resultado del primero en lugar de lanzar
+    la misma consulta otra vez.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._pending = {}
+        self._generation = 0
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+            event = self._pending.get(key)
+            owner = event is None
+            if owner:
+                event = self._pending[key] = threading.Event()
+            generation = self._generation
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                if key in self._values:
+                    return self._values[key]
+            # El primero falló: se calcula sin memoizar
+            return compute()
+
+        try:
+            value = compute()
+            with self._lock:
+                # Un invalidate() durante el cálculo deja el valor sin guardar
+                if generation == self._generation:
+                    self._values[key] = value
+            return value
+        finally:
+            with self._lock:
+                if self._pending.get(key) is event:
+                    del self._pending[key]
+            event.set()
+
+    def invalidate(self):
+        with self._lock:
+            self._values.clear()
+            self._pending.clear()
+            self._generation += 1
+
+
+_memo = SnapshotMemo()
+_command_runner = None
+
+
+def memoized_query(func):
+    """Memoiza un helper por argumentos dentro de la toma de inventario actual"""
+    def wrapper(*args):
+        value = _memo.get((func.__name__,) + args, lambda: func(*args))
+        # Copia: quien llama puede modificar listas y dicts sin afectar la caché
+        return copy.deepcopy(value)
+
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+def set_command_runner(runner=None):
+    """
+    Reemplaza el ejecutor de run_cmd: callable(comando) -> salida. Sirve para
+    pruebas con un ejecutor falso; None restaura el real. Invalida la caché.
+    """
+    global _command_runner
+    _command_runner = runner
+    invalidate_system_info()
+
+
+def invalidate_system_info():
+    """Descarta las consultas memoizadas y el inventario CIM compartido"""
+    _memo.invalidate()
+    invalidate_inventory()
+
+
+def _execute_cmd(command):
+    if _command_runner is not None:
+        return (_command_runner(command) or "").strip()
+
+    result = hidden_run(
+        command,
+        shell=True,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="ignore"
+    )
+    return result.stdout.strip()
+
+
+def run_cmd(command, cached=True):
+    """
+    Ejecuta un comando y devuelve su salida limpia.
+    Con `cached` el mismo comando se ejecuta una sola vez por toma de
+    inventario (ver invalidate_system_info).
+    """
+    def execute():
+        try:
+            return _execute_cmd(command)
+        except Exception:
+            return ""
+
+    if not cached:
+        return execute()
+    return _memo.get(("run_cmd", command), execute)
 
-def run_cmd(command):
-    """Ejecuta un comando y devuelve su salida limpia."""
-    try:
-        result = hidden_run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="ignore"
-        )
-        return result.stdout.strip()
-    except Exception:
-        return ""
 def get_windows_display_name():
     """
     Obtiene el nombre real de Windows, por ejemplo:
     Windows 11 Pro for Workstations
     """
+    caption = get_inventory().value("os", "Caption")
+    if caption:
+        return caption.replace("Microsoft", "").strip()
+
     try:
         value = run_cmd('wmic os get Caption')
         lines = [line.strip() for line in value.splitlines() if line.strip()]
@@ -60,11 +192,16 @@ def get_windows_display_name():
     except Exception:
         return "No disponible"
 
+@memoized_query
 def get_ram_modules_powershell_json():
     """
     Obtiene información de RAM desde PowerShell en formato JSON.
     Más confiable que parsear texto plano.
     """
+    inventory = get_inventory()
+    if inventory.ok:
+        return inventory.section("memory")
+
     try:
         cmd = (
             'powershell -NoProfile -ExecutionPolicy Bypass -Command '
@@ -118,24 +255,34 @@ def get_wmic_single_value(command, header_name=None):
 
 def get_manufacturer():
     """Obtiene el fabricante del equipo."""
-    value = get_wmic_single_value("wmic computersystem get manufacturer", "manufacturer")
+    value = get_inventory().value("system", "Manufacturer")
+    if not value:
+        value = get_wmic_single_value("wmic computersystem get manufacturer", "manufacturer")
     return value or "No disponible"
 
 
 def get_model():
     """Obtiene el modelo del equipo."""
-    value = get_wmic_single_value("wmic computersystem get model", "model")
+    value = get_inventory().value("system", "Model")
+    if not value:
+        value = get_wmic_single_value("wmic computersystem get model", "model")
     return value or "No disponible"
 
 
 def get_pc_serial():
     """Obtiene el serial / service tag del equipo."""
-    value = get_wmic_single_value("wmic bios get serialnumber", "serialnumber")
+    value = get_inventory().value("bios", "SerialNumber")
+    if not value:
+        value = get_wmic_single_value("wmic bios get serialnumber", "serialnumber")
     return value or "No disponible"
 
 
 def get_domain_or_workgroup():
     """Obtiene el dominio o grupo de trabajo."""
+    domain = get_inventory().value("system", "Domain")
+    if domain:
+        return domain
+
     value = get_wmic_single_value("wmic computersystem get domain", "domain")
     return value or "No disponible"
 
@@ -168,19 +315,21 @@ def get_ram_slots_info():
         total_slots = None
         max_gb = None
 
-        # Intento principal con PowerShell / CIM
-        cmd_array = (
-            'powershell -NoProfile -ExecutionPolicy Bypass -Command '
-            '"Get-CimInstance Win32_PhysicalMemoryArray | '
-            'Select-Object MemoryDevices,MaxCapacity,MaxCapacityEx | '
-            'ConvertTo-Json -Compress"'
-        )
-
-        array_output = run_cmd(cmd_array)
-
-        if array_output:
-            data = json.loads(array_output)
-
+        # Intento principal con el inventario CIM compartido
+        inventory = get_inventory()
+        if inventory.ok:
+            data = inventory.first("memory_array")
+        else:
+            cmd_array = (
+                'powershell -NoProfile -ExecutionPolicy Bypass -Command '
+                '"Get-CimInstance Win32_PhysicalMemoryArray | '
+                'Select-Object MemoryDevices,MaxCapacity,MaxCapacityEx | '
+                'ConvertTo-Json -Compress"'
+            )
+            array_output = run_cmd(cmd_array)
+            data = json.loads(array_output) if array_output else {}
+
+        if data:
             if isinstance(data, list):
                 data = data[0] if data else {}
 
@@ -242,6 +391,7 @@ def get_ram_slots_info():
         return "No disponible"
 
 
+@memoized_query
 def get_ram_modules_info():
     """
     Devuelve detalle limpio de los módulos RAM instalados.
@@ -359,6 +509,17 @@ def get_ram_modules_info():
 
 def get_extra_disks():
     """Obtiene información de discos adicionales distintos de C:."""
+    inventory = get_inventory()
+    if inventory.section("disks"):
+        discos = []
+        for disk in inventory.section("disks"):
+            device = str(disk.get("DeviceID") or "").strip().upper()
+            size = disk.get("Size")
+            if not device or device == "C:" or not str(size).isdigit():
+                continue
+            discos.append(f"{device}\\ ({format_gb(int(size))})")
+        return ", ".join(discos) if discos else "Ninguno detectado"
+
     try:
         discos = []
         for part in psutil.disk_partitions():
@@ -386,6 +547,22 @@ def get_ram_modules_dict():
 
     return result
 
+def get_memory_usage():
+    """RAM disponible (solo psutil, sin lanzar procesos)."""
+    try:
+        return {"RAM disponible": format_gb(psutil.virtual_memory().available)}
+    except Exception:
+        return {"RAM disponible": "No disponible"}
+
+
+def get_disk_usage():
+    """Tamaño y espacio libre de C: (solo psutil, sin lanzar procesos)."""
+    try:
+        disk = psutil.disk_usage("C:\\")
+        return {"Disco total C:": format_gb(disk.total), "Disco libre C:": format_gb(disk.free)}
+    except Exception:
+        return {"Disco total C:": "No disponible", "Disco libre C:": "No disponible"}
+
 def get_battery_info():
     """
     Obtiene el estado de la batería.
@@ -418,10 +595,19 @@ def get_battery_info():
         }
 
     except Exception:
+        charge = get_inventory().value("battery", "EstimatedChargeRemaining")
+        if str(charge).isdigit():
+            return {
+                "Batería": f"{charge}%",
+                "Estado de energía": "No disponible",
+                "Autonomía estimada": "No disponible"
+            }
+
         # Fallback simple con PowerShell
         try:
             percent = run_cmd(
-                r'powershell -Command "(Get-CimInstance Win32_Battery).EstimatedChargeRemaining"'
+                r'powershell -Command "(Get-CimInstance Win32_Battery).EstimatedChargeRemaining"',
+                cached=False
             ).strip()
 
             if percent and percent.isdigit():
@@ -439,6 +625,36 @@ def get_battery_info():
             "Autonomía estimada": "No disponible"
         }
 
+def _sum_capacity(items, key):
+    values = [int(item[key]) for item in items if str(item.get(key)).isdigit()]
+    total = sum(values)
+    return total if total > 0 else None
+
+
+def get_battery_capacities():
+    """
+    Capacidad de diseño y de carga completa (mWh) desde el inventario CIM.
+
+    Usa root/wmi (BatteryStaticData / BatteryFullChargedCapacity), que es la
+    misma fuente del reporte de powercfg; si no responde, Win32_Battery, que
+    en pocos equipos trae los valores. Con varias baterías se suman.
+    Retorna (diseño, carga_completa) o (None, None).
+    """
+    inventory = get_inventory()
+
+    design = _sum_capacity(inventory.section("battery_static"), "DesignedCapacity")
+    full = _sum_capacity(inventory.section("battery_full"), "FullChargedCapacity")
+    if design and full:
+        return design, full
+
+    design = _sum_capacity(inventory.section("battery"), "DesignCapacity")
+    full = _sum_capacity(inventory.section("battery"), "FullChargeCapacity")
+    if design and full:
+        return design, full
+
+    return None, None
+
+
 def generate_battery_report():
     temp_dir = tempfile.gettempdir()
     report_path = os.path.join(temp_dir, "battery_report.html")
@@ -447,7 +663,8 @@ def generate_battery_report():
         ["powercfg", "/batteryreport", "/output", report_path],
         capture_output=True,
         text=True,
-        shell=False
+        shell=False,
+        timeout=BATTERY_REPORT_TIMEOUT
     )
 
     if result.returncode != 0 or not os.path.exists(report_path):
@@ -457,36 +674,59 @@ def generate_battery_report():
 
 def parse_battery_report(report_path):
     """
-    Extrae información útil del reporte generado por powercfg /batteryreport
-    usando búsqueda más estable sobre el HTML.
+    Extrae información útil del reporte generado por powercfg /batteryreport.
+
+    Se lee línea por línea y se deja de leer apenas aparecen ambos valores
+    (están al inicio del reporte, antes del historial de uso).
     """
     data = {
         "design_capacity": "No disponible",
         "full_charge_capacity": "No disponible",
     }
+    labels = {
+        "design_capacity": "DESIGN CAPACITY",
+        "full_charge_capacity": "FULL CHARGE CAPACITY",
+    }
 
     try:
-        with open(report_path, "r", encoding="utf-8", errors="ignore") as f:
-            html = f.read()
-
-        # Buscar capacidades directamente en el HTML/texto
-        design_match = re.search(
-            r"DESIGN CAPACITY.*?(\d[\d,\.]*)\s*mWh",
-            html,
-            re.IGNORECASE | re.DOTALL
-        )
-
-        full_match = re.search(
-            r"FULL CHARGE CAPACITY.*?(\d[\d,\.]*)\s*mWh",
-            html,
-            re.IGNORECASE | re.DOTALL
-        )
+        # Texto pendiente de revisar; `pending` es el valor cuya etiqueta ya
+        # apareció (el número puede venir en la misma línea o en las siguientes)
+        pending = None
+        text = ""
 
-        if design_match:
-            data["design_capacity"] = f"{design_match.group(1)} mWh"
+        with open(report_path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                text += line
+
+                while True:
+                    if pending is None:
+                        found = [
+                            (text.upper().find(label), key, label)
+                            for key, label in labels.items()
+                            if data[key] == "No disponible"
+                        ]
+                        found = [item for item in found if item[0] != -1]
+                        if not found:
+                            # Se conserva el final por si una etiqueta quedó partida
+                            text = text[-32:]
+                            break
+                        position, pending, label = min(found)
+                        text = text[position + len(label):]
+
+                    match = BATTERY_CAPACITY_PATTERN.search(text)
+                    if match:
+                        data[pending] = f"{match.group(1)} mWh"
+                        pending = None
+                        text = text[match.end():]
+                        continue
+
+                    if len(text) > BATTERY_SCAN_WINDOW:
+                        pending = None
+                        text = ""
+                    break
 
-        if full_match:
-            data["full_charge_capacity"] = f"{full_match.group(1)} mWh"
+                if all(value != "No disponible" for value in data.values()):
+                    break
 
         return data
 
@@ -513,23 +753,127 @@ def extract_capacity_number(text):
 
 
 
+def run_probes(probes, timeouts=None, default_timeout=PROBE_TIMEOUT, workers=PROBE_WORKERS):
+    """
+    Ejecuta probes independientes en paralelo, cada uno con su tiempo límite.
+
+    Args:
+        probes: {nombre: (callable, valor_por_defecto)}. El valor por defecto
+            se usa si el probe falla o no termina a tiempo.
+
+    Returns:
+        (resultados, tiempos): {nombre: valor} y una lista de
+        {"probe", "seconds", "status"} con status "ok", "error" o "timeout".
+    """
+    timeouts = PROBE_TIMEOUTS if timeouts is None else timeouts
+    durations = {}
+
+    def timed(name, func):
+        start = time.time()
+        try:
+            return func()
+        finally:
+            durations[name] = time.time() - start
+
+    # Sin `with`: un probe colgado no debe retener la respuesta al salir
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="probe")
+    started = time.time()
+    futures = {name: pool.submit(timed, name, func) for name, (func, _) in probes.items()}
+
+    results = {}
+    timings = []
+    try:
+        for name, future in futures.items():
+            default = probes[name][1]
+            deadline = started + timeouts.get(name, default_timeout)
+            try:
+                results[name] = future.result(timeout=max(0.0, deadline - time.time()))
+                status = "ok"
+            except FutureTimeout:
+                results[name] = default
+                status = "timeout"
+            except Exception:
+                results[name] = default
+                status = "error"
+
+            seconds = durations.get(name, time.time() - started)
+            timings.append({"probe": name, "seconds": round(seconds, 3), "status": status})
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    with _probe_timings_lock:
+        _probe_timings[:] = timings
+    return results, timings
+
+
+def get_probe_timings():
+    """Duración de cada probe en la última llamada a get_system_info"""
+    with _probe_timings_lock:
+        return [dict(item) for item in _probe_timings]
+
+
+def format_probe_timings(timings):
+    """Resumen corto: el probe más lento, que acota el tiempo total"""
+    if not timings:
+        return "No disponible"
+
+    slowest = max(timings, key=lambda item: item["seconds"])
+    text = f"{slowest['seconds']:.1f} s (más lento: {slowest['probe']})"
+    late = [item["probe"] for item in timings if item["status"] == "timeout"]
+    if late:
+        text += f"; sin respuesta: {', '.join(late)}"
+    return text
+
+
 def get_system_info():
     """Obtiene toda la información del sistema."""
     try:
+        # Nueva toma de inventario: los getters comparten una sola consulta
+        # CIM y cada comando de respaldo se ejecuta a lo sumo una vez
+        invalidate_system_info()
+
         vm = psutil.virtual_memory()
         disk = psutil.disk_usage("C:\\")
         boot_time = datetime.fromtimestamp(psutil.boot_time()).strftime("%Y-%m-%d %H:%M:%S")
 
-        identity_info = get_machine_identity()
-        ram_slots = get_ram_slots_info()
-        ram_modules = get_ram_modules_info()
-        battery_info = get_battery_info()
-        battery_full_info = get_battery_full_info()
+        no_battery = {
+            "Batería": "No disponible",
+            "Estado de energía": "No disponible",
+            "Autonomía estimada": "No disponible",
+        }
+        no_battery_full = {
+            "Capacidad de diseño": "No disponible",
+            "Carga completa actual": "No disponible",
+            "Vida de batería": "No disponible",
+        }
+        no_identity = {
+            "Fabricante": "No disponible",
+            "Modelo": "No disponible",
+            "Service Tag / Serial": "No disponible",
+        }
+
+        results, timings = run_probes({
+            "Identidad": (get_machine_identity, no_identity),
+            "Sistema operativo": (get_windows_display_name, "No disponible"),
+            "Slots RAM": (get_ram_slots_info, "No disponible"),
+            "Módulos RAM": (get_ram_modules_info, ["No disponible"]),
+            "Batería": (get_battery_info, no_battery),
+            "Salud de batería": (get_battery_full_info, no_battery_full),
+            "Discos": (get_extra_disks, "No disponible"),
+            "IP": (get_ip_address, "No disponible"),
+            "Dominio": (get_domain_or_workgroup, "No disponible"),
+        })
+
+        identity_info = results["Identidad"]
+        ram_slots = results["Slots RAM"]
+        ram_modules = results["Módulos RAM"]
+        battery_info = results["Batería"]
+        battery_full_info = results["Salud de batería"]
 
         info = {
             "Nombre del equipo": socket.gethostname(),
             "Usuario actual": getpass.getuser(),
-            "Sistema operativo": get_windows_display_name(),
+            "Sistema operativo": results["Sistema operativo"],
             "Versión": platform.version(),
             "Arquitectura": platform.machine(),
             "Procesador": platform.processor() or "No disponible",
@@ -542,14 +886,15 @@ def get_system_info():
             "Detalle RAM": " | ".join(ram_modules),
             "Disco total C:": format_gb(disk.total),
             "Disco libre C:": format_gb(disk.free),
-            "Discos adicionales": get_extra_disks(),
-            "IP": get_ip_address(),
-            "Dominio / Grupo": get_domain_or_workgroup(),
+            "Discos adicionales": results["Discos"],
+            "IP": results["IP"],
+            "Dominio / Grupo": results["Dominio"],
             "Último arranque": boot_time,
         }
 
         info.update(battery_info)
         info.update(battery_full_info)
+        info["Tiempo de consulta"] = format_probe_timings(timings)
         return info
 
     except Exception as e:
@@ -575,6 +920,15 @@ def get_battery_full_info():
     except Exception:
         pass
 
+    # Camino principal: capacidades desde CIM, sin generar el reporte HTML
+    design_num, full_num = get_battery_capacities()
+    if design_num and full_num:
+        return {
+            "Capacidad de diseño": f"{design_num:,} mWh",
+            "Carga completa actual": f"{full_num:,} mWh",
+            "Vida de batería": f"{full_num / design_num * 100:.1f}%",
+        }
+
     try:
         report_path = generate_battery_report()
         if not report_path:
@@ -918,6 +1272,7 @@ def safe_value(value):
         return "No disponible"
     return value
 
+@memoized_query
 def get_machine_identity():
     """
     Obtiene fabricante, modelo y serial/service tag con fallback.
@@ -927,29 +1282,36 @@ def get_machine_identity():
     modelo = "No disponible"
     serial = "No disponible"
 
-    # Intento 1: PowerShell / CIM
-    try:
-        cmd = (
-            'powershell -NoProfile -ExecutionPolicy Bypass -Command '
-            '"$cs = Get-CimInstance Win32_ComputerSystem; '
-            '$bios = Get-CimInstance Win32_BIOS; '
-            '[PSCustomObject]@{'
-            'Manufacturer=$cs.Manufacturer; '
-            'Model=$cs.Model; '
-            'Serial=$bios.SerialNumber'
-            '} | ConvertTo-Json -Compress"'
-        )
-
-        output = run_cmd(cmd)
-        if output:
-            data = json.loads(output)
-            fabricante = safe_value(data.get("Manufacturer"))
-            modelo = safe_value(data.get("Model"))
-            serial = safe_value(data.get("Serial"))
-    except Exception:
-        pass
+    # Intento 1: inventario CIM compartido
+    inventory = get_inventory()
+    if inventory.ok:
+        fabricante = safe_value(inventory.value("system", "Manufacturer"))
+        modelo = safe_value(inventory.value("system", "Model"))
+        serial = safe_value(inventory.value("bios", "SerialNumber"))
+    else:
+        # Intento 2: PowerShell / CIM por separado
+        try:
+            cmd = (
+                'powershell -NoProfile -ExecutionPolicy Bypass -Command '
+                '"$cs = Get-CimInstance Win32_ComputerSystem; '
+                '$bios = Get-CimInstance Win32_BIOS; '
+                '[PSCustomObject]@{'
+                'Manufacturer=$cs.Manufacturer; '
+                'Model=$cs.Model; '
+                'Serial=$bios.SerialNumber'
+                '} | ConvertTo-Json -Compress"'
+            )
+
+            output = run_cmd(cmd)
+            if output:
+                data = json.loads(output)
+                fabricante = safe_value(data.get("Manufacturer"))
+                modelo = safe_value(data.get("Model"))
+                serial = safe_value(data.get("Serial"))
+        except Exception:
+            pass
 
-    # Intento 2: WMIC si algo sigue vacío
+    # Intento 3: WMIC si algo sigue vacío
     try:
         if fabricante == "No disponible":
             out = run_cmd("wmic computersystem get manufacturer /value")